@@ -4,7 +4,6 @@ Login window dan role selection untuk SIJAtools
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from database.db import DatabaseManager
 
 
 class RoleSelectionWindow:
@@ -90,7 +89,8 @@ class RoleSelectionWindow:
         self.current_user = login.current_user
         
         if self.current_user:
-            self.root.destroy()
+            # Keluar dari mainloop; root dipakai ulang untuk dashboard
+            self.root.quit()
 
 
 class LoginWindow:
@@ -111,10 +111,18 @@ class LoginWindow:
         y = (self.root.winfo_screenheight() // 2) - (height // 2)
         self.root.geometry(f'{width}x{height}+{x}+{y}')
         
-        self.db = DatabaseManager()
+        # Import di sini supaya layar pemilihan role tampil tanpa menunggu
+        # modul database
+        from services.account import AccountService
+        from services.worker import DbWorker
+        
+        self.accounts = AccountService()
+        # Verifikasi password (KDF) berjalan di thread worker
+        self.worker = DbWorker(self.root)
         self.current_user = None
         
         self.create_widgets()
+        self.root.bind('<Destroy>', self.on_destroy, add='+')
     
     def create_widgets(self):
         """Buat widget login"""
@@ -150,7 +158,8 @@ class LoginWindow:
         btn_frame = ttk.Frame(main_frame)
         btn_frame.pack(pady=10)
         
-        ttk.Button(btn_frame, text="Login", command=self.do_login).pack(side=tk.LEFT, padx=5)
+        self.btn_login = ttk.Button(btn_frame, text="Login", command=self.do_login)
+        self.btn_login.pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Kembali", command=self.root.destroy).pack(side=tk.LEFT, padx=5)
         
         # Tombol Daftar Akun Baru - HANYA untuk USER
@@ -181,30 +190,42 @@ class LoginWindow:
             messagebox.showerror("Error", "Username dan password harus diisi")
             return
         
-        success, result = self.db.login(username, password)
+        if str(self.btn_login['state']) == tk.DISABLED:
+            return
+        
+        # Validasi password dan role sesuai dengan role yang dipilih
+        self.btn_login.config(state=tk.DISABLED)
+        self.root.config(cursor='watch')
+        self.worker.submit(
+            self.accounts.login, username, password, self.role,
+            on_done=self.on_login_done, on_error=self.on_login_error
+        )
+    
+    def on_login_done(self, hasil):
+        success, result = hasil
+        self.btn_login.config(state=tk.NORMAL)
+        self.root.config(cursor='')
         
         if success:
-            # Validasi role sesuai dengan role yang dipilih
-            user_role = result['role']
-            if user_role != self.role:
-                messagebox.showerror(
-                    "Error",
-                    f"Akun '{username}' adalah akun {user_role.upper()}, "
-                    f"bukan akun {self.role.upper()}\n\n"
-                    f"Gunakan akun yang sesuai dengan role yang dipilih."
-                )
-                return
-            
             self.current_user = result
             self.root.destroy()
         else:
             messagebox.showerror("Login Gagal", result)
     
+    def on_login_error(self, exc):
+        self.btn_login.config(state=tk.NORMAL)
+        self.root.config(cursor='')
+        self.worker.show_error(exc)
+    
+    def on_destroy(self, event):
+        if event.widget is self.root:
+            self.worker.shutdown()
+    
     def open_register(self):
         """Buka window register akun baru"""
         from auth.register import RegisterWindow
         register_window = tk.Toplevel(self.root)
-        register = RegisterWindow(register_window)
+        register = RegisterWindow(register_window, self.worker)
         register_window.wait_window()
         
         # Jika registrasi sukses, clear form dan fokus ke username
@@ -4,13 +4,14 @@ Register window untuk SIJAtools
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from database.db import DatabaseManager
+from services.account import AccountService, validasi_register
+from services.worker import DbWorker
 
 
 class RegisterWindow:
     """Window untuk register akun user baru"""
     
-    def __init__(self, root):
+    def __init__(self, root, worker=None):
         self.root = root
         self.root.title("SIJAtools – Daftar Akun User")
         self.root.geometry("450x360")
@@ -24,7 +25,9 @@ class RegisterWindow:
         y = (self.root.winfo_screenheight() // 2) - (height // 2)
         self.root.geometry(f'{width}x{height}+{x}+{y}')
         
-        self.db = DatabaseManager()
+        self.accounts = AccountService()
+        # Hash password (KDF) dijalankan di thread worker
+        self.worker = worker or DbWorker(self.root)
         self.success = False
         
         self.create_widgets()
@@ -77,7 +80,8 @@ class RegisterWindow:
         btn_frame = ttk.Frame(main_frame)
         btn_frame.pack(pady=15)
         
-        ttk.Button(btn_frame, text="Daftar", command=self.do_register).pack(side=tk.LEFT, padx=5)
+        self.btn_daftar = ttk.Button(btn_frame, text="Daftar", command=self.do_register)
+        self.btn_daftar.pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Batal", command=self.root.destroy).pack(side=tk.LEFT, padx=5)
         
         # Instructions
@@ -99,28 +103,32 @@ class RegisterWindow:
         confirm = self.entry_confirm.get().strip()
         
         # Validasi form
-        if not username:
-            messagebox.showerror("Error", "Username tidak boleh kosong")
-            self.entry_username.focus()
+        error = validasi_register(username, password, confirm)
+        if error is not None:
+            field, message = error
+            messagebox.showerror("Error", message)
+            {
+                'username': self.entry_username,
+                'password': self.entry_password,
+                'confirm': self.entry_confirm,
+            }[field].focus()
             return
         
-        if len(username) < 3:
-            messagebox.showerror("Error", "Username minimal 3 karakter")
-            self.entry_username.focus()
+        if str(self.btn_daftar['state']) == tk.DISABLED:
             return
         
-        if not password:
-            messagebox.showerror("Error", "Password tidak boleh kosong")
-            self.entry_password.focus()
-            return
-        
-        if password != confirm:
-            messagebox.showerror("Error", "Password dan konfirmasi tidak sama")
-            self.entry_confirm.focus()
-            return
-        
-        # Proses register via database
-        success, message = self.db.register(username, password)
+        # Proses register via account service
+        self.btn_daftar.config(state=tk.DISABLED)
+        self.root.config(cursor='watch')
+        self.worker.submit(
+            self.accounts.register, username, password, confirm,
+            on_done=self.on_register_done, on_error=self.on_register_error
+        )
+    
+    def on_register_done(self, hasil):
+        success, message = hasil
+        self.btn_daftar.config(state=tk.NORMAL)
+        self.root.config(cursor='')
         
         if success:
             messagebox.showinfo("Berhasil", message)
@@ -128,3 +136,8 @@ class RegisterWindow:
             self.root.destroy()
         else:
             messagebox.showerror("Registrasi Gagal", message)
+    
+    def on_register_error(self, exc):
+        self.btn_daftar.config(state=tk.NORMAL)
+        self.root.config(cursor='')
+        self.worker.show_error(exc)
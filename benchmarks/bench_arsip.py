@@ -0,0 +1,94 @@
+"""
+Benchmark arsip peminjaman SIJAtools
+Mengisi riwayat bertahun-tahun, lalu membandingkan query layar aktif dan
+riwayat sebelum dan sesudah peminjaman lama dipindah ke peminjaman_arsip.
+Statistik dashboard dicek tidak berubah oleh proses arsip.
+
+Jalankan dari root project:
+    python benchmarks/bench_arsip.py [jumlah_peminjaman]   (default: 500000)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db import DatabaseManager
+
+JUMLAH_ALAT = 200
+JUMLAH_PEMINJAM = 500
+ULANG = 5
+
+
+def isi_riwayat(conn, jumlah):
+    # Tersebar ~5 tahun ke belakang; 1 dari 50 masih dipinjam
+    conn.execute('''
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?3)
+        INSERT INTO peminjaman (user_id, nama_peminjam, id_alat, jumlah, status,
+                                tanggal_peminjaman, tanggal_pengembalian)
+        SELECT i % ?1, 'siswa' || (i % ?1), 1 + i % ?2, 1,
+               CASE WHEN i % 50 = 0 THEN 'Dipinjam' ELSE 'Dikembalikan' END,
+               datetime('now', '-' || (i % 1800) || ' days'),
+               CASE WHEN i % 50 = 0 THEN NULL
+                    ELSE datetime('now', '-' || (i % 1800) || ' days', '+2 days') END
+        FROM n
+    ''', (JUMLAH_PEMINJAM, JUMLAH_ALAT, jumlah))
+    conn.commit()
+
+
+def ukur_ms(fungsi):
+    terbaik = None
+    for _ in range(ULANG):
+        mulai = time.perf_counter()
+        fungsi()
+        durasi = (time.perf_counter() - mulai) * 1000
+        terbaik = durasi if terbaik is None else min(terbaik, durasi)
+    return terbaik
+
+
+def ukur_query(db):
+    return {
+        'peminjaman aktif': ukur_ms(lambda: db.get_peminjaman_by_status('Dipinjam')),
+        'riwayat user (halaman 1)': ukur_ms(lambda: db.get_peminjaman_page(user_id=7)),
+        'riwayat user + arsip': ukur_ms(lambda: db.get_peminjaman_page(user_id=7, termasuk_arsip=True)),
+        'riwayat semua (halaman 1)': ukur_ms(lambda: db.get_peminjaman_page()),
+    }
+
+
+def main():
+    jumlah = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'arsip.db'))
+        conn = db.get_connection()
+        conn.executemany(
+            'INSERT INTO alat (nama_alat, stok) VALUES (?, ?)',
+            ((f"Alat {i:04d}", 1000) for i in range(JUMLAH_ALAT))
+        )
+        isi_riwayat(conn, jumlah)
+        statistik = db.get_statistik_alat()
+        
+        sebelum = ukur_query(db)
+        mulai = time.perf_counter()
+        success, dipindah = db.arsipkan_peminjaman()
+        arsip_s = time.perf_counter() - mulai
+        if not success:
+            print(f"GAGAL: {dipindah}")
+            sys.exit(1)
+        sesudah = ukur_query(db)
+        
+        utama, arsip = db.get_jumlah_arsip()
+        print(f"Benchmark arsip ({jumlah:,} peminjaman, best of {ULANG})")
+        print(f"  {dipindah:,} baris diarsipkan dalam {arsip_s:.1f} s "
+              f"(peminjaman: {utama:,}, arsip: {arsip:,})")
+        print(f"  {'query':<28} {'sebelum':>10} {'sesudah':>10}")
+        for nama, ms in sebelum.items():
+            print(f"  {nama:<28} {ms:7.2f} ms {sesudah[nama]:7.2f} ms")
+        if db.get_statistik_alat() != statistik:
+            print("  GAGAL: statistik berubah setelah arsip")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark autocomplete alat SIJAtools
+Membandingkan cara lama (membuat label semua alat lalu menyaring per
+ketikan) dengan PrefixIndex terurut (bisect + N item teratas), serta
+biaya memperbarui satu alat tanpa membangun ulang seluruh index.
+
+Jalankan dari root project:
+    python benchmarks/bench_autocomplete.py [jumlah_alat]   (default: 50000)
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui.components import PrefixIndex
+
+PREFIX = ('m', 'ob', 'obeng p', 'solder 01', 'xyz')
+LIMIT = 10
+ULANG = 20
+
+
+def format_label(item):
+    return f"{item[1]} (Stok: {item[2]})"
+
+
+def cara_lama(items, prefix):
+    # Semua label dibuat ulang, lalu disaring dengan startswith
+    prefix = prefix.casefold()
+    labels = [format_label(item) for item in items]
+    return [label for label in labels if label.casefold().startswith(prefix)][:LIMIT]
+
+
+def ukur_ms(fungsi):
+    mulai = time.perf_counter()
+    for _ in range(ULANG):
+        hasil = fungsi()
+    return (time.perf_counter() - mulai) * 1000 / ULANG, hasil
+
+
+def main():
+    jumlah_alat = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    jenis = ('Multimeter Digital', 'Obeng Plus', 'Obeng Minus', 'Solder Listrik', 'Tang Potong')
+    items = [(i, f"{jenis[i % len(jenis)]} {i:05d}", 10, '') for i in range(1, jumlah_alat + 1)]
+    random.shuffle(items)
+    
+    bangun_ms, index = ukur_ms(lambda: PrefixIndex(items))
+    print(f"Benchmark autocomplete ({jumlah_alat:,} alat, rata-rata {ULANG}x)")
+    print(f"  bangun index: {bangun_ms:.2f} ms")
+    print(f"  {'prefix':<12} {'lama':>10} {'index':>10}")
+    for prefix in PREFIX:
+        lama_ms, lama = ukur_ms(lambda: cara_lama(sorted(items, key=lambda item: item[1].casefold()), prefix))
+        index_ms, hasil = ukur_ms(lambda: [format_label(item) for item in index.search(prefix, LIMIT)])
+        if hasil != lama:
+            print(f"  GAGAL: hasil index berbeda untuk prefix {prefix!r}")
+            sys.exit(1)
+        print(f"  {prefix!r:<12} {lama_ms:7.2f} ms {index_ms:7.3f} ms")
+    
+    item = items[0]
+    ubah_ms, _ = ukur_ms(lambda: index.put((item[0], item[1], item[2] - 1, '')))
+    print(f"  perbarui 1 alat: {ubah_ms:.3f} ms (vs bangun ulang {bangun_ms:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark import/export CSV SIJAtools
+Mengukur throughput import alat (executemany, satu transaksi) dan export
+streaming alat/peminjaman untuk jumlah baris besar.
+
+Jalankan dari root project:
+    python benchmarks/bench_bulk_csv.py [jumlah_baris]   (default: 1000000)
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db import DatabaseManager
+
+
+def tulis_csv(path, jumlah_baris):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(('nama_alat', 'stok', 'deskripsi'))
+        for i in range(jumlah_baris):
+            writer.writerow((f"Alat Lab {i:07d}", i % 50, "Import massal"))
+        # Beberapa konflik supaya jalur laporan ikut terukur
+        for i in range(0, min(jumlah_baris, 1000), 100):
+            writer.writerow((f"Alat Lab {i:07d}", 1, "duplikat"))
+
+
+def ukur(label, jumlah, fungsi):
+    mulai = time.perf_counter()
+    hasil = fungsi()
+    durasi = time.perf_counter() - mulai
+    print(f"  {label:<22} {durasi:8.2f} detik  {jumlah / durasi:12,.0f} baris/detik")
+    return hasil
+
+
+def main():
+    jumlah_baris = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        sumber = os.path.join(tmp, 'alat.csv')
+        tulis_csv(sumber, jumlah_baris)
+        db = DatabaseManager(os.path.join(tmp, 'bulk.db'))
+        
+        print(f"Benchmark CSV ({jumlah_baris:,} baris)")
+        success, hasil = ukur("import alat", jumlah_baris, lambda: db.import_alat_csv(sumber))
+        if not success:
+            print(hasil)
+            sys.exit(1)
+        print(f"    berhasil={hasil['berhasil']:,} konflik={len(hasil['konflik'])}")
+        
+        # Isi peminjaman langsung agar export peminjaman punya data sebanyak alat
+        conn = db.get_connection()
+        conn.execute('''
+            INSERT INTO peminjaman (nama_peminjam, id_alat, jumlah, status)
+            SELECT 'bench', id, 1, 'Dikembalikan' FROM alat
+        ''')
+        conn.commit()
+        
+        ukur("export alat", jumlah_baris, lambda: db.export_alat_csv(os.path.join(tmp, 'out_alat.csv')))
+        ukur("export peminjaman", jumlah_baris,
+             lambda: db.export_peminjaman_csv(os.path.join(tmp, 'out_peminjaman.csv')))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Stress test multi-proses untuk peminjaman dan pengembalian SIJAtools
+Beberapa proses meminjam alat yang sama secara bersamaan. Di akhir
+diperiksa bahwa stok tidak pernah negatif dan stok + unit yang masih
+dipinjam sama dengan stok awal.
+
+Jalankan dari root project:
+    python benchmarks/bench_concurrent_pinjam.py [jumlah_proses] [operasi_per_proses]
+"""
+
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db import DatabaseManager
+
+STOK_AWAL = 20
+JUMLAH_ALAT = 3
+# User default 'user1' dari migrasi awal
+ID_USER = 2
+# Jeda agar proses spawn selesai start sebelum operasi dimulai
+SIAP_DETIK = 2
+
+
+def pekerja(db_name, nomor, jumlah_operasi, hasil, siap):
+    db = DatabaseManager(db_name)
+    alat_ids = [row[0] for row in db.get_all_alat()]
+    # Waktu start proses spawn tidak ikut terukur
+    siap.wait()
+    rng = random.Random(nomor)
+    dipinjam = []
+    commit = gagal = 0
+    error = None
+    try:
+        for _ in range(jumlah_operasi):
+            if dipinjam and rng.random() < 0.45:
+                id_peminjaman = dipinjam.pop(rng.randrange(len(dipinjam)))
+                success, msg = db.kembalikan_alat(id_peminjaman)
+            else:
+                success, msg = db.tambah_peminjaman(ID_USER, rng.choice(alat_ids), rng.randint(1, 3))
+                if success:
+                    dipinjam.append(int(msg.rsplit(' ', 1)[1].rstrip(')')))
+            if success:
+                commit += 1
+            elif msg.startswith("Error"):
+                raise RuntimeError(msg)
+            else:
+                gagal += 1
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        # Selalu kirim hasil supaya proses induk tidak menunggu selamanya
+        hasil.put((commit, gagal, error))
+
+def main():
+    jumlah_proses = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    jumlah_operasi = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'stress.db')
+        db = DatabaseManager(db_name)
+        for i in range(JUMLAH_ALAT):
+            db.tambah_alat(f"Alat Rebutan {i}", STOK_AWAL)
+
+        # spawn: proses pekerja membuka koneksi sendiri, tidak mewarisi
+        # koneksi pool milik proses induk
+        ctx = multiprocessing.get_context('spawn')
+        hasil = ctx.Queue()
+        siap = ctx.Event()
+        proses = [
+            ctx.Process(target=pekerja, args=(db_name, n, jumlah_operasi, hasil, siap))
+            for n in range(jumlah_proses)
+        ]
+        for p in proses:
+            p.start()
+        # Semua proses mulai bersamaan setelah selesai import dan membuka database
+        time.sleep(SIAP_DETIK)
+        mulai = time.perf_counter()
+        siap.set()
+        ringkasan = [hasil.get() for _ in proses]
+        for p in proses:
+            p.join()
+        durasi = time.perf_counter() - mulai
+
+        errors = [error for _, _, error in ringkasan if error]
+        gagal_proses = [p.exitcode for p in proses if p.exitcode != 0]
+        if errors or gagal_proses:
+            for error in errors:
+                print(f"  GAGAL: {error}")
+            print(f"  {len(gagal_proses)} proses keluar dengan error")
+            sys.exit(1)
+
+        total_commit = sum(c for c, _, _ in ringkasan)
+        total_ditolak = sum(g for _, g, _ in ringkasan)
+        print(f"{jumlah_proses} proses x {jumlah_operasi} operasi dalam {durasi:.2f} detik")
+        print(f"  commit berhasil : {total_commit} ({total_commit / durasi:.1f} commit/detik)")
+        print(f"  ditolak (stok)  : {total_ditolak}")
+
+        konsisten = True
+        for id_alat, nama, stok, _ in db.get_all_alat():
+            conn = db.get_connection()
+            aktif = conn.execute(
+                "SELECT COALESCE(SUM(jumlah), 0) FROM peminjaman WHERE id_alat=? AND status='Dipinjam'",
+                (id_alat,)
+            ).fetchone()[0]
+            ok = stok >= 0 and stok + aktif == STOK_AWAL
+            konsisten = konsisten and ok
+            print(f"  {nama}: stok={stok} dipinjam={aktif} {'OK' if ok else 'TIDAK KONSISTEN'}")
+
+    if not konsisten:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
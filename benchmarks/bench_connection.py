@@ -0,0 +1,71 @@
+"""
+Benchmark koneksi database SIJAtools
+Membandingkan ops/detik koneksi baru per operasi (perilaku lama)
+dengan koneksi persistent dari ConnectionPool
+
+Jalankan dari root project:
+    python benchmarks/bench_connection.py [jumlah_operasi]
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import close_all_pools
+from database.db import DatabaseManager
+
+# User default 'user1' dari migrasi awal
+ID_USER = 2
+
+
+class DatabaseManagerLama(DatabaseManager):
+    """DatabaseManager dengan perilaku lama: connect/close tiap operasi"""
+
+    def get_connection(self):
+        return sqlite3.connect(self.db_name)
+
+
+def siapkan_data(db, jumlah_alat=50):
+    for i in range(jumlah_alat):
+        db.tambah_alat(f"Alat {i:03d}", 1000, "benchmark")
+
+
+def ukur(db, jumlah_operasi):
+    """Campuran operasi seperti saat jam sibuk: baca stok, pinjam, kembalikan"""
+    alat = db.get_all_alat()
+    mulai = time.perf_counter()
+    for i in range(jumlah_operasi):
+        id_alat = alat[i % len(alat)][0]
+        db.get_stok(id_alat)
+        success, msg = db.tambah_peminjaman(ID_USER, id_alat, 1)
+        id_peminjaman = int(msg.rsplit(' ', 1)[1].rstrip(')'))
+        db.kembalikan_alat(id_peminjaman)
+        db.get_peminjaman_by_status('Dipinjam')
+    durasi = time.perf_counter() - mulai
+    return jumlah_operasi / durasi
+
+
+def main():
+    jumlah_operasi = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    hasil = {}
+    for nama, cls in (('lama (connect per operasi)', DatabaseManagerLama),
+                      ('pool (koneksi persistent)', DatabaseManager)):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = cls(os.path.join(tmp, 'bench.db'))
+            siapkan_data(db)
+            hasil[nama] = ukur(db, jumlah_operasi)
+            close_all_pools()
+
+    print(f"Benchmark koneksi ({jumlah_operasi} transaksi pinjam+kembali)")
+    for nama, ops in hasil.items():
+        print(f"  {nama:<30} {ops:10.1f} transaksi/detik")
+    lama, baru = hasil.values()
+    print(f"  speedup: {baru / lama:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
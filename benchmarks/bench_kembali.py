@@ -0,0 +1,62 @@
+"""
+Benchmark pengembalian massal SIJAtools
+Membandingkan mengembalikan N peminjaman satu per satu (satu transaksi
+per peminjaman) dengan kembalikan_banyak (satu transaksi, stok alat
+ditambah sekali per alat). Stok akhir kedua cara dicek harus sama.
+
+Jalankan dari root project:
+    python benchmarks/bench_kembali.py [jumlah_peminjaman ...]   (default: 10 50 200)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import close_all_pools
+from database.db import DatabaseManager
+
+JUMLAH_ALAT = 8
+# User default 'user1' dari migrasi awal
+ID_USER = 2
+
+
+def siapkan(path, jumlah):
+    db = DatabaseManager(path)
+    for i in range(JUMLAH_ALAT):
+        db.tambah_alat(f"Alat {i}", 10_000)
+    ids = []
+    for i in range(jumlah):
+        success, msg = db.tambah_peminjaman(ID_USER, 1 + i % JUMLAH_ALAT, 1)
+        ids.append(int(msg.rsplit(' ', 1)[1].rstrip(')')))
+    return db, ids
+
+
+def main():
+    ukuran = [int(x) for x in sys.argv[1:]] or [10, 50, 200]
+    print("Benchmark pengembalian massal")
+    print(f"  {'peminjaman':>10} {'satu per satu':>14} {'kembalikan_banyak':>18}")
+    for jumlah in ukuran:
+        with tempfile.TemporaryDirectory() as tmp:
+            db, ids = siapkan(os.path.join(tmp, 'satu.db'), jumlah)
+            mulai = time.perf_counter()
+            for id_peminjaman in ids:
+                db.kembalikan_alat(id_peminjaman)
+            satu_ms = (time.perf_counter() - mulai) * 1000
+            stok_satu = db.get_all_alat()
+
+            db, ids = siapkan(os.path.join(tmp, 'batch.db'), jumlah)
+            mulai = time.perf_counter()
+            success, result = db.kembalikan_banyak(ids)
+            batch_ms = (time.perf_counter() - mulai) * 1000
+            if not success or result['gagal'] or db.get_all_alat() != stok_satu:
+                print("  GAGAL: hasil kembalikan_banyak berbeda")
+                sys.exit(1)
+            print(f"  {jumlah:>10} {satu_ms:11.1f} ms {batch_ms:15.1f} ms")
+            close_all_pools()
+
+
+if __name__ == "__main__":
+    main()
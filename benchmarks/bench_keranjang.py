@@ -0,0 +1,76 @@
+"""
+Benchmark keranjang peminjaman SIJAtools
+Membandingkan meminjam satu kit berisi N alat satu per satu (satu
+transaksi per alat) dengan tambah_peminjaman_banyak (satu transaksi
+untuk seluruh keranjang). Stok akhir kedua cara dicek harus sama.
+
+Jalankan dari root project:
+    python benchmarks/bench_keranjang.py [jumlah_alat_per_kit ...]   (default: 1 8 32)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import close_all_pools
+from database.db import DatabaseManager
+
+JUMLAH_KIT = 50
+# User default 'user1' dari migrasi awal
+ID_USER = 2
+
+
+def siapkan(path, ukuran_kit):
+    db = DatabaseManager(path)
+    for i in range(ukuran_kit):
+        db.tambah_alat(f"Alat {i}", JUMLAH_KIT)
+    return db, [(1 + i, 1) for i in range(ukuran_kit)]
+
+
+def hitung_transaksi(db):
+    jumlah = [0]
+
+    def trace(sql):
+        if sql.startswith('BEGIN'):
+            jumlah[0] += 1
+    db.get_connection().set_trace_callback(trace)
+    return jumlah
+
+
+def main():
+    ukuran = [int(x) for x in sys.argv[1:]] or [1, 8, 32]
+    print(f"Benchmark keranjang ({JUMLAH_KIT} kit dipinjam)")
+    print(f"  {'alat/kit':>8} {'satu per satu':>14} {'keranjang':>12} {'transaksi':>12}")
+    for ukuran_kit in ukuran:
+        with tempfile.TemporaryDirectory() as tmp:
+            db, kit = siapkan(os.path.join(tmp, 'satu.db'), ukuran_kit)
+            transaksi_satu = hitung_transaksi(db)
+            mulai = time.perf_counter()
+            for _ in range(JUMLAH_KIT):
+                for id_alat, jumlah in kit:
+                    db.tambah_peminjaman(ID_USER, id_alat, jumlah)
+            satu_ms = (time.perf_counter() - mulai) * 1000 / JUMLAH_KIT
+            stok_satu = db.get_all_alat()
+
+            db, kit = siapkan(os.path.join(tmp, 'keranjang.db'), ukuran_kit)
+            transaksi_keranjang = hitung_transaksi(db)
+            mulai = time.perf_counter()
+            for _ in range(JUMLAH_KIT):
+                success, result = db.tambah_peminjaman_banyak(ID_USER, kit)
+                if not success:
+                    print(f"  GAGAL: {result}")
+                    sys.exit(1)
+            keranjang_ms = (time.perf_counter() - mulai) * 1000 / JUMLAH_KIT
+            if db.get_all_alat() != stok_satu:
+                print("  GAGAL: stok akhir berbeda")
+                sys.exit(1)
+            print(f"  {ukuran_kit:>8} {satu_ms:11.2f} ms {keranjang_ms:9.2f} ms "
+                  f"{transaksi_satu[0] // JUMLAH_KIT:>5} vs {transaksi_keranjang[0] // JUMLAH_KIT}")
+            close_all_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark latensi login SIJAtools per setting cost KDF
+Untuk menimbang keamanan hash password vs responsivitas login.
+Login berjalan di thread worker, tapi user tetap menunggu selama ini.
+
+Jalankan dari root project:
+    python benchmarks/bench_login.py [jumlah_ulang]   (default: 5)
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db import DatabaseManager
+from utils import password
+
+SETTINGS = [
+    {'algoritma': 'pbkdf2_sha256', 'iterasi': 100_000},
+    {'algoritma': 'pbkdf2_sha256', 'iterasi': 240_000},
+    {'algoritma': 'pbkdf2_sha256', 'iterasi': 600_000},
+    {'algoritma': 'scrypt', 'n': 2 ** 14, 'r': 8, 'p': 1},
+    {'algoritma': 'scrypt', 'n': 2 ** 15, 'r': 8, 'p': 1},
+]
+
+
+def ukur_ms(fungsi, ulang, sebelum=None):
+    hasil = []
+    for _ in range(ulang):
+        if sebelum:
+            sebelum()
+        mulai = time.perf_counter()
+        fungsi()
+        hasil.append((time.perf_counter() - mulai) * 1000)
+    return statistics.median(hasil)
+
+
+def main():
+    ulang = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    default = dict(password.KDF_DEFAULT)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'login.db'))
+        print(f"Benchmark login (median {ulang}x)")
+        print(f"  {'setting':<32} {'tanpa cache':>12} {'dengan cache':>13}")
+        for i, setting in enumerate(SETTINGS):
+            password.configure(**{**default, **setting})
+            username = f"bench{i}"
+            db.register(username, 'rahasia123')
+            
+            login = lambda: db.login(username, 'rahasia123')
+            dingin = ukur_ms(login, ulang, sebelum=password.clear_cache)
+            hangat = ukur_ms(login, ulang)
+            label = ' '.join([setting['algoritma']] + [f"{k}={v}" for k, v in setting.items() if k != 'algoritma'])
+            print(f"  {label:<32} {dingin:9.1f} ms {hangat:10.3f} ms")
+    password.configure(**default)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Regression check query plan + timing untuk lookup peminjaman SIJAtools
+Untuk setiap ukuran tabel, SQL yang benar-benar dijalankan oleh
+DatabaseManager ditangkap lewat trace callback, lalu dipastikan
+EXPLAIN QUERY PLAN memakai index (tanpa SCAN tabel / TEMP B-TREE sort).
+Exit code 1 jika ada query yang tidak memakai index yang diharapkan.
+
+Jalankan dari root project:
+    python benchmarks/bench_query_plan.py [ukuran ...]
+    (default: 10000 100000 1000000)
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import close_all_pools
+from database.db import DatabaseManager
+
+JUMLAH_ALAT = 200
+JUMLAH_PEMINJAM = 2000
+
+# (nama method, argumen, index yang wajib dipakai)
+QUERIES = (
+    ('get_all_peminjaman', (), 'idx_peminjaman_tanggal'),
+    ('get_peminjaman_by_status', ('Dipinjam',), 'idx_peminjaman_status_tanggal'),
+    ('get_peminjaman_by_user', (42,), 'idx_peminjaman_user_tanggal'),
+    ('get_peminjaman_aktif_user', (42,), 'COVERING INDEX idx_peminjaman_aktif_user'),
+    ('get_peminjaman_terlambat', ('2025-03-01 00:00:00', '2025-03-02 00:00:00'), 'idx_peminjaman_jatuh_tempo'),
+)
+
+
+def isi_data(db, jumlah_baris):
+    rng = random.Random(jumlah_baris)
+    conn = db.get_connection()
+    conn.executemany(
+        'INSERT INTO alat (nama_alat, stok, deskripsi) VALUES (?, ?, ?)',
+        ((f"Alat {i}", 100, '') for i in range(JUMLAH_ALAT))
+    )
+
+    def baris():
+        for i in range(jumlah_baris):
+            status = 'Dipinjam' if rng.random() < 0.05 else 'Dikembalikan'
+            tanggal = f"20{rng.randint(20, 26)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 10:00:00"
+            user_id = rng.randrange(JUMLAH_PEMINJAM)
+            yield (user_id, f"peminjam{user_id}", rng.randint(1, JUMLAH_ALAT), 1, status, tanggal)
+
+    conn.executemany(
+        'INSERT INTO peminjaman (user_id, nama_peminjam, id_alat, jumlah, status, tanggal_peminjaman) '
+        'VALUES (?, ?, ?, ?, ?, ?)',
+        baris()
+    )
+    conn.execute('''
+        UPDATE peminjaman SET tanggal_jatuh_tempo = datetime(tanggal_peminjaman, '+7 days')
+        WHERE status = 'Dipinjam'
+    ''')
+    conn.commit()
+    conn.execute('ANALYZE')
+
+
+def tangkap_sql(db, method, args):
+    """Jalankan method dan kembalikan SQL (dengan parameter terisi) yang dieksekusi"""
+    conn = db.get_connection()
+    captured = []
+    conn.set_trace_callback(captured.append)
+    try:
+        getattr(db, method)(*args)
+    finally:
+        conn.set_trace_callback(None)
+    return [sql for sql in captured if sql.lstrip().upper().startswith('SELECT')][-1]
+
+
+def main():
+    ukuran = [int(x) for x in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    gagal = False
+    for jumlah_baris in ukuran:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseManager(os.path.join(tmp, 'plan.db'))
+            isi_data(db, jumlah_baris)
+            conn = db.get_connection()
+            print(f"== {jumlah_baris:,} baris peminjaman")
+            for method, args, index in QUERIES:
+                sql = tangkap_sql(db, method, args)
+                plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql)]
+                ok = (any(index in detail for detail in plan)
+                      and not any('TEMP B-TREE' in detail for detail in plan))
+                gagal = gagal or not ok
+
+                mulai = time.perf_counter()
+                jumlah_hasil = len(getattr(db, method)(*args))
+                durasi = (time.perf_counter() - mulai) * 1000
+                print(f"  {method:<26} {durasi:9.1f} ms  {jumlah_hasil:>9,} baris  "
+                      f"{'OK' if ok else 'PLAN REGRESSION'}")
+                if not ok:
+                    for detail in plan:
+                        print(f"      {detail}")
+            close_all_pools()
+    if gagal:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark rekonsiliasi stok SIJAtools
+Mengisi buku mutasi_stok berjuta baris (pinjam/kembali bergantian per
+alat), lalu mengukur cek cepat (mutasi terakhir per alat lewat index)
+dibanding cek penuh (keseimbangan seluruh mutasi per alat), dan mengecek
+selisih yang sengaja dibuat benar-benar terdeteksi.
+
+Jalankan dari root project:
+    python benchmarks/bench_rekonsiliasi.py [jumlah_mutasi]   (default: 2000000)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db import DatabaseManager
+
+JUMLAH_ALAT = 2_000
+STOK_AWAL = 100
+
+
+def isi_mutasi(conn, jumlah):
+    # Per alat: mutasi awal, lalu pinjam 1 / kembali 1 bergantian, sehingga
+    # saldo akhir = STOK_AWAL (genap) atau STOK_AWAL - 1 (ganjil)
+    conn.executemany(
+        'INSERT INTO alat (nama_alat, stok) VALUES (?, ?)',
+        ((f"Alat {i:05d}", STOK_AWAL) for i in range(JUMLAH_ALAT))
+    )
+    conn.execute('''
+        INSERT INTO mutasi_stok (id_alat, jenis, perubahan, saldo, total)
+        SELECT id, 'awal', stok, stok, stok FROM alat
+    ''')
+    conn.execute('''
+        WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < ?1 - 1)
+        INSERT INTO mutasi_stok (id_alat, jenis, perubahan, saldo, total)
+        SELECT 1 + i % ?2,
+               CASE WHEN (i / ?2) % 2 = 0 THEN 'pinjam' ELSE 'kembali' END,
+               CASE WHEN (i / ?2) % 2 = 0 THEN -1 ELSE 1 END,
+               ?3 - 1 + (i / ?2) % 2, ?3
+        FROM n
+    ''', (jumlah, JUMLAH_ALAT, STOK_AWAL))
+    # Alat dengan mutasi terakhir 'pinjam' punya satu peminjaman aktif
+    conn.execute('''
+        INSERT INTO peminjaman (user_id, nama_peminjam, id_alat, jumlah, status)
+        SELECT 2, 'user1', m.id_alat, 1, 'Dipinjam'
+        FROM mutasi_stok m
+        WHERE m.id = (SELECT MAX(id) FROM mutasi_stok WHERE id_alat = m.id_alat)
+          AND m.jenis = 'pinjam'
+    ''')
+    conn.execute('''
+        UPDATE alat SET stok = (SELECT saldo FROM mutasi_stok
+                                WHERE id = (SELECT MAX(id) FROM mutasi_stok WHERE id_alat = alat.id))
+    ''')
+    conn.commit()
+
+
+def ukur(fungsi):
+    mulai = time.perf_counter()
+    hasil = fungsi()
+    return time.perf_counter() - mulai, hasil
+
+
+def main():
+    jumlah = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'rekonsiliasi.db'))
+        conn = db.get_connection()
+        isi_s, _ = ukur(lambda: isi_mutasi(conn, jumlah))
+        print(f"Benchmark rekonsiliasi ({JUMLAH_ALAT:,} alat, {jumlah:,} mutasi; isi data {isi_s:.1f} s)")
+
+        cepat_s, cepat = ukur(lambda: db.rekonsiliasi_stok())
+        penuh_s, penuh = ukur(lambda: db.rekonsiliasi_stok(penuh=True))
+        print(f"  cek cepat: {cepat_s * 1000:8.1f} ms  ({len(cepat['selisih'])} selisih)")
+        print(f"  cek penuh: {penuh_s * 1000:8.1f} ms  ({len(penuh['tidak_seimbang'])} tidak seimbang)")
+        if cepat['selisih'] or penuh['selisih'] or penuh['tidak_seimbang']:
+            print("  GAGAL: data konsisten dilaporkan selisih")
+            sys.exit(1)
+
+        # Perubahan stok tanpa mutasi harus terdeteksi oleh cek cepat
+        conn.execute('UPDATE alat SET stok = stok - 1 WHERE id = 7')
+        conn.commit()
+        rusak_s, rusak = ukur(lambda: db.rekonsiliasi_stok())
+        if [row[0] for row in rusak['selisih']] != [7]:
+            print("  GAGAL: selisih stok alat 7 tidak terdeteksi")
+            sys.exit(1)
+        print(f"  selisih buatan terdeteksi dalam {rusak_s * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark antrean reservasi SIJAtools
+Skenario: N user menunggu satu alat yang stoknya habis, lalu unit
+dikembalikan satu per satu. Dibandingkan:
+- coba ulang: setiap putaran semua user yang belum dapat memanggil
+  tambah_peminjaman lagi (transaksi tulis yang hampir selalu gagal)
+- reservasi: tiap user satu tambah_reservasi, unit yang kembali langsung
+  dialokasikan ke kepala antrean di transaksi pengembalian
+Juga diukur waktu kembalikan_alat dengan antrean panjang di alat lain.
+
+Jalankan dari root project:
+    python benchmarks/bench_reservasi.py [jumlah_user]   (default: 200)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import close_all_pools
+from database.db import DatabaseManager
+
+ANTREAN_LAIN = 50_000
+
+
+def siapkan(path, jumlah_user):
+    db = DatabaseManager(path)
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO users (username, password, role) VALUES (?, 'x', 'user')",
+        ((f"siswa{i}",) for i in range(jumlah_user))
+    )
+    conn.commit()
+    user_ids = [row[0] for row in conn.execute("SELECT id FROM users WHERE username LIKE 'siswa%' ORDER BY id")]
+    db.tambah_alat("Osiloskop", jumlah_user)
+    # Semua unit sedang dipinjam oleh satu user lain
+    pinjaman = []
+    for _ in range(jumlah_user):
+        success, msg = db.tambah_peminjaman(1, 1, 1)
+        pinjaman.append(int(msg.rsplit(' ', 1)[1].rstrip(')')))
+    return db, user_ids, pinjaman
+
+
+def hitung_transaksi(db):
+    conn = db.get_connection()
+    jumlah = [0]
+
+    def trace(sql):
+        if sql.startswith('BEGIN'):
+            jumlah[0] += 1
+    conn.set_trace_callback(trace)
+    return jumlah
+
+
+def coba_ulang(db, user_ids, pinjaman):
+    menunggu = list(user_ids)
+    for id_peminjaman in pinjaman:
+        db.kembalikan_alat(id_peminjaman)
+        sisa = []
+        for user_id in menunggu:
+            success, _ = db.tambah_peminjaman(user_id, 1, 1)
+            if not success:
+                sisa.append(user_id)
+        menunggu = sisa
+
+
+def reservasi(db, user_ids, pinjaman):
+    for user_id in user_ids:
+        db.tambah_reservasi(user_id, 1, 1)
+    for id_peminjaman in pinjaman:
+        db.kembalikan_alat(id_peminjaman)
+
+
+def main():
+    jumlah_user = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"Benchmark reservasi ({jumlah_user} user menunggu {jumlah_user} unit)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for nama, skenario in (('coba ulang', coba_ulang), ('reservasi', reservasi)):
+            db, user_ids, pinjaman = siapkan(os.path.join(tmp, f'{skenario.__name__}.db'), jumlah_user)
+            transaksi = hitung_transaksi(db)
+            mulai = time.perf_counter()
+            skenario(db, user_ids, pinjaman)
+            durasi = time.perf_counter() - mulai
+            db.get_connection().set_trace_callback(None)
+            dapat = db.get_connection().execute(
+                "SELECT COUNT(DISTINCT user_id) FROM peminjaman WHERE status = 'Dipinjam'"
+            ).fetchone()[0]
+            print(f"  {nama:<11} {durasi * 1000:9.1f} ms  {transaksi[0]:>7,} transaksi  {dapat} user dapat alat")
+            close_all_pools()
+
+        # Antrean panjang di alat lain tidak memperlambat pengembalian
+        db, user_ids, pinjaman = siapkan(os.path.join(tmp, 'antrean.db'), jumlah_user)
+        db.tambah_alat("Solder", 1)
+        conn = db.get_connection()
+        conn.executemany(
+            'INSERT INTO reservasi (user_id, id_alat, jumlah) VALUES (?, 2, 1)',
+            ((user_ids[i % len(user_ids)],) for i in range(ANTREAN_LAIN))
+        )
+        conn.commit()
+        mulai = time.perf_counter()
+        for id_peminjaman in pinjaman:
+            db.kembalikan_alat(id_peminjaman)
+        rata_ms = (time.perf_counter() - mulai) * 1000 / len(pinjaman)
+        print(f"  kembalikan_alat dengan {ANTREAN_LAIN:,} reservasi di alat lain: {rata_ms:.2f} ms/pengembalian")
+        close_all_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark pencarian SIJAtools (FTS5 vs LIKE)
+Mengukur waktu cari_alat dan cari_peminjaman (halaman pertama dan kedua)
+untuk katalog dan riwayat besar, dengan index FTS5 dan dengan fallback
+LIKE, serta mengecek kedua jalur memberi hasil yang sama.
+
+Jalankan dari root project:
+    python benchmarks/bench_search.py [jumlah_peminjaman]   (default: 300000)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db import DatabaseManager
+
+JUMLAH_ALAT = 10_000
+JUMLAH_PEMINJAM = 2_000
+KATA_ALAT = ('multi', 'obeng plus', 'solder', 'xyz')
+KATA_PEMINJAM = ('sis', 'siswa1', 'siswa1999', 'budi')
+
+
+def isi_data(db, jumlah_peminjaman):
+    conn = db.get_connection()
+    jenis = ('Multimeter Digital', 'Obeng Plus', 'Obeng Minus', 'Solder Listrik', 'Tang Potong')
+    conn.executemany(
+        'INSERT INTO alat (nama_alat, stok, deskripsi) VALUES (?, ?, ?)',
+        ((f"{jenis[i % len(jenis)]} {i:05d}", 10, "Lab elektronika") for i in range(JUMLAH_ALAT))
+    )
+    conn.execute('''
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+        INSERT INTO peminjaman (nama_peminjam, id_alat, jumlah, status, tanggal_peminjaman)
+        SELECT 'siswa' || (i % ?), 1 + i % ?, 1, 'Dikembalikan',
+               datetime('2024-01-01', '+' || i || ' minutes')
+        FROM n
+    ''', (jumlah_peminjaman, JUMLAH_PEMINJAM, JUMLAH_ALAT))
+    conn.commit()
+
+
+def ukur_ms(fungsi):
+    mulai = time.perf_counter()
+    hasil = fungsi()
+    return (time.perf_counter() - mulai) * 1000, hasil
+
+
+def jalankan(db):
+    hasil = {}
+    for kata in KATA_ALAT:
+        ms, rows = ukur_ms(lambda: db.cari_alat(kata))
+        hasil[('alat', kata)] = rows
+        print(f"    cari_alat {kata!r:<16} {ms:8.2f} ms  {len(rows)} baris")
+    for kata in KATA_PEMINJAM:
+        ms, rows = ukur_ms(lambda: db.cari_peminjaman(kata))
+        ms2, rows2 = 0.0, []
+        if rows:
+            ms2, rows2 = ukur_ms(lambda: db.cari_peminjaman(kata, after=(rows[-1][5], rows[-1][0])))
+        hasil[('peminjaman', kata)] = rows + rows2
+        print(f"    cari_peminjaman {kata!r:<10} {ms:8.2f} ms  halaman 2: {ms2:7.2f} ms")
+    return hasil
+
+
+def main():
+    jumlah_peminjaman = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'search.db'))
+        isi_data(db, jumlah_peminjaman)
+        print(f"Benchmark pencarian ({JUMLAH_ALAT:,} alat, {jumlah_peminjaman:,} peminjaman)")
+        
+        if not db.fts_tersedia():
+            print("  SQLite ini tidak mendukung FTS5, hanya jalur LIKE yang diukur")
+        print("  FTS5:" if db.fts_tersedia() else "  LIKE:")
+        fts = jalankan(db)
+        
+        if db.fts_tersedia():
+            db.pool.fts = False
+            print("  LIKE (tanpa FTS5):")
+            like = jalankan(db)
+            db.pool.fts = None
+            if fts != like:
+                print("  GAGAL: hasil FTS5 berbeda dengan LIKE")
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark waktu startup SIJAtools berdasarkan `python -X importtime`
+Mengukur biaya import modul yang dibutuhkan sebelum frame pertama tampil
+(import main), dan memastikan modul database tidak ikut terimport di jalur
+startup (database disiapkan di background setelah layar role tampil).
+
+Jalankan dari root project:
+    python benchmarks/bench_startup.py [jumlah_ulang]   (default: 5)
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modul berat yang seharusnya tidak diimport sebelum login
+MODUL_TERTUNDA = ('database.db', 'sqlite3', 'services.worker', 'ui.admin_ui', 'ui.user_ui')
+
+
+def importtime(modul):
+    """Jalankan interpreter baru; kembalikan {modul: (self_us, kumulatif_us)}"""
+    proses = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modul}'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    hasil = {}
+    for baris in proses.stderr.splitlines():
+        if not baris.startswith('import time:') or 'self [us]' in baris:
+            continue
+        self_us, kumulatif_us, nama = baris[len('import time:'):].split('|')
+        hasil[nama.strip()] = (int(self_us), int(kumulatif_us))
+    return hasil
+
+
+def main():
+    ulang = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    
+    total = []
+    for _ in range(ulang):
+        hasil = importtime('main')
+        total.append(hasil['main'][1])
+    
+    print(f"Import main (median {ulang}x): {statistics.median(total) / 1000:.1f} ms")
+    print("  10 modul kumulatif terbesar:")
+    terbesar = sorted(hasil.items(), key=lambda item: item[1][1], reverse=True)[:10]
+    for nama, (_, kumulatif_us) in terbesar:
+        print(f"    {nama:<40} {kumulatif_us / 1000:8.1f} ms")
+    
+    ikut = [nama for nama in MODUL_TERTUNDA if nama in hasil]
+    if ikut:
+        print(f"  GAGAL: modul berat ikut diimport saat startup: {', '.join(ikut)}")
+        sys.exit(1)
+    print(f"  OK: {', '.join(MODUL_TERTUNDA)} ditunda sampai dibutuhkan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark query dashboard SIJAtools
+Membandingkan GROUP BY langsung atas seluruh tabel peminjaman dengan
+tabel ringkasan statistik_alat yang dijaga trigger, untuk beberapa
+ukuran riwayat. Hasil kedua jalur juga dicek harus sama.
+
+Jalankan dari root project:
+    python benchmarks/bench_statistik.py [jumlah_alat]   (default: 200)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db import DatabaseManager
+
+UKURAN_RIWAYAT = (10_000, 100_000, 1_000_000)
+ULANG = 5
+
+QUERY_LANGSUNG = '''
+    SELECT a.id, a.nama_alat, a.stok,
+           COUNT(p.id), COALESCE(SUM(p.jumlah), 0),
+           COALESCE(SUM(CASE WHEN p.status = 'Dipinjam' THEN p.jumlah ELSE 0 END), 0),
+           SUM(strftime('%s', p.tanggal_pengembalian) - strftime('%s', p.tanggal_peminjaman))
+               / NULLIF(COUNT(p.tanggal_pengembalian), 0)
+    FROM alat a
+    LEFT JOIN peminjaman p ON p.id_alat = a.id
+    GROUP BY a.id
+    ORDER BY COUNT(p.id) DESC, a.nama_alat
+'''
+
+
+def isi_riwayat(conn, jumlah_alat, sampai, sudah):
+    """Tambah peminjaman sampai total `sampai` baris (trigger ikut berjalan)"""
+    conn.execute('''
+        WITH RECURSIVE n(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+        INSERT INTO peminjaman (nama_peminjam, id_alat, jumlah, status,
+                                tanggal_peminjaman, tanggal_pengembalian)
+        SELECT 'user' || (i % 50), 1 + (i * 7919) % ?, 1 + i % 3,
+               CASE WHEN i % 10 = 0 THEN 'Dipinjam' ELSE 'Dikembalikan' END,
+               datetime('2024-01-01', '+' || (i % 500) || ' hours'),
+               CASE WHEN i % 10 = 0 THEN NULL
+                    ELSE datetime('2024-01-01', '+' || (i % 500 + 1 + i % 72) || ' hours') END
+        FROM n
+    ''', (sudah + 1, sampai, jumlah_alat))
+    conn.commit()
+
+
+def ukur_ms(fungsi):
+    terbaik = None
+    for _ in range(ULANG):
+        mulai = time.perf_counter()
+        hasil = fungsi()
+        durasi = (time.perf_counter() - mulai) * 1000
+        terbaik = durasi if terbaik is None else min(terbaik, durasi)
+    return terbaik, hasil
+
+
+def main():
+    jumlah_alat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'statistik.db'))
+        conn = db.get_connection()
+        conn.executemany(
+            'INSERT INTO alat (nama_alat, stok) VALUES (?, ?)',
+            ((f"Alat {i:04d}", 100) for i in range(jumlah_alat))
+        )
+        conn.commit()
+        
+        print(f"Benchmark statistik dashboard ({jumlah_alat} alat, best of {ULANG})")
+        print(f"  {'riwayat':>10} {'GROUP BY':>12} {'ringkasan':>12} {'speedup':>9}")
+        sudah = 0
+        for ukuran in UKURAN_RIWAYAT:
+            isi_riwayat(conn, jumlah_alat, ukuran, sudah)
+            sudah = ukuran
+            
+            langsung_ms, langsung = ukur_ms(lambda: conn.execute(QUERY_LANGSUNG).fetchall())
+            ringkasan_ms, ringkasan = ukur_ms(db.get_statistik_alat)
+            if langsung != ringkasan:
+                print("  GAGAL: hasil tabel ringkasan berbeda dengan GROUP BY langsung")
+                sys.exit(1)
+            print(f"  {ukuran:>10,} {langsung_ms:9.2f} ms {ringkasan_ms:9.2f} ms "
+                  f"{langsung_ms / ringkasan_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark pemantau perubahan SIJAtools
+Dua koneksi ke file yang sama mewakili dua PC lab. Diukur biaya satu cek
+ChangeWatcher saat tidak ada perubahan (PRAGMA data_version) dibanding
+membaca revisi terakhir dari log, lalu biaya menerapkan satu peminjaman
+dari client lain sebagai delta dibanding reload penuh alat + peminjaman.
+
+Jalankan dari root project:
+    python benchmarks/bench_watcher.py [jumlah_peminjaman]   (default: 200000)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db import DatabaseManager
+
+JUMLAH_ALAT = 5_000
+JUMLAH_CEK = 10_000
+
+
+def isi_data(conn, jumlah):
+    conn.executemany(
+        'INSERT INTO alat (nama_alat, stok) VALUES (?, 1000)',
+        ((f"Alat {i:05d}",) for i in range(JUMLAH_ALAT))
+    )
+    conn.execute('''
+        WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < ?1 - 1)
+        INSERT INTO peminjaman (user_id, nama_peminjam, id_alat, jumlah, status)
+        SELECT 2, 'user1', 1 + i % ?2, 1, 'Dikembalikan' FROM n
+    ''', (jumlah, JUMLAH_ALAT))
+    conn.commit()
+
+
+def per_cek_us(fungsi):
+    mulai = time.perf_counter()
+    for _ in range(JUMLAH_CEK):
+        fungsi()
+    return (time.perf_counter() - mulai) * 1e6 / JUMLAH_CEK
+
+
+def client_lain(path):
+    # Koneksi milik thread lain = client lain bagi data_version
+    thread = threading.Thread(target=lambda: DatabaseManager(path).tambah_peminjaman(2, 7, 1))
+    thread.start()
+    thread.join()
+
+
+def main():
+    jumlah = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'watcher.db')
+        db = DatabaseManager(path)
+        isi_data(db.get_connection(), jumlah)
+        db.prune_perubahan(1)
+        print(f"Benchmark pemantau perubahan ({JUMLAH_ALAT:,} alat, {jumlah:,} peminjaman)")
+
+        versi = db.get_data_version()
+        print(f"  cek tanpa perubahan, data_version: {per_cek_us(db.get_data_version):7.1f} us")
+        print(f"  cek tanpa perubahan, revisi log:   {per_cek_us(db.get_revisi):7.1f} us")
+
+        revisi = db.get_revisi()
+        client_lain(path)
+        if db.get_data_version() == versi:
+            print("  GAGAL: commit client lain tidak terlihat di data_version")
+            sys.exit(1)
+
+        mulai = time.perf_counter()
+        revisi_baru, changes = db.get_perubahan_rows(revisi)
+        delta_ms = (time.perf_counter() - mulai) * 1000
+        mulai = time.perf_counter()
+        db._load_all_alat()
+        db.get_all_peminjaman()
+        penuh_ms = (time.perf_counter() - mulai) * 1000
+        print(f"  terapkan delta ({len(changes['alat'][0])} alat, {len(changes['peminjaman'][0])} peminjaman): "
+              f"{delta_ms:7.2f} ms")
+        print(f"  reload penuh:                      {penuh_ms:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
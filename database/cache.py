@@ -0,0 +1,161 @@
+"""
+Cache katalog alat untuk SIJAtools
+Menyimpan baris tabel alat di memori (index per id dan per nama) dan
+dipakai bersama semua DatabaseManager untuk file database yang sama.
+Operasi tulis di DatabaseManager meng-update atau meng-invalidate baris
+yang terkena, sehingga katalog hanya dibaca ulang dari database bila
+memang berubah.
+"""
+
+import os
+import threading
+import weakref
+
+
+class AlatCache:
+    """Cache read-through untuk baris alat (id, nama_alat, stok, deskripsi)"""
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_id = {}
+        self._by_nama = {}
+        self._sorted = None
+        self._complete = False
+        self._stale = set()
+        self.hits = 0
+        self.misses = 0
+    
+    # ---- BACA ----
+    
+    def get_all(self, load_all, load_ids):
+        """
+        Semua alat urut nama
+        
+        Args:
+            load_all: fungsi() -> semua baris alat dari database
+            load_ids: fungsi(ids) -> baris alat untuk ID tertentu
+        """
+        with self._lock:
+            if not self._complete:
+                self.misses += 1
+                self._reset(load_all())
+            elif self._stale:
+                self.misses += 1
+                self._reload_stale(load_ids)
+            else:
+                self.hits += 1
+            if self._sorted is None:
+                self._sorted = sorted(self._by_id.values(), key=lambda row: row[1])
+            return list(self._sorted)
+    
+    def get_by_id(self, id_alat, load_ids):
+        """Satu alat berdasarkan ID, None jika tidak ada"""
+        with self._lock:
+            if id_alat in self._by_id and id_alat not in self._stale:
+                self.hits += 1
+                return self._by_id[id_alat]
+            if self._complete and id_alat not in self._by_id and id_alat not in self._stale:
+                # Katalog lengkap di memori: ID ini memang tidak ada
+                self.hits += 1
+                return None
+            self.misses += 1
+            self._stale.add(id_alat)
+            self._reload_stale(load_ids)
+            return self._by_id.get(id_alat)
+    
+    def get_by_nama(self, nama_alat, load_all, load_ids):
+        """Satu alat berdasarkan nama, None jika tidak ada"""
+        with self._lock:
+            if not self._complete or self._stale:
+                self.get_all(load_all, load_ids)
+            else:
+                self.hits += 1
+            return self._by_nama.get(nama_alat)
+    
+    # ---- TULIS ----
+    
+    def put(self, row):
+        """Simpan baris alat terbaru (setelah insert/update yang sudah commit)"""
+        with self._lock:
+            self._remove(row[0])
+            self._by_id[row[0]] = row
+            self._by_nama[row[1]] = row
+            self._stale.discard(row[0])
+            self._sorted = None
+    
+    def remove(self, id_alat):
+        """Hapus alat dari cache (setelah delete yang sudah commit)"""
+        with self._lock:
+            self._remove(id_alat)
+            self._stale.discard(id_alat)
+            self._sorted = None
+    
+    def invalidate(self, ids):
+        """Tandai alat tertentu harus dibaca ulang (mis. stok berubah)"""
+        with self._lock:
+            self._stale.update(ids)
+    
+    def invalidate_all(self):
+        with self._lock:
+            self._complete = False
+            self._stale.clear()
+    
+    def stats(self):
+        """Statistik cache: hits, misses, hit_ratio"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+            }
+    
+    # ---- INTERNAL ----
+    
+    def _reset(self, rows):
+        self._by_id = {row[0]: row for row in rows}
+        self._by_nama = {row[1]: row for row in rows}
+        self._stale.clear()
+        self._sorted = None
+        self._complete = True
+    
+    def _reload_stale(self, load_ids):
+        ids = set(self._stale)
+        rows = load_ids(ids)
+        for id_alat in ids:
+            self._remove(id_alat)
+        for row in rows:
+            self._by_id[row[0]] = row
+            self._by_nama[row[1]] = row
+        self._stale.difference_update(ids)
+        self._sorted = None
+    
+    def _remove(self, id_alat):
+        row = self._by_id.pop(id_alat, None)
+        if row is not None and self._by_nama.get(row[1]) is row:
+            del self._by_nama[row[1]]
+
+
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def _reset_setelah_fork():
+    """Proses anak hasil fork mulai dengan cache kosong (lock induk bisa sedang dipegang)"""
+    global _caches, _caches_lock
+    _caches = weakref.WeakKeyDictionary()
+    _caches_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_setelah_fork)
+
+
+def get_alat_cache(pool):
+    """Ambil cache alat untuk pool (satu cache per file database)"""
+    with _caches_lock:
+        cache = _caches.get(pool)
+        if cache is None:
+            cache = AlatCache()
+            _caches[pool] = cache
+        return cache
@@ -0,0 +1,118 @@
+"""
+Lapisan koneksi SQLite untuk SIJAtools
+Satu koneksi persistent per thread per file database, dipakai bersama
+oleh semua instance DatabaseManager
+"""
+
+import os
+import sqlite3
+import threading
+
+
+# Pragma yang diterapkan sekali saat koneksi dibuka
+PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('busy_timeout', 5000),
+    ('temp_store', 'MEMORY'),
+    ('cache_size', -8000),
+)
+
+# Jumlah prepared statement yang di-cache per koneksi
+CACHED_STATEMENTS = 256
+
+
+class ConnectionPool:
+    """Pool koneksi SQLite: satu koneksi long-lived untuk setiap thread"""
+    
+    def __init__(self, db_name):
+        self.db_name = db_name
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        # Koneksi SQLite tidak boleh dipakai lintas fork; lihat _cek_fork
+        self._pid = os.getpid()
+        # Diset DatabaseManager setelah migrasi skema selesai
+        self.schema_ready = False
+        # Ada tidaknya index FTS5 (dicek sekali, lihat DatabaseManager.fts_tersedia)
+        self.fts = None
+    
+    def connect(self):
+        """Buka koneksi baru dengan pragma standar"""
+        conn = sqlite3.connect(self.db_name, cached_statements=CACHED_STATEMENTS)
+        for name, value in PRAGMAS:
+            conn.execute(f'PRAGMA {name}={value}')
+        return conn
+    
+    def get_connection(self):
+        """Ambil koneksi milik thread ini (dibuat saat pertama dipakai)"""
+        if self._pid != os.getpid():
+            self._cek_fork()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self.connect()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+    
+    def _cek_fork(self):
+        """
+        Proses anak hasil fork: lupakan koneksi warisan induk (tanpa close,
+        karena close di anak ikut merusak lock/WAL milik induk) dan buka baru
+        """
+        # Tetap direferensikan: jika di-GC, sqlite3 menutupnya di proses anak
+        _koneksi_warisan.extend(self._connections)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._pid = os.getpid()
+    
+    def close_all(self):
+        """Tutup semua koneksi yang pernah dibuka oleh pool ini"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Koneksi milik thread lain hanya bisa ditutup oleh thread itu
+                pass
+        self._local = threading.local()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+# Koneksi warisan induk di proses anak hasil fork (tidak pernah dipakai/ditutup)
+_koneksi_warisan = []
+
+
+def get_pool(db_name):
+    """Ambil pool untuk file database tertentu (satu pool per path)"""
+    key = db_name if db_name == ':memory:' else os.path.normcase(os.path.abspath(db_name))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_name)
+            _pools[key] = pool
+        return pool
+
+
+def _reset_setelah_fork():
+    """Proses anak mulai dengan daftar pool kosong (pool lama milik induk)"""
+    global _pools, _pools_lock
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_setelah_fork)
+
+
+def close_all_pools():
+    """Tutup semua pool (dipakai saat aplikasi selesai atau di benchmark)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
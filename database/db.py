@@ -3,9 +3,34 @@ Database manager untuk SIJAtools
 Mengelola koneksi SQLite dan semua operasi CRUD
 """
 
+import csv
+import re
 import sqlite3
-from datetime import datetime
+from contextlib import contextmanager
+from itertools import islice
 import os
+from database.cache import get_alat_cache
+from database.connection import get_pool
+from database.migrations import isi_statistik_alat, migrate
+from utils.password import hash_password, needs_rehash, verify_password
+
+# Jumlah entri log perubahan yang disimpan saat startup
+PERUBAHAN_DISIMPAN = 10000
+# Di atas jumlah ini, refresh parsial diganti reload penuh
+PERUBAHAN_MAKS_PARSIAL = 2000
+# Jumlah baris per chunk untuk import/export CSV
+CSV_CHUNK = 5000
+# Peminjaman yang sudah dikembalikan lebih lama dari ini dipindah ke arsip
+ARSIP_UMUR_HARI = int(os.environ.get('SIJATOOLS_ARSIP_HARI', 365))
+# Jumlah baris yang dipindah per transaksi saat arsip
+ARSIP_BATCH = 5000
+# Lama pinjam default sebelum jatuh tempo
+LAMA_PINJAM_HARI = int(os.environ.get('SIJATOOLS_LAMA_PINJAM_HARI', 7))
+# Jenis mutasi stok yang hanya memindah unit ke/dari peminjam (baseline tetap)
+MUTASI_PINJAMAN = ('pinjam', 'kembali')
+# Kolom yang disalin ke peminjaman_arsip (urutan sama di kedua tabel)
+KOLOM_PEMINJAMAN = ('id, nama_peminjam, id_alat, jumlah, status, tanggal_peminjaman, tanggal_pengembalian, '
+                    'user_id, tanggal_jatuh_tempo')
 
 
 class DatabaseManager:
@@ -17,81 +42,52 @@ class DatabaseManager:
             script_dir = os.path.dirname(os.path.abspath(__file__))
             db_name = os.path.join(script_dir, 'sijatools.db')
         self.db_name = db_name
+        self.pool = get_pool(db_name)
+        self.alat_cache = get_alat_cache(self.pool)
         self.init_database()
     
     def init_database(self):
-        """Inisialisasi database dan membuat tabel jika belum ada"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        # Tabel untuk data alat
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS alat (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nama_alat TEXT NOT NULL UNIQUE,
-                stok INTEGER NOT NULL,
-                deskripsi TEXT,
-                tanggal_ditambah TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Tabel untuk data peminjaman
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS peminjaman (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nama_peminjam TEXT NOT NULL,
-                id_alat INTEGER NOT NULL,
-                jumlah INTEGER NOT NULL,
-                status TEXT DEFAULT 'Dipinjam',
-                tanggal_peminjaman TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                tanggal_pengembalian TIMESTAMP,
-                FOREIGN KEY (id_alat) REFERENCES alat(id)
-            )
-        ''')
-        
-        # Tabel untuk users (LOGIN SYSTEM)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL UNIQUE,
-                password TEXT NOT NULL,
-                role TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Insert default users jika users table baru
-        cursor.execute('SELECT COUNT(*) FROM users')
-        if cursor.fetchone()[0] == 0:
-            cursor.execute(
-                'INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
-                ('admin', 'admin123', 'admin')
-            )
-            cursor.execute(
-                'INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
-                ('user1', 'user123', 'user')
-            )
-        
-        conn.commit()
-        conn.close()
+        """Inisialisasi database: jalankan migrasi skema yang belum diterapkan"""
+        # Skema cukup dicek sekali per file database per proses
+        if self.pool.schema_ready:
+            return
+        migrate(self.get_connection())
+        try:
+            self.prune_perubahan()
+        except sqlite3.OperationalError:
+            # Database sedang dipakai client lain; log dipangkas di startup berikutnya
+            pass
+        self.pool.schema_ready = True
     
     def get_connection(self):
-        """Buka koneksi database"""
-        return sqlite3.connect(self.db_name)
+        """Ambil koneksi persistent milik thread ini dari pool"""
+        return self.pool.get_connection()
+    
+    @contextmanager
+    def transaction(self):
+        """Jalankan blok sebagai satu transaksi BEGIN IMMEDIATE (commit sekali)"""
+        conn = self.get_connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn.cursor()
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
     
     # ---- OPERASI ALAT ----
     
     def tambah_alat(self, nama_alat, stok, deskripsi=""):
-        """Tambah alat baru"""
+        """Tambah alat baru (beserta mutasi stok awalnya)"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                'INSERT INTO alat (nama_alat, stok, deskripsi) VALUES (?, ?, ?)',
-                (nama_alat, stok, deskripsi)
-            )
-            conn.commit()
-            conn.close()
+            with self.transaction() as cursor:
+                cursor.execute(
+                    'INSERT INTO alat (nama_alat, stok, deskripsi) VALUES (?, ?, ?)',
+                    (nama_alat, stok, deskripsi)
+                )
+                id_alat = cursor.lastrowid
+                _catat_mutasi(cursor, id_alat, 'awal', [(stok, None)])
+            self.alat_cache.put((id_alat, nama_alat, stok, deskripsi))
             return True, "Alat berhasil ditambahkan"
         except sqlite3.IntegrityError:
             return False, "Nama alat sudah ada"
@@ -99,16 +95,25 @@ class DatabaseManager:
             return False, f"Error: {str(e)}"
     
     def edit_alat(self, id_alat, nama_alat, stok, deskripsi=""):
-        """Edit data alat"""
+        """Edit data alat (selisih stok dicatat sebagai mutasi koreksi)"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                'UPDATE alat SET nama_alat=?, stok=?, deskripsi=? WHERE id=?',
-                (nama_alat, stok, deskripsi, id_alat)
-            )
-            conn.commit()
-            conn.close()
+            dialokasikan = []
+            with self.transaction() as cursor:
+                cursor.execute('SELECT stok FROM alat WHERE id=?', (id_alat,))
+                lama = cursor.fetchone()
+                cursor.execute(
+                    'UPDATE alat SET nama_alat=?, stok=?, deskripsi=? WHERE id=?',
+                    (nama_alat, stok, deskripsi, id_alat)
+                )
+                if lama is not None and stok != lama[0]:
+                    _catat_mutasi(cursor, id_alat, 'koreksi', [(stok - lama[0], None)])
+                    if stok > lama[0]:
+                        dialokasikan = _alokasi_reservasi(cursor, id_alat)
+            if dialokasikan:
+                # Stok sudah berkurang lagi oleh alokasi reservasi
+                self.alat_cache.invalidate([id_alat])
+            elif lama is not None:
+                self.alat_cache.put((id_alat, nama_alat, stok, deskripsi))
             return True, "Alat berhasil diperbarui"
         except sqlite3.IntegrityError:
             return False, "Nama alat sudah ada"
@@ -116,151 +121,699 @@ class DatabaseManager:
             return False, f"Error: {str(e)}"
     
     def hapus_alat(self, id_alat):
-        """Hapus alat"""
+        """Hapus alat (sisa stok dicatat keluar di mutasi stok)"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM alat WHERE id=?', (id_alat,))
-            conn.commit()
-            conn.close()
+            with self.transaction() as cursor:
+                cursor.execute('SELECT stok FROM alat WHERE id=?', (id_alat,))
+                lama = cursor.fetchone()
+                cursor.execute('DELETE FROM alat WHERE id=?', (id_alat,))
+                if lama is not None:
+                    _catat_mutasi(cursor, id_alat, 'hapus', [(-lama[0], None)])
+                cursor.execute(
+                    "UPDATE reservasi SET status='Dibatalkan' WHERE id_alat=? AND status='Menunggu'",
+                    (id_alat,)
+                )
+            self.alat_cache.remove(id_alat)
             return True, "Alat berhasil dihapus"
         except Exception as e:
             return False, f"Error: {str(e)}"
     
     def get_all_alat(self):
-        """Ambil semua data alat"""
+        """Ambil semua data alat (dari cache katalog)"""
+        return self.alat_cache.get_all(self._load_all_alat, self.get_alat_by_ids)
+    
+    def _load_all_alat(self):
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT id, nama_alat, stok, deskripsi FROM alat ORDER BY nama_alat')
         result = cursor.fetchall()
-        conn.close()
         return result
     
     def get_alat_by_id(self, id_alat):
-        """Ambil data alat berdasarkan ID"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, nama_alat, stok, deskripsi FROM alat WHERE id=?', (id_alat,))
-        result = cursor.fetchone()
-        conn.close()
-        return result
+        """Ambil data alat berdasarkan ID (dari cache katalog)"""
+        return self.alat_cache.get_by_id(id_alat, self.get_alat_by_ids)
+    
+    def get_alat_by_nama(self, nama_alat):
+        """Ambil data alat berdasarkan nama (dari cache katalog)"""
+        return self.alat_cache.get_by_nama(nama_alat, self._load_all_alat, self.get_alat_by_ids)
     
     def update_stok(self, id_alat, jumlah):
-        """Kurangi stok alat (untuk peminjaman)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('UPDATE alat SET stok = stok - ? WHERE id=?', (jumlah, id_alat))
-        conn.commit()
-        conn.close()
+        """
+        Kurangi stok alat di luar peminjaman (mis. rusak/hilang)
+        
+        Peminjaman memakai tambah_peminjaman, yang mencatat mutasi 'pinjam'.
+        """
+        with self.transaction() as cursor:
+            cursor.execute('UPDATE alat SET stok = stok - ? WHERE id=?', (jumlah, id_alat))
+            if cursor.rowcount:
+                _catat_mutasi(cursor, id_alat, 'kurang', [(-jumlah, None)])
+        self.alat_cache.invalidate([id_alat])
     
     def tambah_stok(self, id_alat, jumlah):
-        """Tambah stok alat (untuk pengembalian)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('UPDATE alat SET stok = stok + ? WHERE id=?', (jumlah, id_alat))
-        conn.commit()
-        conn.close()
+        """
+        Tambah stok alat di luar pengembalian (mis. pembelian baru)
+        
+        Pengembalian memakai kembalikan_alat, yang mencatat mutasi 'kembali'.
+        """
+        with self.transaction() as cursor:
+            cursor.execute('UPDATE alat SET stok = stok + ? WHERE id=?', (jumlah, id_alat))
+            if cursor.rowcount:
+                _catat_mutasi(cursor, id_alat, 'tambah', [(jumlah, None)])
+                _alokasi_reservasi(cursor, id_alat)
+        self.alat_cache.invalidate([id_alat])
     
     def get_stok(self, id_alat):
-        """Ambil stok alat"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT stok FROM alat WHERE id=?', (id_alat,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else 0
+        """Ambil stok alat (dari cache katalog)"""
+        result = self.get_alat_by_id(id_alat)
+        return result[2] if result else 0
     
-    # ---- OPERASI PEMINJAMAN ----
+    def get_cache_stats(self):
+        """Statistik hit/miss cache katalog alat"""
+        return self.alat_cache.stats()
     
-    def tambah_peminjaman(self, nama_peminjam, id_alat, jumlah):
-        """Tambah peminjaman baru"""
-        try:
-            # Validasi stok
-            stok = self.get_stok(id_alat)
-            if stok < jumlah:
-                return False, f"Stok tidak cukup. Tersedia: {stok}"
-            
+    def get_alat_by_ids(self, ids):
+        """Ambil beberapa alat berdasarkan ID (untuk refresh parsial)"""
+        result = []
+        for chunk in _chunks(list(ids)):
             conn = self.get_connection()
             cursor = conn.cursor()
             cursor.execute(
-                'INSERT INTO peminjaman (nama_peminjam, id_alat, jumlah, status) VALUES (?, ?, ?, ?)',
-                (nama_peminjam, id_alat, jumlah, 'Dipinjam')
+                f'SELECT id, nama_alat, stok, deskripsi FROM alat WHERE id IN ({_placeholders(chunk)})',
+                chunk
             )
-            conn.commit()
-            id_peminjaman = cursor.lastrowid
-            conn.close()
-            
-            # Update stok
-            self.update_stok(id_alat, jumlah)
+            result.extend(cursor.fetchall())
+        return result
+    
+    # ---- OPERASI PEMINJAMAN ----
+    
+    def tambah_peminjaman(self, user_id, id_alat, jumlah, lama_hari=LAMA_PINJAM_HARI):
+        """
+        Tambah peminjaman baru (cek stok, kurangi stok, dan insert dalam satu transaksi)
+        
+        Jatuh tempo = waktu pinjam + lama_hari.
+        """
+        try:
+            with self.transaction() as cursor:
+                cursor.execute('SELECT username FROM users WHERE id=?', (user_id,))
+                user = cursor.fetchone()
+                if user is None:
+                    return False, "User peminjam tidak ditemukan"
+                
+                # Antrean FIFO: selama ada reservasi menunggu, stok yang kembali
+                # sudah menjadi jatah antrean, peminjaman langsung tidak boleh menyalip
+                cursor.execute(
+                    "SELECT COUNT(*) FROM reservasi WHERE id_alat=? AND status='Menunggu'",
+                    (id_alat,)
+                )
+                antre = cursor.fetchone()[0]
+                if antre:
+                    return False, f"Alat sedang diantre {antre} reservasi. Silakan ajukan reservasi"
+                
+                # Kurangi stok hanya jika cukup, tanpa baca-lalu-tulis terpisah
+                cursor.execute(
+                    'UPDATE alat SET stok = stok - ? WHERE id=? AND stok >= ?',
+                    (jumlah, id_alat, jumlah)
+                )
+                if cursor.rowcount == 0:
+                    cursor.execute('SELECT stok FROM alat WHERE id=?', (id_alat,))
+                    result = cursor.fetchone()
+                    stok = result[0] if result else 0
+                    return False, f"Stok tidak cukup. Tersedia: {stok}"
+                
+                id_peminjaman = _catat_peminjaman(cursor, user_id, user[0], id_alat, jumlah, lama_hari)
             
+            self.alat_cache.invalidate([id_alat])
             return True, f"Peminjaman berhasil ditambahkan (ID: {id_peminjaman})"
         except Exception as e:
             return False, f"Error: {str(e)}"
     
+    def tambah_peminjaman_banyak(self, user_id, items, lama_hari=LAMA_PINJAM_HARI):
+        """
+        Pinjam beberapa alat sekaligus (keranjang) dalam satu transaksi
+        
+        Semua baris dicek dulu di bawah lock tulis (stok dan antrean
+        reservasi); jika ada satu saja yang gagal, tidak ada yang dipinjam.
+        Alat yang muncul lebih dari sekali digabung jumlahnya.
+        
+        Args:
+            items: list (id_alat, jumlah)
+        
+        Returns:
+            (True, [id_peminjaman, ...]) sesuai urutan alat, atau
+            (False, pesan error yang menyebut semua baris yang gagal)
+        """
+        jumlah_per_alat = {}
+        for id_alat, jumlah in items:
+            jumlah_per_alat[id_alat] = jumlah_per_alat.get(id_alat, 0) + jumlah
+        if not jumlah_per_alat:
+            return False, "Keranjang kosong"
+        ids = list(jumlah_per_alat)
+        try:
+            with self.transaction() as cursor:
+                cursor.execute('SELECT username FROM users WHERE id=?', (user_id,))
+                user = cursor.fetchone()
+                if user is None:
+                    return False, "User peminjam tidak ditemukan"
+                
+                alat = {}
+                antre = {}
+                for chunk in _chunks(ids):
+                    cursor.execute(
+                        f'SELECT id, nama_alat, stok FROM alat WHERE id IN ({_placeholders(chunk)})',
+                        chunk
+                    )
+                    alat.update((row[0], row[1:]) for row in cursor.fetchall())
+                    cursor.execute(
+                        f'''SELECT id_alat, COUNT(*) FROM reservasi
+                            WHERE status = 'Menunggu' AND id_alat IN ({_placeholders(chunk)})
+                            GROUP BY id_alat''',
+                        chunk
+                    )
+                    antre.update(cursor.fetchall())
+                
+                gagal = []
+                for id_alat, jumlah in jumlah_per_alat.items():
+                    if id_alat not in alat:
+                        gagal.append(f"Alat ID {id_alat}: tidak ditemukan")
+                        continue
+                    nama_alat, stok = alat[id_alat]
+                    if antre.get(id_alat):
+                        gagal.append(f"{nama_alat}: sedang diantre {antre[id_alat]} reservasi")
+                    elif stok < jumlah:
+                        gagal.append(f"{nama_alat}: stok tidak cukup. Tersedia: {stok}")
+                if gagal:
+                    return False, "Keranjang tidak dipinjam:\n" + "\n".join(gagal)
+                
+                # Lock tulis sudah dipegang sejak BEGIN IMMEDIATE, stok tidak
+                # bisa berubah di antara pengecekan dan pengurangan ini
+                cursor.executemany(
+                    'UPDATE alat SET stok = stok - ? WHERE id=?',
+                    [(jumlah, id_alat) for id_alat, jumlah in jumlah_per_alat.items()]
+                )
+                id_peminjaman = [
+                    _catat_peminjaman(cursor, user_id, user[0], id_alat, jumlah, lama_hari)
+                    for id_alat, jumlah in jumlah_per_alat.items()
+                ]
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+        
+        self.alat_cache.invalidate(ids)
+        return True, id_peminjaman
+    
     def kembalikan_alat(self, id_peminjaman):
-        """Kembalikan alat yang dipinjam"""
+        """Kembalikan alat yang dipinjam (update status dan stok dalam satu transaksi)"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # Ambil data peminjaman
-            cursor.execute(
-                'SELECT id_alat, jumlah FROM peminjaman WHERE id=?',
-                (id_peminjaman,)
-            )
-            result = cursor.fetchone()
-            
-            if not result:
-                return False, "Data peminjaman tidak ditemukan"
-            
-            id_alat, jumlah = result
-            
-            # Update status dan tanggal pengembalian
-            cursor.execute(
-                'UPDATE peminjaman SET status=?, tanggal_pengembalian=? WHERE id=?',
-                ('Dikembalikan', datetime.now().strftime('%Y-%m-%d %H:%M:%S'), id_peminjaman)
-            )
-            conn.commit()
-            conn.close()
-            
-            # Tambah stok
-            self.tambah_stok(id_alat, jumlah)
+            with self.transaction() as cursor:
+                # Ambil data peminjaman
+                cursor.execute(
+                    'SELECT id_alat, jumlah, status FROM peminjaman WHERE id=?',
+                    (id_peminjaman,)
+                )
+                result = cursor.fetchone()
+                
+                if not result:
+                    return False, "Data peminjaman tidak ditemukan"
+                
+                id_alat, jumlah, status = result
+                if status != 'Dipinjam':
+                    return False, "Alat sudah dikembalikan sebelumnya"
+                
+                # Update status dan tanggal pengembalian (UTC, sama seperti
+                # tanggal_peminjaman yang memakai CURRENT_TIMESTAMP)
+                cursor.execute(
+                    'UPDATE peminjaman SET status=?, tanggal_pengembalian=CURRENT_TIMESTAMP WHERE id=?',
+                    ('Dikembalikan', id_peminjaman)
+                )
+                
+                # Tambah stok, lalu langsung jatahkan ke antrean reservasi
+                cursor.execute('UPDATE alat SET stok = stok + ? WHERE id=?', (jumlah, id_alat))
+                _catat_mutasi(cursor, id_alat, 'kembali', [(jumlah, id_peminjaman)])
+                dialokasikan = _alokasi_reservasi(cursor, id_alat)
             
+            self.alat_cache.invalidate([id_alat])
+            if dialokasikan:
+                return True, f"Alat berhasil dikembalikan ({len(dialokasikan)} reservasi dialokasikan)"
             return True, "Alat berhasil dikembalikan"
         except Exception as e:
             return False, f"Error: {str(e)}"
     
-    def get_all_peminjaman(self):
-        """Ambil semua data peminjaman"""
+    def kembalikan_banyak(self, ids):
+        """
+        Kembalikan beberapa peminjaman sekaligus dalam satu transaksi
+        
+        Status semua peminjaman yang masih Dipinjam diubah sekaligus, lalu
+        stok setiap alat ditambah satu kali dengan total jumlahnya dan
+        dijatahkan ke antrean reservasinya.
+        ID yang tidak ada atau sudah dikembalikan dilewati dan dilaporkan.
+        
+        Returns:
+            (True, {'dikembalikan': [id, ...], 'gagal': [(id, alasan), ...],
+            'reservasi': [(id_reservasi, id_peminjaman), ...]})
+            atau (False, pesan error)
+        """
+        ids = list(dict.fromkeys(ids))
+        dikembalikan = []
+        gagal = []
+        reservasi = []
+        # id_alat -> [(jumlah, id_peminjaman), ...]
+        mutasi = {}
+        try:
+            with self.transaction() as cursor:
+                ditemukan = {}
+                for chunk in _chunks(ids):
+                    cursor.execute(
+                        f'SELECT id, id_alat, jumlah, status FROM peminjaman WHERE id IN ({_placeholders(chunk)})',
+                        chunk
+                    )
+                    for id_peminjaman, id_alat, jumlah, status in cursor.fetchall():
+                        ditemukan[id_peminjaman] = (id_alat, jumlah, status)
+                
+                for id_peminjaman in ids:
+                    if id_peminjaman not in ditemukan:
+                        gagal.append((id_peminjaman, "Data peminjaman tidak ditemukan"))
+                        continue
+                    id_alat, jumlah, status = ditemukan[id_peminjaman]
+                    if status != 'Dipinjam':
+                        gagal.append((id_peminjaman, "Alat sudah dikembalikan sebelumnya"))
+                        continue
+                    dikembalikan.append(id_peminjaman)
+                    mutasi.setdefault(id_alat, []).append((jumlah, id_peminjaman))
+                
+                for chunk in _chunks(dikembalikan):
+                    cursor.execute(
+                        f'''UPDATE peminjaman SET status='Dikembalikan', tanggal_pengembalian=CURRENT_TIMESTAMP
+                            WHERE id IN ({_placeholders(chunk)})''',
+                        chunk
+                    )
+                # Satu UPDATE per alat, bukan per peminjaman
+                cursor.executemany(
+                    'UPDATE alat SET stok = stok + ? WHERE id=?',
+                    [(sum(jumlah for jumlah, _ in items), id_alat) for id_alat, items in mutasi.items()]
+                )
+                for id_alat, items in mutasi.items():
+                    _catat_mutasi(cursor, id_alat, 'kembali', items)
+                    reservasi.extend(_alokasi_reservasi(cursor, id_alat))
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+        
+        self.alat_cache.invalidate(mutasi)
+        return True, {'dikembalikan': dikembalikan, 'gagal': gagal, 'reservasi': reservasi}
+    
+    def get_all_peminjaman(self, termasuk_arsip=False):
+        """
+        Ambil semua data peminjaman (arsip ikut jika termasuk_arsip)
+        
+        Returns:
+            list (id, nama_peminjam, nama_alat, jumlah, status, tanggal_peminjaman, user_id)
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('''
+        cursor.execute(f'''
             SELECT p.id, p.nama_peminjam, a.nama_alat, p.jumlah, p.status, 
-                   p.tanggal_peminjaman
-            FROM peminjaman p
+                   p.tanggal_peminjaman, p.user_id
+            FROM {_sumber_peminjaman(termasuk_arsip)} p
             JOIN alat a ON p.id_alat = a.id
             ORDER BY p.tanggal_peminjaman DESC
         ''')
         result = cursor.fetchall()
-        conn.close()
         return result
     
     def get_peminjaman_by_status(self, status):
-        """Ambil peminjaman berdasarkan status"""
+        """
+        Ambil peminjaman berdasarkan status
+        
+        Index (status, tanggal) dipaksa: tanpanya planner bisa memilih
+        idx_peminjaman_aktif_user (partial) lalu mengurutkan ulang hasilnya.
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('''
             SELECT p.id, p.nama_peminjam, a.nama_alat, p.jumlah, p.status, 
-                   p.tanggal_peminjaman
-            FROM peminjaman p
+                   p.tanggal_peminjaman, p.user_id
+            FROM peminjaman p INDEXED BY idx_peminjaman_status_tanggal
             JOIN alat a ON p.id_alat = a.id
             WHERE p.status = ?
             ORDER BY p.tanggal_peminjaman DESC
         ''', (status,))
         result = cursor.fetchall()
-        conn.close()
         return result
     
+    def get_peminjaman_aktif_user(self, user_id):
+        """Peminjaman berstatus Dipinjam milik satu user (lewat idx_peminjaman_aktif_user)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT p.id, p.nama_peminjam, a.nama_alat, p.jumlah, p.status,
+                   p.tanggal_peminjaman, p.user_id
+            FROM peminjaman p
+            JOIN alat a ON p.id_alat = a.id
+            WHERE p.user_id = ? AND p.status = 'Dipinjam'
+            ORDER BY p.tanggal_peminjaman DESC
+        ''', (user_id,))
+        return cursor.fetchall()
+    
+    def get_peminjaman_terlambat(self, sejak=None, sampai=None):
+        """
+        Peminjaman aktif yang jatuh temponya di (sejak, sampai]
+        
+        Range pada index (status, tanggal_jatuh_tempo): hanya baris yang
+        memang terlambat yang dibaca. Pemanggil berkala cukup meneruskan
+        sampai sebelumnya sebagai sejak untuk mendapat yang baru terlambat.
+        
+        Args:
+            sejak: batas bawah (eksklusif), None = semua yang sudah terlambat
+            sampai: batas atas 'YYYY-MM-DD HH:MM:SS' UTC, None = sekarang
+        
+        Returns:
+            list (id, nama_peminjam, nama_alat, jumlah, tanggal_peminjaman,
+            tanggal_jatuh_tempo, user_id), urut jatuh tempo
+        """
+        conditions = ["p.status = 'Dipinjam'", "p.tanggal_jatuh_tempo <= COALESCE(?, datetime('now'))"]
+        params = [sampai]
+        if sejak is not None:
+            conditions.append('p.tanggal_jatuh_tempo > ?')
+            params.append(sejak)
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT p.id, p.nama_peminjam, a.nama_alat, p.jumlah,
+                   p.tanggal_peminjaman, p.tanggal_jatuh_tempo, p.user_id
+            FROM peminjaman p INDEXED BY idx_peminjaman_jatuh_tempo
+            JOIN alat a ON p.id_alat = a.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY p.tanggal_jatuh_tempo, p.id
+        ''', params)
+        return cursor.fetchall()
+    
+    def get_peminjaman_by_ids(self, ids):
+        """Ambil beberapa peminjaman berdasarkan ID (untuk refresh parsial)"""
+        result = []
+        for chunk in _chunks(list(ids)):
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT p.id, p.nama_peminjam, a.nama_alat, p.jumlah, p.status,
+                       p.tanggal_peminjaman, p.user_id
+                FROM peminjaman p
+                JOIN alat a ON p.id_alat = a.id
+                WHERE p.id IN ({_placeholders(chunk)})
+            ''', chunk)
+            result.extend(cursor.fetchall())
+        return result
+    
+    def get_peminjaman_page(self, user_id=None, status=None, after=None, before=None, limit=100, cari=None,
+                            termasuk_arsip=False):
+        """
+        Ambil satu halaman peminjaman, terbaru dulu (keyset pagination)
+        
+        Args:
+            user_id: filter ID user peminjam (opsional)
+            status: filter status (opsional)
+            after: key (tanggal_peminjaman, id) baris terakhir -> halaman lebih lama
+            before: key (tanggal_peminjaman, id) baris pertama -> halaman lebih baru
+            limit: jumlah baris per halaman
+            cari: teks pencarian nama peminjam (prefix per kata, opsional)
+            termasuk_arsip: ikut baca peminjaman_arsip
+        
+        Returns:
+            list baris seperti get_all_peminjaman, selalu urut terbaru dulu
+        """
+        conditions = []
+        params = []
+        if cari:
+            if not self._kondisi_cari_peminjam(conditions, params, cari):
+                return []
+        if user_id is not None:
+            conditions.append('p.user_id = ?')
+            params.append(user_id)
+        if status is not None:
+            conditions.append('p.status = ?')
+            params.append(status)
+        
+        # Halaman sebelumnya dibaca urut naik lalu dibalik
+        if before is not None:
+            conditions.append('(p.tanggal_peminjaman, p.id) > (?, ?)')
+            params.extend(before)
+            order = 'ASC'
+        else:
+            if after is not None:
+                conditions.append('(p.tanggal_peminjaman, p.id) < (?, ?)')
+                params.extend(after)
+            order = 'DESC'
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        tabel = ('peminjaman', 'peminjaman_arsip') if termasuk_arsip else ('peminjaman',)
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        result = []
+        # Satu halaman per tabel (masing-masing lewat index), lalu digabung
+        for nama_tabel in tabel:
+            cursor.execute(f'''
+                SELECT p.id, p.nama_peminjam, a.nama_alat, p.jumlah, p.status,
+                       p.tanggal_peminjaman, p.user_id
+                FROM {nama_tabel} p
+                JOIN alat a ON p.id_alat = a.id
+                {where}
+                ORDER BY p.tanggal_peminjaman {order}, p.id {order}
+                LIMIT ?
+            ''', params + [limit])
+            result.extend(cursor.fetchall())
+        if len(tabel) > 1:
+            result.sort(key=lambda row: (row[5], row[0]), reverse=(order == 'DESC'))
+            del result[limit:]
+        if before is not None:
+            result.reverse()
+        return result
+    
+    # ---- RESERVASI ----
+    
+    def tambah_reservasi(self, user_id, id_alat, jumlah):
+        """
+        Masukkan reservasi ke antrean alat (FIFO)
+        
+        Jika stok cukup dan antrean kosong, reservasi langsung dialokasikan
+        menjadi peminjaman di transaksi yang sama.
+        """
+        try:
+            with self.transaction() as cursor:
+                cursor.execute('SELECT 1 FROM users WHERE id=?', (user_id,))
+                if cursor.fetchone() is None:
+                    return False, "User peminjam tidak ditemukan"
+                
+                # Reservasi yang melebihi total unit alat tidak akan pernah
+                # terpenuhi dan akan menahan seluruh antrean di belakangnya
+                cursor.execute(
+                    'SELECT total FROM mutasi_stok WHERE id_alat=? ORDER BY id DESC LIMIT 1',
+                    (id_alat,)
+                )
+                baseline = cursor.fetchone()
+                cursor.execute('SELECT 1 FROM alat WHERE id=?', (id_alat,))
+                if cursor.fetchone() is None or baseline is None:
+                    return False, "Alat tidak ditemukan"
+                if jumlah > baseline[0]:
+                    return False, f"Jumlah melebihi total unit alat ({baseline[0]})"
+                
+                cursor.execute(
+                    'INSERT INTO reservasi (user_id, id_alat, jumlah) VALUES (?, ?, ?)',
+                    (user_id, id_alat, jumlah)
+                )
+                id_reservasi = cursor.lastrowid
+                dialokasikan = dict(_alokasi_reservasi(cursor, id_alat))
+                if id_reservasi in dialokasikan:
+                    # Pemesan langsung melihat hasilnya, tidak perlu notifikasi lagi
+                    cursor.execute('UPDATE reservasi SET diberitahu=1 WHERE id=?', (id_reservasi,))
+                else:
+                    cursor.execute(
+                        "SELECT COUNT(*) FROM reservasi WHERE id_alat=? AND status='Menunggu' AND id <= ?",
+                        (id_alat, id_reservasi)
+                    )
+                    posisi = cursor.fetchone()[0]
+            
+            if id_reservasi in dialokasikan:
+                self.alat_cache.invalidate([id_alat])
+                return True, f"Stok tersedia, reservasi langsung dipinjamkan (ID peminjaman: {dialokasikan[id_reservasi]})"
+            return True, f"Reservasi masuk antrean (ID: {id_reservasi}, posisi {posisi})"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+    
+    def batalkan_reservasi(self, id_reservasi, user_id=None):
+        """Batalkan reservasi yang masih menunggu (user_id: hanya milik user tersebut)"""
+        try:
+            with self.transaction() as cursor:
+                cursor.execute('SELECT user_id, id_alat, status FROM reservasi WHERE id=?', (id_reservasi,))
+                result = cursor.fetchone()
+                if result is None or (user_id is not None and result[0] != user_id):
+                    return False, "Data reservasi tidak ditemukan"
+                if result[2] != 'Menunggu':
+                    return False, f"Reservasi sudah {result[2].lower()}"
+                cursor.execute("UPDATE reservasi SET status='Dibatalkan' WHERE id=?", (id_reservasi,))
+                # Reservasi berikutnya mungkin muat dengan stok yang ada
+                dialokasikan = _alokasi_reservasi(cursor, result[1])
+            
+            if dialokasikan:
+                self.alat_cache.invalidate([result[1]])
+            return True, "Reservasi dibatalkan"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+    
+    def get_reservasi_user(self, user_id, limit=100):
+        """
+        Reservasi milik user, terbaru dulu
+        
+        Returns:
+            list (id, nama_alat, jumlah, status, tanggal_reservasi,
+            id_peminjaman, posisi antrean atau None)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT r.id, COALESCE(a.nama_alat, '-'), r.jumlah, r.status, r.tanggal_reservasi, r.id_peminjaman,
+                   CASE WHEN r.status = 'Menunggu' THEN (
+                       SELECT COUNT(*) FROM reservasi q
+                       WHERE q.id_alat = r.id_alat AND q.status = 'Menunggu' AND q.id <= r.id
+                   ) END
+            FROM reservasi r
+            LEFT JOIN alat a ON a.id = r.id_alat
+            WHERE r.user_id = ?
+            ORDER BY r.id DESC
+            LIMIT ?
+        ''', (user_id, limit))
+        return cursor.fetchall()
+    
+    def get_antrean_alat(self, id_alat):
+        """Antrean reservasi satu alat (urut FIFO): list (id, nama_peminjam, jumlah, tanggal_reservasi)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT r.id, u.username, r.jumlah, r.tanggal_reservasi
+            FROM reservasi r
+            JOIN users u ON u.id = r.user_id
+            WHERE r.id_alat = ? AND r.status = 'Menunggu'
+            ORDER BY r.id
+        ''', (id_alat,))
+        return cursor.fetchall()
+    
+    def ambil_notifikasi_reservasi(self, user_id):
+        """
+        Reservasi user yang sudah dialokasikan tapi belum diberitahukan,
+        lalu tandai sudah diberitahu
+        
+        Returns:
+            list (id_reservasi, nama_alat, jumlah, id_peminjaman)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT r.id, COALESCE(a.nama_alat, '-'), r.jumlah, r.id_peminjaman
+            FROM reservasi r
+            LEFT JOIN alat a ON a.id = r.id_alat
+            WHERE r.user_id = ? AND r.status = 'Dialokasikan' AND r.diberitahu = 0
+            ORDER BY r.id
+        ''', (user_id,))
+        rows = cursor.fetchall()
+        if rows:
+            # Baca dulu tanpa lock tulis: hampir selalu tidak ada notifikasi
+            with self.transaction() as cursor:
+                for chunk in _chunks([row[0] for row in rows]):
+                    cursor.execute(
+                        f'UPDATE reservasi SET diberitahu=1 WHERE id IN ({_placeholders(chunk)})',
+                        chunk
+                    )
+        return rows
+    
+    # ---- PENCARIAN ----
+    
+    def cari_alat(self, teks, after=None, limit=100):
+        """
+        Cari alat berdasarkan nama/deskripsi (prefix per kata), urut nama
+        
+        Args:
+            teks: kata kunci; kosong berarti semua alat
+            after: nama_alat baris terakhir halaman sebelumnya (keyset)
+            limit: jumlah baris per halaman
+        
+        Returns:
+            list (id, nama_alat, stok, deskripsi)
+        """
+        conditions = []
+        params = []
+        self._kondisi_cari(conditions, params, 'alat', 'a', ('nama_alat', 'deskripsi'), teks)
+        if after is not None:
+            conditions.append('a.nama_alat > ?')
+            params.append(after)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT a.id, a.nama_alat, a.stok, a.deskripsi
+            FROM alat a
+            {where}
+            ORDER BY a.nama_alat
+            LIMIT ?
+        ''', params + [limit])
+        return cursor.fetchall()
+    
+    def cari_peminjaman(self, teks, **kwargs):
+        """Cari peminjaman berdasarkan nama peminjam (argumen lain seperti get_peminjaman_page)"""
+        return self.get_peminjaman_page(cari=teks, **kwargs)
+    
+    def fts_tersedia(self):
+        """True jika index FTS5 ada (SQLite dibangun dengan FTS5)"""
+        if self.pool.fts is None:
+            cursor = self.get_connection().cursor()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'alat_fts'")
+            self.pool.fts = cursor.fetchone() is not None
+        return self.pool.fts
+    
+    def _kondisi_cari(self, conditions, params, tabel, alias, kolom, teks):
+        """Tambahkan filter pencarian: FTS5 MATCH, atau LIKE jika FTS5 tidak ada"""
+        kata = _kata_kunci(teks)
+        if not kata:
+            return
+        if self.fts_tersedia():
+            conditions.append(f'{alias}.id IN (SELECT rowid FROM {tabel}_fts WHERE {tabel}_fts MATCH ?)')
+            params.append(' '.join(f'"{k}"*' for k in kata))
+        else:
+            for k in kata:
+                conditions.append('(' + ' OR '.join(f"{alias}.{c} LIKE ? ESCAPE '\\'" for c in kolom) + ')')
+                params.extend([f"%{_escape_like(k)}%"] * len(kolom))
+    
+    def _kondisi_cari_peminjam(self, conditions, params, teks):
+        """
+        Filter peminjaman berdasarkan nama peminjam yang cocok dengan teks
+        
+        Nama dicari di tabel peminjam (nama unik) lalu dipilih rencana query:
+        sedikit nama cocok -> pakai index (nama_peminjam, tanggal); banyak
+        nama cocok -> scan urut tanggal dan berhenti setelah satu halaman.
+        
+        Returns:
+            False jika tidak ada nama yang cocok (hasil pasti kosong)
+        """
+        kondisi_nama = []
+        params_nama = []
+        self._kondisi_cari(kondisi_nama, params_nama, 'peminjam', 'm', ('nama',), teks)
+        if not kondisi_nama:
+            return True
+        where = ' AND '.join(kondisi_nama)
+        
+        cursor = self.get_connection().cursor()
+        cursor.execute(f'SELECT COUNT(*) FROM peminjam m WHERE {where}', params_nama)
+        cocok = cursor.fetchone()[0]
+        if cocok == 0:
+            return False
+        cursor.execute('SELECT (SELECT COUNT(*) FROM peminjam), (SELECT SUM(total_pinjam) FROM statistik_alat)')
+        total_nama, total_baris = cursor.fetchone()
+        
+        # Perkiraan baris yang dibaca: lewat index ~ cocok * rata2 baris per nama;
+        # scan tanggal ~ halaman * total_nama / cocok. Unary + mematikan index nama.
+        per_nama = (total_baris or 0) / max(total_nama, 1)
+        pakai_index_nama = cocok * per_nama <= 100 * total_nama / cocok
+        kolom = 'p.nama_peminjam' if pakai_index_nama else '+p.nama_peminjam'
+        conditions.append(f'{kolom} IN (SELECT m.nama FROM peminjam m WHERE {where})')
+        params.extend(params_nama)
+        return True
+    
     # ---- OPERASI USER / LOGIN ----
     
     def login(self, username, password):
@@ -269,17 +822,26 @@ class DatabaseManager:
             conn = self.get_connection()
             cursor = conn.cursor()
             cursor.execute(
-                'SELECT id, username, role FROM users WHERE username=? AND password=?',
-                (username, password)
+                'SELECT id, username, role, password FROM users WHERE username=?',
+                (username,)
             )
             result = cursor.fetchone()
-            conn.close()
             
-            if result:
-                return True, {'id': result[0], 'username': result[1], 'role': result[2]}
-            else:
+            if result is None or not verify_password(password, result[3]):
                 return False, "Username atau password salah"
+            
+            # Plaintext lama atau cost KDF berubah: simpan ulang dengan hash baru.
+            # Kondisi password=? mencegah menimpa perubahan dari proses lain.
+            if needs_rehash(result[3]):
+                cursor.execute(
+                    'UPDATE users SET password=? WHERE id=? AND password=?',
+                    (hash_password(password), result[0], result[3])
+                )
+                conn.commit()
+            
+            return True, {'id': result[0], 'username': result[1], 'role': result[2]}
         except Exception as e:
+            self.get_connection().rollback()
             return False, f"Error: {str(e)}"
     
     def get_user_role(self, username):
@@ -289,11 +851,18 @@ class DatabaseManager:
             cursor = conn.cursor()
             cursor.execute('SELECT role FROM users WHERE username=?', (username,))
             result = cursor.fetchone()
-            conn.close()
             return result[0] if result else None
         except Exception as e:
             return None
     
+    def get_user_id(self, username):
+        """ID user berdasarkan username, None jika tidak ada"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT id FROM users WHERE username=?', (username,))
+        result = cursor.fetchone()
+        return result[0] if result else None
+    
     def check_username_exists(self, username):
         """Cek apakah username sudah ada di database"""
         try:
@@ -301,7 +870,6 @@ class DatabaseManager:
             cursor = conn.cursor()
             cursor.execute('SELECT id FROM users WHERE username=?', (username,))
             result = cursor.fetchone()
-            conn.close()
             return result is not None
         except Exception as e:
             return False
@@ -323,27 +891,533 @@ class DatabaseManager:
             cursor.execute(
                 '''INSERT INTO users (username, password, role) 
                    VALUES (?, ?, 'user')''',
-                (username, password)
+                (username, hash_password(password))
             )
             conn.commit()
-            conn.close()
             
             return True, "Akun berhasil dibuat! Silakan login dengan akun Anda"
         except Exception as e:
+            self.get_connection().rollback()
             return False, f"Error: {str(e)}"
     
-    def get_peminjaman_by_user(self, username):
-        """Ambil peminjaman berdasarkan username peminjam"""
+    def get_peminjaman_by_user(self, user_id, termasuk_arsip=False):
+        """Ambil peminjaman milik satu user (arsip ikut jika termasuk_arsip)"""
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('''
+        cursor.execute(f'''
             SELECT p.id, p.nama_peminjam, a.nama_alat, p.jumlah, p.status, 
-                   p.tanggal_peminjaman
-            FROM peminjaman p
+                   p.tanggal_peminjaman, p.user_id
+            FROM {_sumber_peminjaman(termasuk_arsip)} p
             JOIN alat a ON p.id_alat = a.id
-            WHERE p.nama_peminjam = ?
+            WHERE p.user_id = ?
             ORDER BY p.tanggal_peminjaman DESC
-        ''', (username,))
+        ''', (user_id,))
         result = cursor.fetchall()
-        conn.close()
         return result
+    
+    # ---- IMPORT / EXPORT CSV ----
+    
+    def import_alat_csv(self, path, chunk_size=CSV_CHUNK):
+        """
+        Import alat dari CSV (header: nama_alat, stok, deskripsi) secara streaming
+        
+        File dibaca per chunk dan di-insert dengan executemany dalam satu
+        transaksi. Baris yang nama_alat-nya sudah ada (UNIQUE) atau tidak
+        valid dilewati dan dilaporkan, baris lain tetap masuk.
+        
+        Returns:
+            (True, {'berhasil': n, 'konflik': [(nomor_baris, nama_alat, alasan), ...]})
+            atau (False, pesan error)
+        """
+        berhasil = 0
+        konflik = []
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as f, self.transaction() as cursor:
+                cursor.execute('SELECT COALESCE(MAX(id), 0) FROM alat')
+                id_terakhir = cursor.fetchone()[0]
+                reader = csv.DictReader(f)
+                if not reader.fieldnames or not {'nama_alat', 'stok'} <= set(reader.fieldnames):
+                    raise ValueError("Header CSV harus memuat kolom nama_alat dan stok")
+                
+                # Nomor baris data dimulai dari 2 (baris 1 adalah header)
+                rows = enumerate(reader, start=2)
+                while True:
+                    chunk = list(islice(rows, chunk_size))
+                    if not chunk:
+                        break
+                    valid = self._validasi_chunk_alat(cursor, chunk, konflik)
+                    cursor.executemany(
+                        'INSERT INTO alat (nama_alat, stok, deskripsi) VALUES (?, ?, ?)',
+                        valid
+                    )
+                    berhasil += len(valid)
+                
+                # Mutasi awal untuk semua alat hasil import, satu statement
+                cursor.execute('''
+                    INSERT INTO mutasi_stok (id_alat, jenis, perubahan, saldo, total)
+                    SELECT id, 'awal', stok, stok, stok FROM alat WHERE id > ?
+                ''', (id_terakhir,))
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+        finally:
+            self.alat_cache.invalidate_all()
+        
+        konflik.sort()
+        return True, {'berhasil': berhasil, 'konflik': konflik}
+    
+    def _validasi_chunk_alat(self, cursor, chunk, konflik):
+        """Pisahkan baris valid dari baris konflik/tidak valid dalam satu chunk"""
+        kandidat = []
+        for nomor, row in chunk:
+            nama = (row.get('nama_alat') or '').strip()
+            deskripsi = (row.get('deskripsi') or '').strip()
+            try:
+                stok = int((row.get('stok') or '').strip())
+                if stok < 0:
+                    raise ValueError()
+            except ValueError:
+                konflik.append((nomor, nama, "Stok harus berupa angka positif"))
+                continue
+            if not nama:
+                konflik.append((nomor, nama, "Nama alat kosong"))
+                continue
+            kandidat.append((nomor, nama, stok, deskripsi))
+        
+        # Satu query untuk cek nama yang sudah ada (termasuk dari chunk sebelumnya)
+        sudah_ada = set()
+        for names in _chunks([nama for _, nama, _, _ in kandidat]):
+            cursor.execute(
+                f'SELECT nama_alat FROM alat WHERE nama_alat IN ({_placeholders(names)})',
+                names
+            )
+            sudah_ada.update(row[0] for row in cursor.fetchall())
+        
+        valid = []
+        for nomor, nama, stok, deskripsi in kandidat:
+            if nama in sudah_ada:
+                konflik.append((nomor, nama, "Nama alat sudah ada"))
+                continue
+            sudah_ada.add(nama)
+            valid.append((nama, stok, deskripsi))
+        return valid
+    
+    def export_alat_csv(self, path):
+        """Export tabel alat ke CSV secara streaming, return jumlah baris"""
+        return self._export_csv(
+            path,
+            ('id', 'nama_alat', 'stok', 'deskripsi', 'tanggal_ditambah'),
+            'SELECT id, nama_alat, stok, deskripsi, tanggal_ditambah FROM alat ORDER BY id'
+        )
+    
+    def export_peminjaman_csv(self, path, termasuk_arsip=False):
+        """Export tabel peminjaman (dan arsip jika diminta) ke CSV secara streaming, return jumlah baris"""
+        return self._export_csv(
+            path,
+            ('id', 'nama_peminjam', 'id_alat', 'nama_alat', 'jumlah', 'status',
+             'tanggal_peminjaman', 'tanggal_pengembalian'),
+            f'''
+                SELECT p.id, p.nama_peminjam, p.id_alat, a.nama_alat, p.jumlah, p.status,
+                       p.tanggal_peminjaman, p.tanggal_pengembalian
+                FROM {_sumber_peminjaman(termasuk_arsip)} p
+                LEFT JOIN alat a ON p.id_alat = a.id
+                ORDER BY p.id
+            '''
+        )
+    
+    def _export_csv(self, path, header, query):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(query)
+        jumlah = 0
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            # fetchmany agar hasil tidak pernah dimuat seluruhnya ke memori
+            while True:
+                rows = cursor.fetchmany(CSV_CHUNK)
+                if not rows:
+                    break
+                writer.writerows(rows)
+                jumlah += len(rows)
+        return jumlah
+    
+    # ---- ARSIP ----
+    
+    def arsipkan_peminjaman(self, umur_hari=ARSIP_UMUR_HARI, batch=ARSIP_BATCH):
+        """
+        Pindahkan peminjaman yang sudah dikembalikan lebih dari umur_hari
+        ke peminjaman_arsip, agar tabel peminjaman dan index-nya tetap kecil
+        
+        Dipindah per batch, satu transaksi pendek per batch, sehingga
+        aplikasi yang sedang berjalan tidak tertahan lama. statistik_alat
+        tidak berubah (baris arsip tetap dihitung).
+        
+        Returns:
+            (True, jumlah_dipindah) atau (False, pesan error)
+        """
+        batas = f'-{int(umur_hari)} days'
+        jumlah = 0
+        try:
+            while True:
+                with self.transaction() as cursor:
+                    # tanggal_pengembalian selalu setelah tanggal_peminjaman, jadi
+                    # syarat tanggal_peminjaman boleh dipakai untuk index (status, tanggal)
+                    cursor.execute('''
+                        SELECT id FROM peminjaman
+                        WHERE status = 'Dikembalikan'
+                          AND tanggal_peminjaman < datetime('now', ?)
+                          AND tanggal_pengembalian < datetime('now', ?)
+                        LIMIT ?
+                    ''', (batas, batas, batch))
+                    ids = [row[0] for row in cursor.fetchall()]
+                    if not ids:
+                        break
+                    for chunk in _chunks(ids):
+                        # Insert ke arsip dulu: trigger statistik melewati baris yang sudah diarsipkan
+                        cursor.execute(
+                            f'INSERT INTO peminjaman_arsip ({KOLOM_PEMINJAMAN}) '
+                            f'SELECT {KOLOM_PEMINJAMAN} FROM peminjaman WHERE id IN ({_placeholders(chunk)})',
+                            chunk
+                        )
+                        cursor.execute(f'DELETE FROM peminjaman WHERE id IN ({_placeholders(chunk)})', chunk)
+                jumlah += len(ids)
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+        return True, jumlah
+    
+    def get_jumlah_arsip(self):
+        """Jumlah baris (peminjaman, peminjaman_arsip)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT (SELECT COUNT(*) FROM peminjaman), (SELECT COUNT(*) FROM peminjaman_arsip)')
+        return cursor.fetchone()
+    
+    # ---- MUTASI STOK ----
+    
+    def rekonsiliasi_stok(self, penuh=False):
+        """
+        Cek konsistensi stok alat terhadap buku mutasi_stok
+        
+        Cek cepat (selalu): per alat, mutasi terakhir diambil lewat index
+        (id_alat, id) dan unit dipinjam dari index parsial peminjaman aktif,
+        lalu dicek stok == saldo dan stok + dipinjam == total (baseline).
+        Biayanya sebanding jumlah alat, bukan jumlah mutasi.
+        
+        penuh=True juga memeriksa buku per alat seimbang: saldo mutasi
+        terakhir == SUM(perubahan) dan total == SUM(perubahan selain
+        pinjam/kembali). Ini membaca seluruh mutasi sekali, tapi hanya dari
+        index covering.
+        
+        Returns:
+            {'jumlah_alat', 'selisih': [(id_alat, nama_alat, stok, saldo,
+            dipinjam, total)], 'tidak_seimbang': [(id_alat, id_mutasi,
+            saldo_hitung, saldo, total_hitung, total)]}
+            saldo/total None jika alat belum punya mutasi
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT a.id, a.nama_alat, a.stok, m.saldo, COALESCE(p.dipinjam, 0), m.total
+            FROM alat a
+            LEFT JOIN mutasi_stok m
+                ON m.id = (SELECT MAX(id) FROM mutasi_stok WHERE id_alat = a.id)
+            LEFT JOIN (
+                SELECT id_alat, SUM(jumlah) AS dipinjam FROM peminjaman
+                WHERE status = 'Dipinjam' GROUP BY id_alat
+            ) p ON p.id_alat = a.id
+            WHERE m.id IS NULL
+               OR a.stok != m.saldo
+               OR a.stok + COALESCE(p.dipinjam, 0) != m.total
+            ORDER BY a.id
+        ''')
+        selisih = cursor.fetchall()
+        cursor.execute('SELECT COUNT(*) FROM alat')
+        jumlah_alat = cursor.fetchone()[0]
+        
+        tidak_seimbang = []
+        if penuh:
+            # Agregat dibaca dari index (id_alat, id, jenis, perubahan) saja
+            cursor.execute(f'''
+                SELECT b.id_alat, m.id, b.saldo, m.saldo, b.total, m.total
+                FROM (
+                    SELECT id_alat, MAX(id) AS id_akhir, SUM(perubahan) AS saldo,
+                           SUM(CASE WHEN jenis IN ({_placeholders(MUTASI_PINJAMAN)})
+                                    THEN 0 ELSE perubahan END) AS total
+                    FROM mutasi_stok GROUP BY id_alat
+                ) b
+                JOIN mutasi_stok m ON m.id = b.id_akhir
+                WHERE m.saldo != b.saldo OR m.total != b.total
+                ORDER BY b.id_alat
+            ''', MUTASI_PINJAMAN)
+            tidak_seimbang = cursor.fetchall()
+        
+        return {'jumlah_alat': jumlah_alat, 'selisih': selisih, 'tidak_seimbang': tidak_seimbang}
+    
+    def get_mutasi_stok(self, id_alat, limit=50):
+        """Mutasi stok satu alat, terbaru dulu: (id, jenis, perubahan, saldo, total, ref_id, waktu)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, jenis, perubahan, saldo, total, ref_id, waktu
+            FROM mutasi_stok WHERE id_alat = ?
+            ORDER BY id DESC LIMIT ?
+        ''', (id_alat, limit))
+        return cursor.fetchall()
+    
+    # ---- STATISTIK ----
+    
+    def get_statistik_alat(self, limit=None):
+        """
+        Statistik per alat dari tabel ringkasan statistik_alat (dijaga trigger)
+        
+        Biayanya sebanding jumlah alat, tidak tergantung panjang riwayat.
+        
+        Returns:
+            list (id, nama_alat, stok, total_pinjam, total_unit, unit_keluar,
+            rata_durasi_detik atau None), urut paling sering dipinjam
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT a.id, a.nama_alat, a.stok,
+                   COALESCE(s.total_pinjam, 0), COALESCE(s.total_unit, 0),
+                   COALESCE(s.unit_keluar, 0),
+                   s.total_durasi / NULLIF(s.jumlah_kembali, 0)
+            FROM alat a
+            LEFT JOIN statistik_alat s ON s.id_alat = a.id
+            ORDER BY COALESCE(s.total_pinjam, 0) DESC, a.nama_alat
+            LIMIT ?
+        ''', (-1 if limit is None else limit,))
+        return cursor.fetchall()
+    
+    def get_statistik_ringkasan(self):
+        """
+        Ringkasan seluruh peminjaman dari statistik_alat
+        
+        Returns:
+            {'total_pinjam', 'peminjaman_aktif', 'unit_keluar', 'rata_durasi'}
+            (rata_durasi dalam detik, None jika belum ada pengembalian)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT COALESCE(SUM(total_pinjam), 0),
+                   COALESCE(SUM(total_pinjam - jumlah_kembali), 0),
+                   COALESCE(SUM(unit_keluar), 0),
+                   SUM(total_durasi) / NULLIF(SUM(jumlah_kembali), 0)
+            FROM statistik_alat
+        ''')
+        total_pinjam, aktif, unit_keluar, rata_durasi = cursor.fetchone()
+        return {
+            'total_pinjam': total_pinjam,
+            'peminjaman_aktif': aktif,
+            'unit_keluar': unit_keluar,
+            'rata_durasi': rata_durasi,
+        }
+    
+    def rebuild_statistik(self):
+        """Hitung ulang statistik_alat dari peminjaman dan arsip (perbaikan manual)"""
+        with self.transaction() as cursor:
+            isi_statistik_alat(cursor)
+    
+    # ---- LOG PERUBAHAN ----
+    
+    def get_revisi(self):
+        """Nomor revisi terakhir (naik setiap ada perubahan alat/peminjaman)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT COALESCE(MAX(seq), 0) FROM perubahan')
+        return cursor.fetchone()[0]
+    
+    def get_data_version(self):
+        """
+        PRAGMA data_version koneksi thread ini
+        
+        Nilainya hanya berubah jika koneksi lain (thread worker atau client
+        SIJAtools lain) meng-commit perubahan, dan dibaca dari header WAL
+        di shared memory tanpa menyentuh tabel. Karena per koneksi,
+        bandingkan hanya dengan nilai dari thread yang sama.
+        """
+        conn = self.get_connection()
+        return conn.execute('PRAGMA data_version').fetchone()[0]
+    
+    def get_perubahan(self, sejak):
+        """
+        Ambil ID baris yang berubah setelah revisi tertentu
+        
+        Args:
+            sejak: revisi terakhir yang sudah diterapkan pemanggil
+        
+        Returns:
+            (revisi_baru, {'alat': set(id), 'peminjaman': set(id), 'reservasi': set(id)}) atau
+            (revisi_baru, None) jika log sejak revisi itu sudah dipangkas
+            atau terlalu banyak (mis. setelah import massal) sehingga
+            pemanggil lebih murah reload penuh
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT MIN(seq), MAX(seq) FROM perubahan')
+        oldest, newest = cursor.fetchone()
+        # seq berurutan tanpa celah, jadi jumlah perubahan = newest - sejak
+        if newest is not None and newest - sejak > PERUBAHAN_MAKS_PARSIAL:
+            return newest, None
+        cursor.execute(
+            'SELECT seq, tabel, row_id FROM perubahan WHERE seq > ? ORDER BY seq',
+            (sejak,)
+        )
+        rows = cursor.fetchall()
+        revisi = rows[-1][0] if rows else sejak
+        if oldest is not None and sejak < oldest - 1:
+            return revisi, None
+        
+        changes = {'alat': set(), 'peminjaman': set(), 'reservasi': set()}
+        for seq, tabel, row_id in rows:
+            changes[tabel].add(row_id)
+        return revisi, changes
+    
+    def get_perubahan_rows(self, sejak):
+        """
+        Seperti get_perubahan, plus baris terbaru untuk setiap ID yang berubah
+        
+        Returns:
+            (revisi_baru, {'alat': (rows, removed_ids), 'peminjaman': (rows, removed_ids),
+            'reservasi': set(id)}) atau (revisi_baru, None) jika pemanggil harus
+            reload penuh. Untuk reservasi hanya ID-nya: posisi antrean ikut
+            bergeser, jadi pemanggil memuat ulang daftar reservasinya.
+        """
+        revisi, changes = self.get_perubahan(sejak)
+        if changes is None:
+            self.alat_cache.invalidate_all()
+            return revisi, None
+        # Perubahan alat (termasuk dari client lain) membuat cache basi
+        self.alat_cache.invalidate(changes['alat'])
+        
+        result = {}
+        for tabel, fetch in (('alat', self.get_alat_by_ids), ('peminjaman', self.get_peminjaman_by_ids)):
+            ids = changes[tabel]
+            rows = fetch(ids) if ids else []
+            result[tabel] = (rows, ids - {row[0] for row in rows})
+        result['reservasi'] = changes['reservasi']
+        return revisi, result
+    
+    def prune_perubahan(self, simpan=PERUBAHAN_DISIMPAN):
+        """Pangkas log perubahan, sisakan entri terbaru saja"""
+        with self.transaction() as cursor:
+            cursor.execute(
+                'DELETE FROM perubahan WHERE seq <= (SELECT MAX(seq) FROM perubahan) - ?',
+                (simpan,)
+            )
+
+
+def _catat_mutasi(cursor, id_alat, jenis, mutasi):
+    """
+    Tulis mutasi stok satu alat; dipanggil di transaksi yang sama dengan
+    perubahan stoknya
+    
+    mutasi: [(perubahan, ref_id), ...]. Saldo dilanjutkan dari mutasi
+    terakhir (bukan dibaca dari alat.stok), sehingga perubahan stok yang
+    tidak tercatat tetap terlihat saat rekonsiliasi.
+    """
+    cursor.execute(
+        'SELECT saldo, total FROM mutasi_stok WHERE id_alat=? ORDER BY id DESC LIMIT 1',
+        (id_alat,)
+    )
+    saldo, total = cursor.fetchone() or (0, 0)
+    rows = []
+    for perubahan, ref_id in mutasi:
+        saldo += perubahan
+        if jenis not in MUTASI_PINJAMAN:
+            total += perubahan
+        rows.append((id_alat, jenis, perubahan, saldo, total, ref_id))
+    cursor.executemany(
+        'INSERT INTO mutasi_stok (id_alat, jenis, perubahan, saldo, total, ref_id) VALUES (?, ?, ?, ?, ?, ?)',
+        rows
+    )
+
+
+def _catat_peminjaman(cursor, user_id, nama_peminjam, id_alat, jumlah, lama_hari=LAMA_PINJAM_HARI):
+    """
+    Insert peminjaman Dipinjam beserta mutasi stoknya (stok alat sudah
+    dikurangi pemanggil); nama_peminjam disimpan sebagai nama
+    tampilan/pencarian saat dipinjam
+    
+    Returns:
+        id peminjaman baru
+    """
+    cursor.execute(
+        '''INSERT INTO peminjaman (user_id, nama_peminjam, id_alat, jumlah, status, tanggal_jatuh_tempo)
+           VALUES (?, ?, ?, ?, ?, datetime('now', ?))''',
+        (user_id, nama_peminjam, id_alat, jumlah, 'Dipinjam', f'+{int(lama_hari)} days')
+    )
+    id_peminjaman = cursor.lastrowid
+    _catat_mutasi(cursor, id_alat, 'pinjam', [(-jumlah, id_peminjaman)])
+    return id_peminjaman
+
+
+def _alokasi_reservasi(cursor, id_alat):
+    """
+    Jatahkan stok alat ke antrean reservasinya; dipanggil di transaksi yang
+    sama setelah stok bertambah
+    
+    Kepala antrean yang jumlahnya muat dijadikan peminjaman, berurutan
+    sampai kepala antrean tidak muat (tidak ada yang menyalip). Tiap
+    langkah satu lookup idx_reservasi_antrean.
+    
+    Returns:
+        list (id_reservasi, id_peminjaman)
+    """
+    dialokasikan = []
+    while True:
+        cursor.execute('''
+            SELECT r.id, r.user_id, u.username, r.jumlah
+            FROM reservasi r INDEXED BY idx_reservasi_antrean
+            JOIN users u ON u.id = r.user_id
+            WHERE r.id_alat = ? AND r.status = 'Menunggu'
+            ORDER BY r.id
+            LIMIT 1
+        ''', (id_alat,))
+        kepala = cursor.fetchone()
+        if kepala is None:
+            break
+        id_reservasi, user_id, username, jumlah = kepala
+        cursor.execute(
+            'UPDATE alat SET stok = stok - ? WHERE id=? AND stok >= ?',
+            (jumlah, id_alat, jumlah)
+        )
+        if cursor.rowcount == 0:
+            break
+        id_peminjaman = _catat_peminjaman(cursor, user_id, username, id_alat, jumlah)
+        cursor.execute(
+            '''UPDATE reservasi SET status='Dialokasikan', id_peminjaman=?, tanggal_alokasi=CURRENT_TIMESTAMP
+               WHERE id=?''',
+            (id_peminjaman, id_reservasi)
+        )
+        dialokasikan.append((id_reservasi, id_peminjaman))
+    return dialokasikan
+
+
+def _sumber_peminjaman(termasuk_arsip):
+    """Sumber FROM untuk query riwayat: peminjaman saja atau digabung dengan arsip"""
+    if not termasuk_arsip:
+        return 'peminjaman'
+    return (f'(SELECT {KOLOM_PEMINJAMAN} FROM peminjaman '
+            f'UNION ALL SELECT {KOLOM_PEMINJAMAN} FROM peminjaman_arsip)')
+
+
+def _kata_kunci(teks):
+    """Pecah teks pencarian menjadi kata (huruf/angka saja, aman untuk query FTS)"""
+    return re.findall(r'\w+', teks or '')
+
+
+def _escape_like(teks):
+    return teks.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _chunks(items, size=500):
+    """Pecah list parameter agar tidak melebihi batas variabel SQLite"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _placeholders(items):
+    return ', '.join('?' * len(items))
@@ -0,0 +1,470 @@
+"""
+Migrasi skema database SIJAtools
+Versi skema disimpan di PRAGMA user_version. Setiap migrasi bernomor
+dijalankan tepat sekali dalam transaksinya sendiri; jika versi database
+sudah terbaru, tidak ada DDL yang dijalankan sama sekali.
+
+Menambah migrasi baru: tulis fungsi migrasi_NNN(cursor) lalu daftarkan
+di MIGRATIONS dengan nomor berikutnya. Gunakan ALTER TABLE ADD COLUMN /
+CREATE INDEX / CREATE TABLE (tidak perlu rebuild tabel besar).
+"""
+
+import sqlite3
+from contextlib import contextmanager
+
+
+def migrasi_001_skema_awal(cursor):
+    """Tabel alat, peminjaman, users + user default"""
+    # Tabel untuk data alat
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS alat (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nama_alat TEXT NOT NULL UNIQUE,
+            stok INTEGER NOT NULL,
+            deskripsi TEXT,
+            tanggal_ditambah TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Tabel untuk data peminjaman
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS peminjaman (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nama_peminjam TEXT NOT NULL,
+            id_alat INTEGER NOT NULL,
+            jumlah INTEGER NOT NULL,
+            status TEXT DEFAULT 'Dipinjam',
+            tanggal_peminjaman TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            tanggal_pengembalian TIMESTAMP,
+            FOREIGN KEY (id_alat) REFERENCES alat(id)
+        )
+    ''')
+    
+    # Tabel untuk users (LOGIN SYSTEM)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL,
+            role TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Insert default users jika users table baru
+    cursor.execute('SELECT COUNT(*) FROM users')
+    if cursor.fetchone()[0] == 0:
+        cursor.execute(
+            'INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
+            ('admin', 'admin123', 'admin')
+        )
+        cursor.execute(
+            'INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
+            ('user1', 'user123', 'user')
+        )
+
+
+def migrasi_002_index_peminjaman(cursor):
+    """Index lookup peminjaman (filter status / peminjam, urut tanggal)"""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_peminjaman_status_tanggal
+        ON peminjaman (status, tanggal_peminjaman)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_peminjaman_peminjam_tanggal
+        ON peminjaman (nama_peminjam, tanggal_peminjaman)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_peminjaman_tanggal
+        ON peminjaman (tanggal_peminjaman)
+    ''')
+
+
+def migrasi_003_log_perubahan(cursor):
+    """Log perubahan (change counter) untuk alat dan peminjaman via trigger"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS perubahan (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabel TEXT NOT NULL,
+            row_id INTEGER NOT NULL
+        )
+    ''')
+    for tabel in ('alat', 'peminjaman'):
+        buat_trigger_perubahan(cursor, tabel)
+
+
+def buat_trigger_perubahan(cursor, tabel):
+    """Trigger insert/update/delete yang mencatat ID baris tabel ke log perubahan"""
+    for aksi, ref in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{tabel}_{aksi.lower()}_perubahan
+            AFTER {aksi} ON {tabel}
+            BEGIN
+                INSERT INTO perubahan (tabel, row_id) VALUES ('{tabel}', {ref}.id);
+            END
+        ''')
+
+
+# Kolom statistik_alat dan sumbangan satu baris peminjaman (ref = NEW/OLD)
+STATISTIK_KOLOM = ('total_pinjam', 'total_unit', 'unit_keluar', 'jumlah_kembali', 'total_durasi')
+
+
+def _kontribusi_statistik(ref):
+    return (
+        '1',
+        f'{ref}.jumlah',
+        f"CASE WHEN {ref}.status = 'Dipinjam' THEN {ref}.jumlah ELSE 0 END",
+        f'CASE WHEN {ref}.tanggal_pengembalian IS NOT NULL THEN 1 ELSE 0 END',
+        f"COALESCE(strftime('%s', {ref}.tanggal_pengembalian) - strftime('%s', {ref}.tanggal_peminjaman), 0)",
+    )
+
+
+def isi_statistik_alat(cursor, tabel=('peminjaman', 'peminjaman_arsip')):
+    """Hitung ulang statistik_alat dari seluruh peminjaman (termasuk arsip)"""
+    cursor.execute('DELETE FROM statistik_alat')
+    sumber = ' UNION ALL '.join(
+        f'SELECT id_alat, jumlah, status, tanggal_peminjaman, tanggal_pengembalian FROM {t}' for t in tabel
+    )
+    agregat = ', '.join(f'SUM({expr})' for expr in _kontribusi_statistik('p'))
+    cursor.execute(f'''
+        INSERT INTO statistik_alat (id_alat, {', '.join(STATISTIK_KOLOM)})
+        SELECT id_alat, {agregat} FROM ({sumber}) p GROUP BY id_alat
+    ''')
+
+
+def migrasi_004_statistik_alat(cursor):
+    """Ringkasan peminjaman per alat yang dijaga trigger (untuk dashboard)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS statistik_alat (
+            id_alat INTEGER PRIMARY KEY,
+            total_pinjam INTEGER NOT NULL DEFAULT 0,
+            total_unit INTEGER NOT NULL DEFAULT 0,
+            unit_keluar INTEGER NOT NULL DEFAULT 0,
+            jumlah_kembali INTEGER NOT NULL DEFAULT 0,
+            total_durasi INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    
+    kolom = ', '.join(STATISTIK_KOLOM)
+    tambah = f'''
+        INSERT INTO statistik_alat (id_alat, {kolom})
+        VALUES (NEW.id_alat, {', '.join(_kontribusi_statistik('NEW'))})
+        ON CONFLICT (id_alat) DO UPDATE SET
+            {', '.join(f'{k} = {k} + excluded.{k}' for k in STATISTIK_KOLOM)};
+    '''
+    kurang = f'''
+        UPDATE statistik_alat SET
+            {', '.join(f'{k} = {k} - ({expr})' for k, expr in zip(STATISTIK_KOLOM, _kontribusi_statistik('OLD')))}
+        WHERE id_alat = OLD.id_alat;
+    '''
+    for aksi, body in (('INSERT', tambah), ('UPDATE', kurang + tambah), ('DELETE', kurang)):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_peminjaman_{aksi.lower()}_statistik
+            AFTER {aksi} ON peminjaman
+            BEGIN
+                {body}
+            END
+        ''')
+    
+    # Tabel arsip baru ada sejak migrasi 6
+    isi_statistik_alat(cursor, ('peminjaman',))
+
+
+def migrasi_005_pencarian_fts(cursor):
+    """Index FTS5 untuk pencarian alat (nama, deskripsi) dan nama peminjam"""
+    # Daftar nama peminjam unik, diisi trigger dari peminjaman. Index teks
+    # dibuat di sini (ribuan nama) dan bukan per baris peminjaman (ratusan ribu).
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS peminjam (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nama TEXT NOT NULL UNIQUE
+        )
+    ''')
+    for aksi in ('INSERT', 'UPDATE OF nama_peminjam'):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_peminjaman_{aksi.split()[0].lower()}_peminjam
+            AFTER {aksi} ON peminjaman
+            BEGIN
+                INSERT OR IGNORE INTO peminjam (nama) VALUES (NEW.nama_peminjam);
+            END
+        ''')
+    cursor.execute('INSERT OR IGNORE INTO peminjam (nama) SELECT DISTINCT nama_peminjam FROM peminjaman')
+    
+    try:
+        for tabel, kolom in (('alat', 'nama_alat, deskripsi'), ('peminjam', 'nama')):
+            cursor.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS {tabel}_fts USING fts5(
+                    {kolom}, content='{tabel}', content_rowid='id', prefix='2 3'
+                )
+            ''')
+    except sqlite3.OperationalError:
+        # SQLite tanpa FTS5: pencarian memakai LIKE (lihat DatabaseManager._kondisi_cari)
+        return
+    
+    for tabel, kolom in (('alat', ('nama_alat', 'deskripsi')), ('peminjam', ('nama',))):
+        daftar = ', '.join(kolom)
+        new = ', '.join(f'NEW.{k}' for k in kolom)
+        old = ', '.join(f'OLD.{k}' for k in kolom)
+        tambah = f"INSERT INTO {tabel}_fts (rowid, {daftar}) VALUES (NEW.id, {new});"
+        hapus = f"INSERT INTO {tabel}_fts ({tabel}_fts, rowid, {daftar}) VALUES ('delete', OLD.id, {old});"
+        # UPDATE hanya untuk kolom teks: perubahan stok tidak menyentuh index
+        for aksi, body in (('INSERT', tambah), (f'UPDATE OF {daftar}', hapus + tambah), ('DELETE', hapus)):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{tabel}_{aksi.split()[0].lower()}_fts
+                AFTER {aksi} ON {tabel}
+                BEGIN
+                    {body}
+                END
+            ''')
+        cursor.execute(f"INSERT INTO {tabel}_fts ({tabel}_fts) VALUES ('rebuild')")
+
+
+def migrasi_006_arsip_peminjaman(cursor):
+    """Tabel arsip untuk peminjaman lama yang sudah dikembalikan"""
+    # Kolom sama dengan peminjaman; ID asli dipertahankan (tanpa AUTOINCREMENT)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS peminjaman_arsip (
+            id INTEGER PRIMARY KEY,
+            nama_peminjam TEXT NOT NULL,
+            id_alat INTEGER NOT NULL,
+            jumlah INTEGER NOT NULL,
+            status TEXT,
+            tanggal_peminjaman TIMESTAMP,
+            tanggal_pengembalian TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_peminjaman_arsip_peminjam_tanggal
+        ON peminjaman_arsip (nama_peminjam, tanggal_peminjaman)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_peminjaman_arsip_tanggal
+        ON peminjaman_arsip (tanggal_peminjaman)
+    ''')
+    
+    # Baris yang dipindah ke arsip tetap dihitung di statistik_alat: hapus
+    # dari peminjaman hanya mengurangi statistik jika barisnya tidak diarsipkan
+    kurang = ', '.join(
+        f'{k} = {k} - ({expr})' for k, expr in zip(STATISTIK_KOLOM, _kontribusi_statistik('OLD'))
+    )
+    cursor.execute('DROP TRIGGER IF EXISTS trg_peminjaman_delete_statistik')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_peminjaman_delete_statistik
+        AFTER DELETE ON peminjaman
+        WHEN NOT EXISTS (SELECT 1 FROM peminjaman_arsip WHERE id = OLD.id)
+        BEGIN
+            UPDATE statistik_alat SET {kurang} WHERE id_alat = OLD.id_alat;
+        END
+    ''')
+
+
+def migrasi_007_user_id_peminjaman(cursor):
+    """Kolom user_id (foreign key ke users) di peminjaman dan arsip, dengan index"""
+    for tabel in ('peminjaman', 'peminjaman_arsip'):
+        tambah_kolom(cursor, tabel, 'user_id INTEGER REFERENCES users(id)')
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_{tabel}_user_tanggal
+            ON {tabel} (user_id, tanggal_peminjaman)
+        ''')
+        # Backfill dari username; nama yang bukan user terdaftar tetap NULL.
+        # Kolom yang dihitung statistik/log tidak berubah, trigger tidak perlu jalan.
+        with tanpa_trigger(cursor, tabel):
+            cursor.execute(f'''
+                UPDATE {tabel} SET user_id = (
+                    SELECT u.id FROM users u WHERE u.username = {tabel}.nama_peminjam
+                )
+                WHERE user_id IS NULL
+            ''')
+
+
+def migrasi_008_index_aktif_user(cursor):
+    """Covering index peminjaman aktif per user (partial: hanya status Dipinjam)"""
+    # Berisi semua kolom yang dibaca get_peminjaman_aktif_user, sehingga
+    # query tidak perlu membuka baris tabel; ukurannya hanya sebanyak pinjaman aktif
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_peminjaman_aktif_user
+        ON peminjaman (user_id, status, tanggal_peminjaman, id_alat, jumlah, nama_peminjam)
+        WHERE status = 'Dipinjam'
+    ''')
+
+
+def migrasi_009_mutasi_stok(cursor):
+    """Buku mutasi stok (append-only) dengan saldo berjalan per alat"""
+    # saldo = stok alat setelah mutasi; total = baseline (stok + unit yang
+    # sedang dipinjam), hanya berubah oleh mutasi selain pinjam/kembali.
+    # Per alat: saldo terakhir == SUM(perubahan)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mutasi_stok (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_alat INTEGER NOT NULL,
+            jenis TEXT NOT NULL,
+            perubahan INTEGER NOT NULL,
+            saldo INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            ref_id INTEGER,
+            waktu TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Mutasi terakhir per alat = satu lookup index; jenis dan perubahan ikut
+    # disimpan agar cek keseimbangan buku tidak perlu membaca tabel
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_mutasi_stok_alat
+        ON mutasi_stok (id_alat, id, jenis, perubahan)
+    ''')
+    
+    # Saldo awal dari data yang ada: unit yang sedang dipinjam dihitung
+    # masuk dulu, lalu dicatat keluar sebagai satu mutasi pinjam, sehingga
+    # saldo dan total tetap sama dengan jumlah perubahan
+    cursor.execute('''
+        CREATE TEMP TABLE saldo_awal AS
+        SELECT a.id AS id_alat, a.stok AS stok, COALESCE(SUM(p.jumlah), 0) AS dipinjam
+        FROM alat a
+        LEFT JOIN peminjaman p ON p.id_alat = a.id AND p.status = 'Dipinjam'
+        GROUP BY a.id
+    ''')
+    cursor.execute('''
+        INSERT INTO mutasi_stok (id_alat, jenis, perubahan, saldo, total)
+        SELECT id_alat, 'saldo_awal', stok + dipinjam, stok + dipinjam, stok + dipinjam
+        FROM saldo_awal
+    ''')
+    cursor.execute('''
+        INSERT INTO mutasi_stok (id_alat, jenis, perubahan, saldo, total)
+        SELECT id_alat, 'pinjam', -dipinjam, stok, stok + dipinjam
+        FROM saldo_awal WHERE dipinjam > 0
+    ''')
+    cursor.execute('DROP TABLE temp.saldo_awal')
+
+
+def migrasi_010_jatuh_tempo(cursor):
+    """Kolom tanggal_jatuh_tempo dan index (status, jatuh tempo) untuk cek keterlambatan"""
+    for tabel in ('peminjaman', 'peminjaman_arsip'):
+        tambah_kolom(cursor, tabel, 'tanggal_jatuh_tempo TIMESTAMP')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_peminjaman_jatuh_tempo
+        ON peminjaman (status, tanggal_jatuh_tempo)
+    ''')
+    # Peminjaman aktif lama diberi jatuh tempo 7 hari dari tanggal pinjam;
+    # yang sudah dikembalikan tetap NULL. Kolom ini tidak dibaca trigger.
+    with tanpa_trigger(cursor, 'peminjaman'):
+        cursor.execute('''
+            UPDATE peminjaman SET tanggal_jatuh_tempo = datetime(tanggal_peminjaman, '+7 days')
+            WHERE status = 'Dipinjam' AND tanggal_jatuh_tempo IS NULL
+        ''')
+
+
+def migrasi_011_reservasi(cursor):
+    """Antrean reservasi (FIFO per alat) untuk alat yang stoknya kurang"""
+    # status: Menunggu -> Dialokasikan (jadi peminjaman id_peminjaman) atau Dibatalkan.
+    # diberitahu = 1 setelah user pemesan melihat notifikasi alokasinya.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS reservasi (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL REFERENCES users(id),
+            id_alat INTEGER NOT NULL,
+            jumlah INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'Menunggu',
+            tanggal_reservasi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            id_peminjaman INTEGER,
+            tanggal_alokasi TIMESTAMP,
+            diberitahu INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    # Kepala antrean satu alat = lookup pertama index ini (partial: hanya
+    # yang masih menunggu, jadi ukurannya sebanding panjang antrean)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_reservasi_antrean
+        ON reservasi (id_alat, id) WHERE status = 'Menunggu'
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_reservasi_user
+        ON reservasi (user_id, status, diberitahu)
+    ''')
+
+
+def migrasi_012_log_perubahan_reservasi(cursor):
+    """Reservasi ikut dicatat di log perubahan (antrean dari client lain)"""
+    buat_trigger_perubahan(cursor, 'reservasi')
+
+
+# (versi, deskripsi, fungsi) - urut naik, nomor tidak boleh diubah setelah rilis
+MIGRATIONS = (
+    (1, "Skema awal: alat, peminjaman, users", migrasi_001_skema_awal),
+    (2, "Index lookup peminjaman", migrasi_002_index_peminjaman),
+    (3, "Log perubahan alat dan peminjaman", migrasi_003_log_perubahan),
+    (4, "Statistik peminjaman per alat", migrasi_004_statistik_alat),
+    (5, "Index pencarian FTS5", migrasi_005_pencarian_fts),
+    (6, "Arsip peminjaman lama", migrasi_006_arsip_peminjaman),
+    (7, "user_id di peminjaman", migrasi_007_user_id_peminjaman),
+    (8, "Index peminjaman aktif per user", migrasi_008_index_aktif_user),
+    (9, "Buku mutasi stok", migrasi_009_mutasi_stok),
+    (10, "Jatuh tempo peminjaman", migrasi_010_jatuh_tempo),
+    (11, "Antrean reservasi alat", migrasi_011_reservasi),
+    (12, "Log perubahan reservasi", migrasi_012_log_perubahan_reservasi),
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def kolom_ada(cursor, tabel, kolom):
+    """Cek apakah kolom sudah ada (agar ADD COLUMN aman diulang)"""
+    cursor.execute(f'PRAGMA table_info({tabel})')
+    return any(row[1] == kolom for row in cursor.fetchall())
+
+
+def tambah_kolom(cursor, tabel, definisi):
+    """ALTER TABLE ADD COLUMN jika kolom belum ada (O(1), tanpa rebuild tabel)"""
+    kolom = definisi.split()[0]
+    if not kolom_ada(cursor, tabel, kolom):
+        cursor.execute(f'ALTER TABLE {tabel} ADD COLUMN {definisi}')
+
+
+@contextmanager
+def tanpa_trigger(cursor, tabel):
+    """
+    Lepas sementara trigger milik tabel (mis. untuk backfill massal), lalu pasang lagi
+    
+    Hanya untuk dipakai di dalam transaksi migrasi: jika gagal, rollback
+    ikut mengembalikan trigger yang sudah di-drop.
+    """
+    cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (tabel,))
+    triggers = cursor.fetchall()
+    for nama, _ in triggers:
+        cursor.execute(f'DROP TRIGGER {nama}')
+    yield
+    for _, sql in triggers:
+        cursor.execute(sql)
+
+
+def get_schema_version(conn):
+    """Versi skema database saat ini"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn):
+    """
+    Jalankan migrasi yang belum diterapkan
+    
+    Returns:
+        list versi migrasi yang dijalankan (kosong jika skema sudah terbaru)
+    """
+    if get_schema_version(conn) >= LATEST_VERSION:
+        return []
+    
+    applied = []
+    for version, deskripsi, fungsi in MIGRATIONS:
+        # Satu transaksi per migrasi; versi dibaca ulang setelah lock
+        # karena proses lain mungkin baru saja menjalankan migrasi yang sama
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            cursor = conn.cursor()
+            fungsi(cursor)
+            cursor.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        applied.append(version)
+    return applied
@@ -12,10 +12,10 @@ Struktur:
 - ui/user_ui.py    : User UI tabs
 """
 
+import threading
 import tkinter as tk
 from tkinter import ttk
 from auth.login import RoleSelectionWindow
-from ui.components import setup_styles
 
 
 class SIJAtoolsApp:
@@ -31,9 +31,17 @@ class SIJAtoolsApp:
         self.username = current_user['username'] if current_user else 'Guest'
         self.user_role = current_user['role'] if current_user else 'guest'
         
+        # Modul UI dan database baru diimport setelah login
+        from ui.components import setup_styles
+        from services.worker import DbWorker
+        
         # Setup styles
         setup_styles()
         
+        # Worker background untuk semua query database
+        self.worker = DbWorker(self.root)
+        self.worker.add_busy_listener(self.set_loading)
+        
         # Buat interface
         self.create_widgets()
     
@@ -59,9 +67,15 @@ class SIJAtoolsApp:
         )
         user_info.pack(side=tk.RIGHT, padx=10)
         
-        # Notebook (Tab)
+        # Indikator loading saat ada query berjalan di background
+        self.loading_label = ttk.Label(header_frame, text="", font=('Arial', 9), foreground='gray')
+        self.loading_label.pack(side=tk.RIGHT, padx=10)
+        
+        # Notebook (Tab); tab dibangun dan di-refresh hanya saat terlihat
+        from ui.components import TabManager
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.tabs = TabManager(self.notebook)
         
         # Load UI berdasarkan role
         if self.user_role == 'admin':
@@ -72,26 +86,45 @@ class SIJAtoolsApp:
     def load_admin_ui(self):
         """Load admin UI"""
         from ui.admin_ui import AdminUI
-        AdminUI(self.notebook, self.current_user)
+        AdminUI(self.notebook, self.current_user, self.worker, self.tabs)
     
     def load_user_ui(self):
         """Load user UI"""
         from ui.user_ui import UserUI
-        UserUI(self.notebook, self.current_user)
+        UserUI(self.notebook, self.current_user, self.worker, self.tabs)
+    
+    def set_loading(self, busy):
+        """Tampilkan status loading selama worker masih bekerja"""
+        self.loading_label.config(text="Memuat..." if busy else "")
+        self.root.config(cursor='watch' if busy else '')
+
+
+def prewarm_database():
+    """Import modul database dan jalankan migrasi di background"""
+    def run():
+        from database.db import DatabaseManager
+        DatabaseManager()
+    
+    threading.Thread(target=run, name='sijatools-prewarm', daemon=True).start()
 
 
 def main():
     """Entry point aplikasi"""
-    # STEP 1: Tampilkan Role Selection Window
+    # STEP 1: Tampilkan Role Selection Window; database disiapkan di
+    # background setelah frame pertama tampil
     root = tk.Tk()
     role_selection = RoleSelectionWindow(root)
+    root.after_idle(prewarm_database)
     root.mainloop()
     
     # STEP 2: Setelah user memilih role dan login sukses, buka dashboard
+    # di root yang sama (tanpa membuat interpreter Tk kedua)
     if role_selection.current_user:
-        app_root = tk.Tk()
-        app = SIJAtoolsApp(app_root, role_selection.current_user)
-        app_root.mainloop()
+        for child in root.winfo_children():
+            child.destroy()
+        app = SIJAtoolsApp(root, role_selection.current_user)
+        root.mainloop()
+        app.worker.shutdown()
 
 
 if __name__ == "__main__":
@@ -1 +1,18 @@
 # Services module
+
+from database.db import DatabaseManager
+
+
+class Service:
+    """Dasar service: DatabaseManager dibuat saat pertama dipakai"""
+    
+    def __init__(self, db=None):
+        self._db = db
+    
+    @property
+    def db(self):
+        # DatabaseManager (dan migrasi) baru dibuat saat pertama dipakai,
+        # biasanya dari thread worker
+        if self._db is None:
+            self._db = DatabaseManager()
+        return self._db
@@ -0,0 +1,61 @@
+"""
+Account service untuk SIJAtools
+Validasi login dan registrasi akun
+"""
+
+from services import Service
+
+
+def validasi_register(username, password, confirm):
+    """
+    Validasi form registrasi
+    
+    Returns:
+        None jika valid, atau (nama_field, pesan error)
+    """
+    if not username:
+        return 'username', "Username tidak boleh kosong"
+    
+    if len(username) < 3:
+        return 'username', "Username minimal 3 karakter"
+    
+    if not password:
+        return 'password', "Password tidak boleh kosong"
+    
+    if password != confirm:
+        return 'confirm', "Password dan konfirmasi tidak sama"
+    
+    return None
+
+
+class AccountService(Service):
+    """Operasi akun user"""
+    
+    def login(self, username, password, role=None):
+        """
+        Login dengan validasi role (jika role diberikan)
+        
+        Returns:
+            (True, {'id', 'username', 'role'}) atau (False, pesan error)
+        """
+        if not username or not password:
+            return False, "Username dan password harus diisi"
+        
+        success, result = self.db.login(username, password)
+        if not success:
+            return False, result
+        
+        user_role = result['role']
+        if role is not None and user_role != role:
+            return False, (
+                f"Akun '{username}' adalah akun {user_role.upper()}, "
+                f"bukan akun {role.upper()}\n\n"
+                f"Gunakan akun yang sesuai dengan role yang dipilih."
+            )
+        return True, result
+    
+    def register(self, username, password, confirm):
+        error = validasi_register(username, password, confirm)
+        if error is not None:
+            return False, error[1]
+        return self.db.register(username, password)
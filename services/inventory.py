@@ -0,0 +1,82 @@
+"""
+Inventory service untuk SIJAtools
+Validasi dan operasi data alat, bisa dipakai dari UI maupun CLI
+"""
+
+from services import Service
+
+
+def validasi_alat(nama, stok):
+    """
+    Validasi input alat
+    
+    Returns:
+        (True, (nama, stok_int)) atau (False, pesan error)
+    """
+    nama = (nama or '').strip()
+    stok = str(stok if stok is not None else '').strip()
+    
+    if not nama or not stok:
+        return False, "Nama alat dan stok harus diisi"
+    
+    try:
+        stok = int(stok)
+        if stok < 0:
+            raise ValueError()
+    except ValueError:
+        return False, "Stok harus berupa angka positif"
+    
+    return True, (nama, stok)
+
+
+class InventoryService(Service):
+    """Operasi manajemen alat"""
+    
+    def tambah_alat(self, nama, stok, deskripsi=""):
+        valid, result = validasi_alat(nama, stok)
+        if not valid:
+            return False, result
+        nama, stok = result
+        return self.db.tambah_alat(nama, stok, (deskripsi or '').strip())
+    
+    def edit_alat(self, id_alat, nama, stok, deskripsi=""):
+        if id_alat is None:
+            return False, "Pilih alat yang akan diperbarui"
+        valid, result = validasi_alat(nama, stok)
+        if not valid:
+            return False, result
+        nama, stok = result
+        return self.db.edit_alat(id_alat, nama, stok, (deskripsi or '').strip())
+    
+    def hapus_alat(self, id_alat):
+        return self.db.hapus_alat(id_alat)
+    
+    def daftar_alat(self):
+        """Semua alat: list (id, nama_alat, stok, deskripsi)"""
+        return self.db.get_all_alat()
+    
+    def pencarian_alat(self, teks, after=None, limit=100):
+        """
+        Alat yang nama/deskripsinya cocok dengan teks (prefix per kata), urut
+        nama; after = nama_alat baris terakhir halaman sebelumnya
+        """
+        return self.db.cari_alat(teks, after=after, limit=limit)
+    
+    def cari_alat(self, alat):
+        """Cari alat berdasarkan ID atau nama persis, None jika tidak ada"""
+        if isinstance(alat, int) or str(alat).isdigit():
+            return self.db.get_alat_by_id(int(alat))
+        return self.db.get_alat_by_nama(str(alat).strip())
+    
+    def import_csv(self, path):
+        return self.db.import_alat_csv(path)
+    
+    def export_csv(self, path):
+        return self.db.export_alat_csv(path)
+    
+    def rekonsiliasi(self, penuh=False):
+        """Cek stok alat terhadap buku mutasi (lihat DatabaseManager.rekonsiliasi_stok)"""
+        return self.db.rekonsiliasi_stok(penuh)
+    
+    def riwayat_stok(self, id_alat, limit=50):
+        return self.db.get_mutasi_stok(id_alat, limit)
@@ -0,0 +1,152 @@
+"""
+Loan service untuk SIJAtools
+Validasi dan operasi peminjaman / pengembalian alat
+"""
+
+from services import Service
+
+
+def validasi_jumlah(jumlah):
+    """
+    Validasi jumlah pinjam
+    
+    Returns:
+        (True, jumlah_int) atau (False, pesan error)
+    """
+    try:
+        jumlah = int(str(jumlah).strip())
+        if jumlah <= 0:
+            raise ValueError()
+    except ValueError:
+        return False, "Jumlah harus berupa angka positif"
+    return True, jumlah
+
+
+class LoanService(Service):
+    """Operasi peminjaman dan pengembalian"""
+    
+    def pinjam(self, user_id, id_alat, jumlah, lama_hari=None):
+        if id_alat is None or jumlah is None or str(jumlah).strip() == '':
+            return False, "Pilih alat dan isi jumlah"
+        valid, result = validasi_jumlah(jumlah)
+        if not valid:
+            return False, result
+        if lama_hari is None:
+            return self.db.tambah_peminjaman(user_id, id_alat, result)
+        if lama_hari <= 0:
+            return False, "Lama pinjam harus minimal 1 hari"
+        return self.db.tambah_peminjaman(user_id, id_alat, result, lama_hari)
+    
+    def pinjam_banyak(self, user_id, items, lama_hari=None):
+        """
+        Pinjam isi keranjang [(id_alat, jumlah), ...] dalam satu transaksi
+        (semua berhasil atau tidak ada yang dipinjam)
+        
+        Returns:
+            (True, [id_peminjaman, ...]) atau (False, pesan error)
+        """
+        valid_items = []
+        for id_alat, jumlah in items:
+            valid, result = validasi_jumlah(jumlah)
+            if not valid:
+                return False, result
+            valid_items.append((id_alat, result))
+        if not valid_items:
+            return False, "Keranjang kosong"
+        if lama_hari is None:
+            return self.db.tambah_peminjaman_banyak(user_id, valid_items)
+        if lama_hari <= 0:
+            return False, "Lama pinjam harus minimal 1 hari"
+        return self.db.tambah_peminjaman_banyak(user_id, valid_items, lama_hari)
+    
+    def kembalikan(self, id_peminjaman):
+        return self.db.kembalikan_alat(id_peminjaman)
+    
+    def kembalikan_banyak(self, ids):
+        """
+        Kembalikan beberapa peminjaman sekaligus (mis. batch akhir praktikum)
+        dalam satu transaksi
+        
+        Returns:
+            list (id_peminjaman, success, pesan)
+        """
+        ids = list(dict.fromkeys(ids))
+        success, result = self.db.kembalikan_banyak(ids)
+        if not success:
+            return [(id_peminjaman, False, result) for id_peminjaman in ids]
+        gagal = dict(result['gagal'])
+        return [
+            (id_peminjaman, False, gagal[id_peminjaman]) if id_peminjaman in gagal
+            else (id_peminjaman, True, "Alat berhasil dikembalikan")
+            for id_peminjaman in ids
+        ]
+    
+    def reservasi(self, user_id, id_alat, jumlah):
+        """Antre alat yang stoknya kurang; dialokasikan otomatis saat stok kembali"""
+        if id_alat is None or jumlah is None or str(jumlah).strip() == '':
+            return False, "Pilih alat dan isi jumlah"
+        valid, result = validasi_jumlah(jumlah)
+        if not valid:
+            return False, result
+        return self.db.tambah_reservasi(user_id, id_alat, result)
+    
+    def batalkan_reservasi(self, id_reservasi, user_id=None):
+        return self.db.batalkan_reservasi(id_reservasi, user_id)
+    
+    def daftar_reservasi(self, user_id):
+        return self.db.get_reservasi_user(user_id)
+    
+    def notifikasi_reservasi(self, user_id):
+        """Reservasi yang baru dialokasikan untuk user (masing-masing hanya sekali)"""
+        return self.db.ambil_notifikasi_reservasi(user_id)
+    
+    def peminjaman_aktif(self, user_id=None):
+        if user_id is not None:
+            return self.db.get_peminjaman_aktif_user(user_id)
+        return self.db.get_peminjaman_by_status('Dipinjam')
+    
+    def terlambat(self, sejak=None, sampai=None):
+        """Peminjaman aktif yang jatuh tempo di (sejak, sampai]; lihat OverdueChecker"""
+        return self.db.get_peminjaman_terlambat(sejak, sampai)
+    
+    def riwayat(self, user_id=None, termasuk_arsip=False):
+        if user_id is not None:
+            return self.db.get_peminjaman_by_user(user_id, termasuk_arsip)
+        return self.db.get_all_peminjaman(termasuk_arsip)
+    
+    def halaman_riwayat(self, **kwargs):
+        """Satu halaman peminjaman untuk LazyTable (lihat DatabaseManager.get_peminjaman_page)"""
+        return self.db.get_peminjaman_page(**kwargs)
+    
+    def revisi(self):
+        """Revisi terakhir log perubahan alat/peminjaman"""
+        return self.db.get_revisi()
+    
+    def perubahan(self, sejak):
+        """
+        Baris alat dan peminjaman yang berubah setelah revisi sejak
+        
+        Returns:
+            seperti DatabaseManager.get_perubahan_rows
+        """
+        return self.db.get_perubahan_rows(sejak)
+    
+    def statistik(self):
+        """Ringkasan dan statistik per alat untuk dashboard: (ringkasan, rows)"""
+        return self.db.get_statistik_ringkasan(), self.db.get_statistik_alat()
+    
+    def export_csv(self, path, termasuk_arsip=False):
+        return self.db.export_peminjaman_csv(path, termasuk_arsip)
+    
+    def arsipkan(self, umur_hari=None):
+        """
+        Pindahkan peminjaman lama yang sudah dikembalikan ke arsip
+        
+        Returns:
+            (True, jumlah_dipindah) atau (False, pesan error)
+        """
+        if umur_hari is None:
+            return self.db.arsipkan_peminjaman()
+        if umur_hari < 0:
+            return False, "Umur arsip tidak boleh negatif"
+        return self.db.arsipkan_peminjaman(umur_hari)
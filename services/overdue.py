@@ -0,0 +1,99 @@
+"""
+Pemantau keterlambatan untuk SIJAtools
+Secara berkala mengambil peminjaman yang baru lewat jatuh tempo sejak
+cek terakhir (range pada index status + jatuh tempo, bukan scan seluruh
+peminjaman). Di GUI dijadwalkan dengan root.after dan query jalan di
+DbWorker; di mode headless (CLI) cukup loop biasa.
+"""
+
+import time
+from datetime import datetime, timezone
+
+from services.loan import LoanService
+
+# Jarak antar cek keterlambatan
+INTERVAL_CEK_DETIK = 60
+
+
+def waktu_sekarang():
+    """Waktu sekarang dalam format CURRENT_TIMESTAMP SQLite (UTC)"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class OverdueChecker:
+    """Cek peminjaman yang baru terlambat sejak cek sebelumnya"""
+    
+    def __init__(self, loans=None):
+        self.loans = loans or LoanService()
+        # Batas atas cek terakhir; None = belum pernah cek
+        self.sejak = None
+    
+    def cek(self, sekarang=None):
+        """
+        Peminjaman aktif yang jatuh tempo setelah cek terakhir sampai sekarang
+        
+        Cek pertama mengembalikan semua yang sudah terlambat.
+        
+        Returns:
+            list (id, nama_peminjam, nama_alat, jumlah, tanggal_peminjaman,
+            tanggal_jatuh_tempo, user_id)
+        """
+        sampai = sekarang or waktu_sekarang()
+        rows = self.loans.terlambat(self.sejak, sampai)
+        self.sejak = sampai
+        return rows
+
+
+class OverdueScheduler:
+    """
+    Jadwal cek keterlambatan di GUI: root.after + DbWorker
+    
+    Cek berikutnya baru dijadwalkan setelah hasil cek sebelumnya kembali,
+    jadi tidak pernah ada dua cek berjalan bersamaan.
+    """
+    
+    def __init__(self, root, worker, on_terlambat, checker=None, interval_detik=INTERVAL_CEK_DETIK):
+        self.root = root
+        self.worker = worker
+        self.on_terlambat = on_terlambat
+        self.checker = checker or OverdueChecker()
+        self.interval_ms = int(interval_detik * 1000)
+        self._after_id = None
+    
+    def start(self):
+        self._jadwalkan(0)
+    
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+    
+    def _jadwalkan(self, delay_ms):
+        self._after_id = self.root.after(delay_ms, self._tick)
+    
+    def _tick(self):
+        self._after_id = None
+        self.worker.submit(self.checker.cek, on_done=self._on_done, on_error=self._on_error)
+    
+    def _on_done(self, rows):
+        if rows:
+            self.on_terlambat(rows)
+        self._jadwalkan(self.interval_ms)
+    
+    def _on_error(self, exc):
+        # Gagal sekali (mis. database terkunci) tidak menghentikan jadwal;
+        # rentang waktu yang terlewat ikut dicek lagi di cek berikutnya
+        self._jadwalkan(self.interval_ms)
+
+
+def pantau(on_terlambat, checker=None, interval_detik=INTERVAL_CEK_DETIK, berhenti=None):
+    """
+    Loop cek keterlambatan untuk mode headless (berjalan sampai berhenti() True
+    atau KeyboardInterrupt)
+    """
+    checker = checker or OverdueChecker()
+    while berhenti is None or not berhenti():
+        rows = checker.cek()
+        if rows:
+            on_terlambat(rows)
+        time.sleep(interval_detik)
@@ -0,0 +1,108 @@
+"""
+Pemantau perubahan database untuk SIJAtools
+Beberapa PC lab bisa memakai sijatools.db yang sama; tanpa pemantau,
+tabel dan daftar alat sebuah client hanya diperbarui setelah aksinya
+sendiri. Setiap interval dibaca PRAGMA data_version (tanpa query ke
+tabel); baru jika nilainya berubah UI diminta refresh, yang mengambil
+delta dari log perubahan (tabel perubahan yang diisi trigger alat,
+peminjaman, dan reservasi), bukan reload penuh.
+"""
+
+import os
+import sqlite3
+
+from services import Service
+
+# Jarak antar cek perubahan dari koneksi/client lain
+INTERVAL_SINKRON_MS = int(os.environ.get('SIJATOOLS_INTERVAL_SINKRON_MS', 1000))
+
+
+class ChangeWatcher(Service):
+    """
+    Jadwal cek data_version di GUI dengan root.after
+    
+    Cek dijalankan langsung di thread Tk: data_version dihitung per
+    koneksi, jadi harus selalu dibaca dari koneksi yang sama, dan koneksi
+    thread Tk tidak pernah menulis sehingga setiap commit (dari worker
+    maupun client lain) terlihat. Biayanya hanya membaca header WAL.
+    DatabaseManager baru dibuat saat cek pertama.
+    
+    Refresh dari aksi UI sendiri juga lewat refresh() di sini: hanya satu
+    refresh berjalan sekaligus, dan data_version dicatat saat refresh
+    dikirim sehingga commit sendiri tidak memicu refresh kedua.
+    on_change harus mengirim query perubahan dan memanggil selesai()
+    setelah hasilnya diterapkan (atau gagal).
+    """
+    
+    def __init__(self, root, on_change, db=None, interval_ms=INTERVAL_SINKRON_MS):
+        super().__init__(db)
+        self.root = root
+        self.on_change = on_change
+        self.interval_ms = interval_ms
+        # None: cek pertama selalu memicu refresh, menutup celah antara
+        # data awal UI dimuat dan watcher mulai
+        self.versi = None
+        self._after_id = None
+        # Refresh sedang berjalan / diminta lagi selama berjalan
+        self._berjalan = False
+        self._lagi = False
+    
+    def start(self):
+        self._jadwalkan()
+    
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+    
+    def cek(self):
+        """True jika ada commit dari koneksi lain sejak cek sebelumnya"""
+        versi = self.db.get_data_version()
+        if versi == self.versi:
+            return False
+        self.versi = versi
+        return True
+    
+    def refresh(self):
+        """Minta refresh; digabung jika masih ada refresh yang berjalan"""
+        if self._berjalan:
+            self._lagi = True
+            return
+        self._berjalan = True
+        try:
+            # Commit sampai titik ini ikut terbaca oleh refresh yang dikirim
+            self.versi = self.db.get_data_version()
+        except sqlite3.Error:
+            pass
+        self.on_change()
+    
+    def selesai(self, gagal=False):
+        """Dipanggil UI setelah hasil refresh diterapkan (atau gagal)"""
+        self._berjalan = False
+        if gagal:
+            # Cek berikutnya pasti mengulang refresh
+            self.versi = None
+        if self._lagi:
+            self._lagi = False
+            # Permintaan yang commit-nya sudah tercakup refresh barusan cukup diabaikan
+            try:
+                perlu = self.cek()
+            except sqlite3.Error:
+                perlu = True
+            if perlu:
+                self.refresh()
+    
+    def _jadwalkan(self):
+        self._after_id = self.root.after(self.interval_ms, self._tick)
+    
+    def _tick(self):
+        self._after_id = None
+        try:
+            berubah = self.cek()
+        except sqlite3.Error:
+            # Gagal sekali tidak menghentikan jadwal; perubahan yang
+            # terlewat tetap terambil di refresh berikutnya lewat revisi
+            berubah = False
+        self._jadwalkan()
+        if berubah:
+            self.refresh()
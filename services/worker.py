@@ -0,0 +1,87 @@
+"""
+Background worker untuk SIJAtools
+Menjalankan pekerjaan database di thread pool supaya mainloop Tk tidak
+pernah blok. Hasil dikirim kembali ke thread Tk lewat queue yang di-poll
+dengan root.after (Tk tidak thread-safe, jadi callback tidak pernah
+dipanggil langsung dari thread worker).
+"""
+
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox
+
+
+class DbWorker:
+    """Eksekutor pekerjaan database dengan callback di thread Tk"""
+    
+    def __init__(self, root, max_workers=2, poll_ms=20):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sijatools-db')
+        self.results = queue.Queue()
+        self.pending = 0
+        self.busy_listeners = []
+        self._polling = False
+    
+    def submit(self, fn, *args, on_done=None, on_error=None, **kwargs):
+        """
+        Jalankan fn(*args, **kwargs) di thread worker
+        
+        Args:
+            fn: fungsi yang dijalankan (boleh memanggil DatabaseManager)
+            on_done: callback(hasil) di thread Tk
+            on_error: callback(exception) di thread Tk; default tampilkan error
+        """
+        self.pending += 1
+        if self.pending == 1:
+            self._notify_busy(True)
+        future = self.executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(lambda f: self.results.put((f, on_done, on_error)))
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return future
+    
+    def add_busy_listener(self, callback):
+        """Daftarkan callback(busy) untuk menampilkan status loading"""
+        self.busy_listeners.append(callback)
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    future, on_done, on_error = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                self.pending -= 1
+                try:
+                    exc = future.exception()
+                    if exc is not None:
+                        (on_error or self.show_error)(exc)
+                    elif on_done is not None:
+                        on_done(future.result())
+                except Exception as e:
+                    # Callback yang gagal tidak boleh menghentikan loop poll,
+                    # hasil pekerjaan lain tetap harus dikirim
+                    self.root.report_callback_exception(type(e), e, e.__traceback__)
+                finally:
+                    if self.pending == 0:
+                        self._notify_busy(False)
+        finally:
+            # Poll hanya selama masih ada pekerjaan berjalan
+            if self.pending > 0:
+                self.root.after(self.poll_ms, self._poll)
+            else:
+                self._polling = False
+    
+    def _notify_busy(self, busy):
+        for callback in self.busy_listeners:
+            callback(busy)
+    
+    @staticmethod
+    def show_error(exc):
+        """Tampilkan error dari pekerjaan background"""
+        messagebox.showerror("Error", f"Error: {exc}")
@@ -0,0 +1,3 @@
+"""
+SIJAtools - entry point CLI (python -m sijatools)
+"""
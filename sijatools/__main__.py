@@ -0,0 +1,14 @@
+"""
+Jalankan CLI SIJAtools: python -m sijatools <perintah>
+"""
+
+import os
+import sys
+
+# Paket aplikasi (database, services, ...) ada di root project, satu level
+# di atas paket ini; tidak bergantung pada direktori kerja saat dijalankan
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sijatools.cli import main
+
+sys.exit(main())
@@ -0,0 +1,279 @@
+"""
+SIJAtools - Command line interface
+Operasi peminjaman dan data massal tanpa Tkinter, lewat services/
+
+Contoh:
+    python -m sijatools pinjam user1 "Multimeter Digital" 2 --hari 3
+    python -m sijatools kembali 12 13 14
+    python -m sijatools reservasi user1 "Multimeter Digital" 3
+    python -m sijatools antrean "Multimeter Digital"
+    python -m sijatools stok
+    python -m sijatools laporan aktif
+    python -m sijatools laporan riwayat --user user1
+    python -m sijatools terlambat --pantau --interval 300
+    python -m sijatools import-alat inventaris.csv
+    python -m sijatools export-alat alat.csv
+    python -m sijatools export-peminjaman riwayat.csv --arsip
+    python -m sijatools arsip --hari 180
+    python -m sijatools rekonsiliasi --penuh
+    python -m sijatools mutasi "Multimeter Digital" --limit 20
+"""
+
+import argparse
+import sys
+
+from database.db import DatabaseManager
+from services.inventory import InventoryService
+from services.loan import LoanService
+from services.overdue import INTERVAL_CEK_DETIK, OverdueChecker, pantau
+
+
+def cari_user_id(db, username):
+    user_id = db.get_user_id(username)
+    if user_id is None:
+        print(f"User {username!r} tidak ditemukan", file=sys.stderr)
+    return user_id
+
+
+def cmd_pinjam(db, args):
+    user_id = cari_user_id(db, args.peminjam)
+    if user_id is None:
+        return 1
+    alat = InventoryService(db).cari_alat(args.alat)
+    if alat is None:
+        print(f"Alat {args.alat!r} tidak ditemukan", file=sys.stderr)
+        return 1
+    success, message = LoanService(db).pinjam(user_id, alat[0], args.jumlah, args.hari)
+    print(message, file=sys.stdout if success else sys.stderr)
+    return 0 if success else 1
+
+
+def cmd_kembali(db, args):
+    gagal = 0
+    for id_peminjaman, success, message in LoanService(db).kembalikan_banyak(args.id):
+        print(f"#{id_peminjaman}: {message}", file=sys.stdout if success else sys.stderr)
+        gagal += not success
+    return 1 if gagal else 0
+
+
+def cmd_reservasi(db, args):
+    user_id = cari_user_id(db, args.peminjam)
+    if user_id is None:
+        return 1
+    alat = InventoryService(db).cari_alat(args.alat)
+    if alat is None:
+        print(f"Alat {args.alat!r} tidak ditemukan", file=sys.stderr)
+        return 1
+    success, message = LoanService(db).reservasi(user_id, alat[0], args.jumlah)
+    print(message, file=sys.stdout if success else sys.stderr)
+    return 0 if success else 1
+
+
+def cmd_antrean(db, args):
+    alat = InventoryService(db).cari_alat(args.alat)
+    if alat is None:
+        print(f"Alat {args.alat!r} tidak ditemukan", file=sys.stderr)
+        return 1
+    rows = db.get_antrean_alat(alat[0])
+    for posisi, (id_reservasi, peminjam, jumlah, tanggal) in enumerate(rows, start=1):
+        print(f"{posisi:>3}. #{id_reservasi:<5} {peminjam:<12} {jumlah:>4}  {tanggal}")
+    print(f"Stok {alat[2]}, {len(rows)} reservasi menunggu")
+    return 0
+
+
+def cmd_stok(db, args):
+    inventory = InventoryService(db)
+    if args.alat:
+        alat = inventory.cari_alat(args.alat)
+        if alat is None:
+            print(f"Alat {args.alat!r} tidak ditemukan", file=sys.stderr)
+            return 1
+        daftar = [alat]
+    else:
+        daftar = inventory.daftar_alat()
+    for id_alat, nama, stok, _ in daftar:
+        print(f"{id_alat:>5}  {nama:<30} {stok:>5}")
+    return 0
+
+
+def cmd_laporan(db, args):
+    loans = LoanService(db)
+    user_id = None
+    if args.user:
+        user_id = cari_user_id(db, args.user)
+        if user_id is None:
+            return 1
+    if args.jenis == 'aktif':
+        rows = loans.peminjaman_aktif(user_id)
+    else:
+        rows = loans.riwayat(user_id, args.arsip)
+    for id_pinjam, peminjam, nama_alat, jumlah, status, tgl_pinjam, _ in rows:
+        print(f"{id_pinjam:>5}  {peminjam:<12} {nama_alat:<30} {jumlah:>4}  {status:<12} {tgl_pinjam}")
+    print(f"Total: {len(rows)} peminjaman")
+    return 0
+
+
+def cetak_terlambat(rows):
+    for id_pinjam, peminjam, nama_alat, jumlah, _, jatuh_tempo, _ in rows:
+        print(f"{id_pinjam:>5}  {peminjam:<12} {nama_alat:<30} {jumlah:>4}  jatuh tempo {jatuh_tempo}", flush=True)
+
+
+def cmd_terlambat(db, args):
+    checker = OverdueChecker(LoanService(db))
+    if not args.pantau:
+        rows = checker.cek()
+        cetak_terlambat(rows)
+        print(f"Total: {len(rows)} peminjaman terlambat")
+        return 0
+    # Cetak yang sudah terlambat, lalu hanya yang baru terlambat tiap interval
+    try:
+        pantau(cetak_terlambat, checker, args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_import_alat(db, args):
+    success, result = InventoryService(db).import_csv(args.file)
+    if not success:
+        print(result, file=sys.stderr)
+        return 1
+    print(f"Berhasil diimport: {result['berhasil']} alat")
+    if result['konflik']:
+        print(f"Dilewati: {len(result['konflik'])} baris")
+        for nomor, nama, alasan in result['konflik']:
+            print(f"  baris {nomor}: {nama!r} - {alasan}")
+    return 0
+
+
+def cmd_export_alat(db, args):
+    jumlah = InventoryService(db).export_csv(args.file)
+    print(f"{jumlah} alat diexport ke {args.file}")
+    return 0
+
+
+def cmd_export_peminjaman(db, args):
+    jumlah = LoanService(db).export_csv(args.file, args.arsip)
+    print(f"{jumlah} peminjaman diexport ke {args.file}")
+    return 0
+
+
+def cmd_arsip(db, args):
+    success, result = LoanService(db).arsipkan(args.hari)
+    if not success:
+        print(result, file=sys.stderr)
+        return 1
+    utama, arsip = db.get_jumlah_arsip()
+    print(f"{result} peminjaman dipindah ke arsip (tabel peminjaman: {utama}, arsip: {arsip})")
+    return 0
+
+
+def cmd_rekonsiliasi(db, args):
+    hasil = InventoryService(db).rekonsiliasi(args.penuh)
+    for id_alat, nama, stok, saldo, dipinjam, total in hasil['selisih']:
+        if saldo is None:
+            print(f"{id_alat:>5}  {nama:<30} belum punya mutasi stok", file=sys.stderr)
+        else:
+            print(f"{id_alat:>5}  {nama:<30} stok {stok} (buku {saldo}), "
+                  f"stok + dipinjam {stok + dipinjam} (baseline {total})", file=sys.stderr)
+    for id_alat, id_mutasi, saldo_hitung, saldo, total_hitung, total in hasil['tidak_seimbang']:
+        print(f"{id_alat:>5}  buku tidak seimbang di mutasi #{id_mutasi}: saldo {saldo} (jumlah mutasi "
+              f"{saldo_hitung}), baseline {total} (jumlah mutasi {total_hitung})", file=sys.stderr)
+    
+    rusak = len(hasil['selisih']) + len(hasil['tidak_seimbang'])
+    print(f"{hasil['jumlah_alat']} alat dicek, {len(hasil['selisih'])} selisih"
+          + (f", {len(hasil['tidak_seimbang'])} buku tidak seimbang" if args.penuh else ""))
+    return 1 if rusak else 0
+
+
+def cmd_mutasi(db, args):
+    inventory = InventoryService(db)
+    alat = inventory.cari_alat(args.alat)
+    if alat is None:
+        print(f"Alat {args.alat!r} tidak ditemukan", file=sys.stderr)
+        return 1
+    for id_mutasi, jenis, perubahan, saldo, total, ref_id, waktu in inventory.riwayat_stok(alat[0], args.limit):
+        ref = f"#{ref_id}" if ref_id is not None else ""
+        print(f"{id_mutasi:>7}  {waktu}  {jenis:<10} {perubahan:>+6} {saldo:>6} {total:>6}  {ref}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='sijatools', description="SIJAtools – Sistem Peminjaman Alat (CLI)")
+    parser.add_argument('--db', help="Path file database (default: database/sijatools.db)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    
+    p = sub.add_parser('pinjam', help="Pinjam alat atas nama peminjam")
+    p.add_argument('peminjam', help="Username peminjam")
+    p.add_argument('alat', help="ID atau nama alat")
+    p.add_argument('jumlah')
+    p.add_argument('--hari', type=int, help="Lama pinjam sampai jatuh tempo (default: SIJATOOLS_LAMA_PINJAM_HARI atau 7)")
+    p.set_defaults(func=cmd_pinjam)
+    
+    p = sub.add_parser('kembali', help="Kembalikan satu atau beberapa peminjaman")
+    p.add_argument('id', type=int, nargs='+', help="ID peminjaman")
+    p.set_defaults(func=cmd_kembali)
+    
+    p = sub.add_parser('reservasi', help="Antre alat yang stoknya kurang (FIFO)")
+    p.add_argument('peminjam', help="Username peminjam")
+    p.add_argument('alat', help="ID atau nama alat")
+    p.add_argument('jumlah')
+    p.set_defaults(func=cmd_reservasi)
+    
+    p = sub.add_parser('antrean', help="Tampilkan antrean reservasi satu alat")
+    p.add_argument('alat', help="ID atau nama alat")
+    p.set_defaults(func=cmd_antrean)
+    
+    p = sub.add_parser('stok', help="Tampilkan stok alat")
+    p.add_argument('alat', nargs='?', help="ID atau nama alat (default: semua)")
+    p.set_defaults(func=cmd_stok)
+    
+    p = sub.add_parser('laporan', help="Laporan peminjaman aktif atau riwayat")
+    p.add_argument('jenis', choices=('aktif', 'riwayat'))
+    p.add_argument('--user', help="Batasi ke satu peminjam")
+    p.add_argument('--arsip', action='store_true', help="Riwayat ikut membaca arsip")
+    p.set_defaults(func=cmd_laporan)
+    
+    p = sub.add_parser('terlambat', help="Peminjaman aktif yang lewat jatuh tempo")
+    p.add_argument('--pantau', action='store_true', help="Terus berjalan dan cetak yang baru terlambat")
+    p.add_argument('--interval', type=float, default=INTERVAL_CEK_DETIK, help="Detik antar cek saat --pantau")
+    p.set_defaults(func=cmd_terlambat)
+    
+    p = sub.add_parser('import-alat', help="Import alat dari CSV (nama_alat, stok, deskripsi)")
+    p.add_argument('file')
+    p.set_defaults(func=cmd_import_alat)
+    
+    p = sub.add_parser('export-alat', help="Export semua alat ke CSV")
+    p.add_argument('file')
+    p.set_defaults(func=cmd_export_alat)
+    
+    p = sub.add_parser('export-peminjaman', help="Export semua peminjaman ke CSV")
+    p.add_argument('file')
+    p.add_argument('--arsip', action='store_true', help="Ikut export peminjaman yang sudah diarsipkan")
+    p.set_defaults(func=cmd_export_peminjaman)
+    
+    p = sub.add_parser('arsip', help="Pindahkan peminjaman lama yang sudah dikembalikan ke arsip")
+    p.add_argument('--hari', type=int, help="Umur minimal sejak dikembalikan (default: SIJATOOLS_ARSIP_HARI atau 365)")
+    p.set_defaults(func=cmd_arsip)
+    
+    p = sub.add_parser('rekonsiliasi', help="Cek stok alat terhadap buku mutasi stok")
+    p.add_argument('--penuh', action='store_true', help="Ikut periksa keseimbangan seluruh mutasi per alat")
+    p.set_defaults(func=cmd_rekonsiliasi)
+    
+    p = sub.add_parser('mutasi', help="Tampilkan mutasi stok satu alat (terbaru dulu)")
+    p.add_argument('alat', help="ID atau nama alat")
+    p.add_argument('--limit', type=int, default=50)
+    p.set_defaults(func=cmd_mutasi)
+    
+    return parser
+
+
+def main(argv=None):
+    """Entry point CLI"""
+    args = build_parser().parse_args(argv)
+    db = DatabaseManager(args.db)
+    return args.func(db, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,31 +3,79 @@ Admin UI - Tab untuk admin user
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
-from ui.components import create_table
-from database.db import DatabaseManager
+from datetime import datetime
+from tkinter import ttk, messagebox, filedialog
+from ui.components import (
+    create_table, sync_table, apply_changes, LazyTable, TabManager, ChangeBuffer, SearchBox
+)
+from services.inventory import InventoryService, validasi_alat
+from services.loan import LoanService
+from services.overdue import OverdueChecker, OverdueScheduler, waktu_sekarang
+from services.watcher import ChangeWatcher
+from services.worker import DbWorker
+
+# Jumlah hasil pencarian alat per halaman (halaman berikutnya lewat tombol)
+HASIL_CARI_MAKS = 500
 
 
 class AdminUI:
     """Handler untuk admin tabs"""
     
-    def __init__(self, notebook, current_user):
+    def __init__(self, notebook, current_user, worker=None, tabs=None):
         self.notebook = notebook
         self.current_user = current_user
         self.username = current_user['username']
-        self.db = DatabaseManager()
+        # DatabaseManager baru dibuat di thread worker saat query pertama
+        self.inventory = InventoryService()
+        self.loans = LoanService()
+        # Semua query jalan di background, hasil kembali lewat callback
+        self.worker = worker or DbWorker(notebook.winfo_toplevel())
         
         self.current_alat_id = None
+        # Teks pencarian aktif di tabel alat dan riwayat
+        self.cari_alat = ''
+        self.cari_riwayat = ''
+        # Baris hasil pencarian alat yang sudah dimuat, dan ada tidaknya halaman berikutnya
+        self.hasil_alat = []
+        self.alat_lebih = False
+        # Riwayat ikut membaca peminjaman_arsip
+        self.riwayat_arsip = False
+        # Revisi log perubahan yang sudah tampil di tabel (None = belum dimuat)
+        self.revisi = None
+        
+        # Perubahan yang belum diterapkan ke tab yang sedang tidak terlihat
+        self.pending = {'alat': ChangeBuffer(), 'riwayat': ChangeBuffer()}
+        # Peminjaman terlambat yang masih aktif: id -> row get_peminjaman_terlambat
+        self.terlambat = {}
         
-        # Buat tabs
-        self.create_tab_alat()
-        self.create_tab_riwayat()
+        self.tabs = tabs or TabManager(self.notebook)
+        root = notebook.winfo_toplevel()
+        # Cek berkala hanya mengambil peminjaman yang baru lewat jatuh tempo
+        self.overdue = OverdueScheduler(root, self.worker, self.on_terlambat, OverdueChecker(self.loans))
+        # Perubahan dari client lain diterapkan sebagai delta tanpa menunggu aksi sendiri
+        self.watcher = ChangeWatcher(root, self.kirim_refresh)
+        
+        # Revisi dibaca dulu (di worker) sebelum tab memuat data, supaya
+        # tidak ada perubahan yang terlewat di antara keduanya
+        self.worker.submit(self.loans.revisi, on_done=self.on_revisi_awal)
     
-    def create_tab_alat(self):
-        """Tab: Manajemen Alat"""
-        tab_alat = ttk.Frame(self.notebook)
-        self.notebook.add(tab_alat, text="Manajemen Alat")
+    def on_revisi_awal(self, revisi):
+        self.revisi = revisi
         
+        # Buat tabs; isi tiap tab dibangun saat pertama kali dibuka
+        self.tabs.add('alat', "Manajemen Alat", self.create_tab_alat, self.refresh_tab_alat)
+        self.tabs.add('riwayat', "Riwayat Peminjaman", self.create_tab_riwayat, self.refresh_tab_riwayat)
+        self.tabs.add('dashboard', "Dashboard", self.create_tab_dashboard, self.load_dashboard)
+        self.frame_terlambat = self.tabs.add(
+            'terlambat', "Terlambat", self.create_tab_terlambat, self.refresh_tab_terlambat
+        )
+        self.tabs.on_tab_changed()
+        
+        self.overdue.start()
+        self.watcher.start()
+    
+    def create_tab_alat(self, tab_alat):
+        """Tab: Manajemen Alat"""
         # Frame input
         input_frame = ttk.LabelFrame(tab_alat, text="Input Data Alat", padding=10)
         input_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -50,33 +98,97 @@ class AdminUI:
         ttk.Button(button_frame, text="Tambah", command=self.tambah_alat).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Perbarui", command=self.update_alat).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Batal", command=self.batal_edit_alat).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Import CSV", command=self.import_alat_csv).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Export CSV", command=self.export_alat_csv).pack(side=tk.LEFT, padx=5)
         
         # Frame tabel
         table_frame = ttk.LabelFrame(tab_alat, text="Daftar Alat", padding=10)
         table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
+        self.search_alat = SearchBox(table_frame, self.on_cari_alat)
+        self.search_alat.frame.pack(fill=tk.X, pady=(0, 5))
+        
         columns = ('ID', 'Nama Alat', 'Stok', 'Deskripsi')
         scrollbar, self.tree_alat = create_table(table_frame, columns, height=12)
         
         self.tree_alat.bind('<Double-1>', self.on_alat_double_click)
         
+        hasil_frame = ttk.Frame(table_frame)
+        hasil_frame.pack(fill=tk.X)
+        self.label_hasil_alat = ttk.Label(hasil_frame, text="", font=('Arial', 9), foreground='gray')
+        self.label_hasil_alat.pack(side=tk.LEFT)
+        self.btn_lagi_alat = ttk.Button(hasil_frame, text="Muat Lebih Banyak", command=self.muat_lagi_alat,
+                                        state=tk.DISABLED)
+        self.btn_lagi_alat.pack(side=tk.RIGHT)
+        
         ttk.Button(table_frame, text="Hapus Alat", command=self.hapus_alat).pack(pady=5)
         
         self.load_data_alat()
     
-    def create_tab_riwayat(self):
+    def create_tab_riwayat(self, tab_riwayat):
         """Tab: Riwayat Semua Peminjaman"""
-        tab_riwayat = ttk.Frame(self.notebook)
-        self.notebook.add(tab_riwayat, text="Riwayat Peminjaman")
-        
         table_frame = ttk.LabelFrame(tab_riwayat, text="Riwayat Semua Peminjaman", padding=10)
         table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
+        self.search_riwayat = SearchBox(table_frame, self.on_cari_riwayat, label="Cari peminjam:")
+        self.search_riwayat.frame.pack(fill=tk.X, pady=(0, 5))
+        self.var_arsip = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.search_riwayat.frame, text="Termasuk arsip", variable=self.var_arsip,
+                        command=self.on_toggle_arsip).pack(side=tk.LEFT, padx=10)
+        
         columns = ('ID', 'Nama Peminjam', 'Alat', 'Jumlah', 'Status', 'Tanggal Pinjam')
-        scrollbar, self.tree_riwayat = create_table(table_frame, columns, height=20)
+        self.table_riwayat = LazyTable(
+            table_frame, columns,
+            fetch_page=lambda **kwargs: self.loans.halaman_riwayat(
+                cari=self.cari_riwayat, termasuk_arsip=self.riwayat_arsip, **kwargs
+            ),
+            format_row=lambda row: (row[0], row[1], row[2], row[3], row[4], row[5][:10]),
+            height=20,
+            worker=self.worker
+        )
+        self.tree_riwayat = self.table_riwayat.tree
+        
+        ttk.Button(table_frame, text="Export CSV", command=self.export_riwayat_csv).pack(pady=5)
         
         self.load_riwayat()
     
+    def create_tab_dashboard(self, tab_dashboard):
+        """Tab: Dashboard statistik peminjaman"""
+        ringkasan_frame = ttk.LabelFrame(tab_dashboard, text="Ringkasan", padding=10)
+        ringkasan_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        self.label_ringkasan = {}
+        judul = (
+            ('total_pinjam', "Total Peminjaman"),
+            ('peminjaman_aktif', "Sedang Dipinjam"),
+            ('unit_keluar', "Unit Keluar"),
+            ('rata_durasi', "Rata-rata Durasi"),
+        )
+        for kolom, (key, text) in enumerate(judul):
+            ttk.Label(ringkasan_frame, text=f"{text}:", font=('Arial', 10)).grid(
+                row=0, column=kolom * 2, sticky=tk.W, padx=(0, 5))
+            label = ttk.Label(ringkasan_frame, text="-", font=('Arial', 10, 'bold'))
+            label.grid(row=0, column=kolom * 2 + 1, sticky=tk.W, padx=(0, 20))
+            self.label_ringkasan[key] = label
+        
+        table_frame = ttk.LabelFrame(tab_dashboard, text="Statistik per Alat (paling sering dipinjam)", padding=10)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        columns = ('ID', 'Nama Alat', 'Stok', 'Dipinjam (kali)', 'Unit Dipinjam', 'Unit Keluar', 'Rata-rata Durasi')
+        scrollbar, self.tree_statistik = create_table(table_frame, columns, height=15)
+        
+        self.load_dashboard()
+    
+    def create_tab_terlambat(self, tab_terlambat):
+        """Tab: Peminjaman yang lewat jatuh tempo"""
+        table_frame = ttk.LabelFrame(tab_terlambat, text="Peminjaman Lewat Jatuh Tempo", padding=10)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        columns = ('ID', 'Nama Peminjam', 'Alat', 'Jumlah', 'Tanggal Pinjam', 'Jatuh Tempo', 'Terlambat')
+        scrollbar, self.tree_terlambat = create_table(table_frame, columns, height=20)
+        
+        self.refresh_tab_terlambat()
+    
     # ---- ALAT OPERATIONS ----
     
     def tambah_alat(self):
@@ -84,26 +196,12 @@ class AdminUI:
         stok = self.entry_stok.get().strip()
         deskripsi = self.entry_deskripsi.get().strip()
         
-        if not nama or not stok:
-            messagebox.showerror("Error", "Nama alat dan stok harus diisi")
-            return
-        
-        try:
-            stok = int(stok)
-            if stok < 0:
-                raise ValueError()
-        except ValueError:
-            messagebox.showerror("Error", "Stok harus berupa angka positif")
+        valid, result = validasi_alat(nama, stok)
+        if not valid:
+            messagebox.showerror("Error", result)
             return
         
-        success, msg = self.db.tambah_alat(nama, stok, deskripsi)
-        
-        if success:
-            messagebox.showinfo("Sukses", msg)
-            self.clear_alat_input()
-            self.load_data_alat()
-        else:
-            messagebox.showerror("Error", msg)
+        self.worker.submit(self.inventory.tambah_alat, nama, stok, deskripsi, on_done=self.on_alat_saved)
     
     def update_alat(self):
         if self.current_alat_id is None:
@@ -114,24 +212,23 @@ class AdminUI:
         stok = self.entry_stok.get().strip()
         deskripsi = self.entry_deskripsi.get().strip()
         
-        if not nama or not stok:
-            messagebox.showerror("Error", "Nama alat dan stok harus diisi")
-            return
-        
-        try:
-            stok = int(stok)
-            if stok < 0:
-                raise ValueError()
-        except ValueError:
-            messagebox.showerror("Error", "Stok harus berupa angka positif")
+        valid, result = validasi_alat(nama, stok)
+        if not valid:
+            messagebox.showerror("Error", result)
             return
         
-        success, msg = self.db.edit_alat(self.current_alat_id, nama, stok, deskripsi)
+        self.worker.submit(
+            self.inventory.edit_alat, self.current_alat_id, nama, stok, deskripsi,
+            on_done=self.on_alat_saved
+        )
+    
+    def on_alat_saved(self, result):
+        success, msg = result
         
         if success:
             messagebox.showinfo("Sukses", msg)
             self.clear_alat_input()
-            self.load_data_alat()
+            self.refresh()
         else:
             messagebox.showerror("Error", msg)
     
@@ -146,13 +243,61 @@ class AdminUI:
         id_alat = item['values'][0]
         
         if messagebox.askyesno("Konfirmasi", "Yakin ingin menghapus alat ini?"):
-            success, msg = self.db.hapus_alat(id_alat)
-            
-            if success:
-                messagebox.showinfo("Sukses", msg)
-                self.load_data_alat()
-            else:
-                messagebox.showerror("Error", msg)
+            self.worker.submit(self.inventory.hapus_alat, id_alat, on_done=self.on_alat_deleted)
+    
+    def on_alat_deleted(self, result):
+        success, msg = result
+        
+        if success:
+            messagebox.showinfo("Sukses", msg)
+            self.refresh()
+        else:
+            messagebox.showerror("Error", msg)
+    
+    def import_alat_csv(self):
+        path = filedialog.askopenfilename(
+            title="Import Alat dari CSV",
+            filetypes=[("CSV", "*.csv"), ("Semua file", "*.*")]
+        )
+        if path:
+            self.worker.submit(self.inventory.import_csv, path, on_done=self.on_import_done)
+    
+    def on_import_done(self, result):
+        success, hasil = result
+        
+        if not success:
+            messagebox.showerror("Error", hasil)
+            return
+        
+        msg = f"{hasil['berhasil']} alat berhasil diimport"
+        konflik = hasil['konflik']
+        if konflik:
+            detail = "\n".join(f"Baris {nomor}: {nama} - {alasan}" for nomor, nama, alasan in konflik[:10])
+            lainnya = f"\n... dan {len(konflik) - 10} baris lain" if len(konflik) > 10 else ""
+            msg += f"\n\n{len(konflik)} baris dilewati:\n{detail}{lainnya}"
+            messagebox.showwarning("Import Selesai", msg)
+        else:
+            messagebox.showinfo("Sukses", msg)
+        self.refresh()
+    
+    def export_alat_csv(self):
+        self.export_csv(self.inventory.export_csv, "alat.csv")
+    
+    def export_riwayat_csv(self):
+        self.export_csv(self.loans.export_csv, "riwayat_peminjaman.csv")
+    
+    def export_csv(self, export, default_name):
+        path = filedialog.asksaveasfilename(
+            title="Export ke CSV",
+            defaultextension=".csv",
+            initialfile=default_name,
+            filetypes=[("CSV", "*.csv")]
+        )
+        if path:
+            self.worker.submit(
+                export, path,
+                on_done=lambda jumlah: messagebox.showinfo("Sukses", f"{jumlah} baris diexport ke {path}")
+            )
     
     def on_alat_double_click(self, event):
         selection = self.tree_alat.selection()
@@ -180,19 +325,202 @@ class AdminUI:
         self.tree_alat.selection_remove(self.tree_alat.selection())
     
     def load_data_alat(self):
-        for item in self.tree_alat.get_children():
-            self.tree_alat.delete(item)
-        
-        data = self.db.get_all_alat()
-        for row in data:
-            self.tree_alat.insert('', tk.END, values=row)
+        cari = self.cari_alat
+        if cari:
+            # Halaman yang sudah dimuat ikut dimuat ulang (mis. setelah perubahan);
+            # satu baris ekstra menandakan masih ada hasil lain
+            maks = max(len(self.hasil_alat), HASIL_CARI_MAKS)
+            self.worker.submit(
+                self.inventory.pencarian_alat, cari, limit=maks + 1,
+                on_done=lambda data: self.on_alat_loaded(cari, data, maks)
+            )
+        else:
+            self.worker.submit(self.inventory.daftar_alat, on_done=lambda data: self.on_alat_loaded(cari, data))
+    
+    def on_alat_loaded(self, cari, data, maks=None):
+        # Abaikan hasil pencarian lama yang selesai belakangan
+        if cari != self.cari_alat:
+            return
+        self.alat_lebih = maks is not None and len(data) > maks
+        if self.alat_lebih:
+            data = data[:maks]
+        self.hasil_alat = data if cari else []
+        sync_table(self.tree_alat, data)
+        self.update_hasil_alat()
+    
+    def muat_lagi_alat(self):
+        cari = self.cari_alat
+        if not cari or not self.alat_lebih:
+            return
+        after = self.hasil_alat[-1][1]
+        self.worker.submit(
+            self.inventory.pencarian_alat, cari, after=after, limit=HASIL_CARI_MAKS + 1,
+            on_done=lambda data: self.on_alat_lagi(cari, after, data)
+        )
+    
+    def on_alat_lagi(self, cari, after, data):
+        # Abaikan jika pencarian sudah berganti atau hasilnya sudah dimuat ulang
+        if cari != self.cari_alat or not self.hasil_alat or self.hasil_alat[-1][1] != after:
+            return
+        self.alat_lebih = len(data) > HASIL_CARI_MAKS
+        self.hasil_alat = self.hasil_alat + data[:HASIL_CARI_MAKS]
+        sync_table(self.tree_alat, self.hasil_alat)
+        self.update_hasil_alat()
+    
+    def update_hasil_alat(self):
+        jumlah = len(self.hasil_alat)
+        if self.alat_lebih:
+            text = f"Menampilkan {jumlah} hasil pertama, masih ada hasil lain"
+        elif self.cari_alat:
+            text = f"{jumlah} hasil"
+        else:
+            text = ""
+        self.label_hasil_alat.config(text=text)
+        self.btn_lagi_alat.config(state=tk.NORMAL if self.alat_lebih else tk.DISABLED)
+    
+    def on_cari_alat(self, teks):
+        self.cari_alat = teks
+        self.hasil_alat = []
+        self.load_data_alat()
     
     def load_riwayat(self):
-        for item in self.tree_riwayat.get_children():
-            self.tree_riwayat.delete(item)
-        
-        data = self.db.get_all_peminjaman()
-        for row in data:
-            self.tree_riwayat.insert('', tk.END, values=(
-                row[0], row[1], row[2], row[3], row[4], row[5][:10]
-            ))
+        self.table_riwayat.reload()
+    
+    def on_cari_riwayat(self, teks):
+        self.cari_riwayat = teks
+        self.load_riwayat()
+    
+    def on_toggle_arsip(self):
+        # Disalin ke atribut biasa: fetch_page dibaca dari thread worker
+        self.riwayat_arsip = self.var_arsip.get()
+        self.load_riwayat()
+    
+    def load_dashboard(self):
+        # Dibaca dari tabel ringkasan: biaya sebanding jumlah alat, bukan riwayat
+        self.worker.submit(self.loans.statistik, on_done=self.on_dashboard_loaded)
+    
+    def on_dashboard_loaded(self, result):
+        ringkasan, rows = result
+        for key, label in self.label_ringkasan.items():
+            value = ringkasan[key]
+            label.config(text=format_durasi(value) if key == 'rata_durasi' else str(value))
+        sync_table(self.tree_statistik, rows, format_statistik)
+    
+    def on_terlambat(self, rows):
+        """Peminjaman baru terlambat dari OverdueScheduler"""
+        for row in rows:
+            self.terlambat[row[0]] = row
+        self.update_terlambat()
+    
+    def on_terlambat_reload(self, rows):
+        self.terlambat = {row[0]: row for row in rows}
+        self.update_terlambat()
+    
+    def update_terlambat(self):
+        jumlah = len(self.terlambat)
+        self.notebook.tab(self.frame_terlambat, text=f"Terlambat ({jumlah})" if jumlah else "Terlambat")
+        self.tabs.mark_dirty('terlambat')
+    
+    def refresh_tab_terlambat(self):
+        sekarang = waktu_sekarang()
+        rows = sorted(self.terlambat.values(), key=lambda row: (row[5], row[0]))
+        sync_table(self.tree_terlambat, rows, lambda row: format_terlambat(row, sekarang))
+    
+    def refresh(self):
+        """Terapkan hanya baris yang berubah sejak refresh terakhir"""
+        # Lewat watcher supaya digabung dengan refresh karena client lain
+        self.watcher.refresh()
+    
+    def kirim_refresh(self):
+        self.worker.submit(
+            self.loans.perubahan, self.revisi,
+            on_done=self.on_perubahan, on_error=self.on_refresh_gagal
+        )
+    
+    def on_refresh_gagal(self, exc):
+        self.watcher.selesai(gagal=True)
+        self.worker.show_error(exc)
+    
+    def on_perubahan(self, result):
+        try:
+            self.terapkan_perubahan(result)
+        finally:
+            self.watcher.selesai()
+    
+    def terapkan_perubahan(self, result):
+        revisi, changes = result
+        if revisi < self.revisi:
+            # Hasil refresh lama yang selesai belakangan
+            return
+        for name, tabel in (('alat', 'alat'), ('riwayat', 'peminjaman')):
+            # Tab yang belum dibuka akan memuat data lengkap saat dibangun
+            if not self.tabs.is_built(name):
+                continue
+            if changes is None:
+                # Log sudah dipangkas, reload penuh
+                self.pending[name].reload()
+            else:
+                self.pending[name].add(*changes[tabel])
+        self.revisi = revisi
+        self.buang_terlambat(changes)
+        # Hanya tab yang terlihat yang langsung diperbarui
+        dirty = [name for name, buffer in self.pending.items() if buffer]
+        if changes is None or any(changes['alat']) or any(changes['peminjaman']):
+            dirty.append('dashboard')
+        self.tabs.mark_dirty(*dirty)
+    
+    def buang_terlambat(self, changes):
+        """Peminjaman terlambat yang sudah dikembalikan/dihapus keluar dari daftar"""
+        if changes is None:
+            # Log dipangkas: ambil ulang yang terlambat sampai cek terakhir
+            sejak = self.overdue.checker.sejak
+            if sejak is not None:
+                self.worker.submit(self.loans.terlambat, None, sejak, on_done=self.on_terlambat_reload)
+            return
+        rows, removed = changes['peminjaman']
+        selesai = set(removed) | {row[0] for row in rows if row[4] != 'Dipinjam'}
+        selesai &= self.terlambat.keys()
+        if selesai:
+            for id_peminjaman in selesai:
+                del self.terlambat[id_peminjaman]
+            self.update_terlambat()
+    
+    def refresh_tab_alat(self):
+        full, rows, removed = self.pending['alat'].take()
+        if full or self.cari_alat:
+            # Saat mencari, baris berubah belum tentu cocok: jalankan ulang pencarian
+            self.load_data_alat()
+        else:
+            apply_changes(self.tree_alat, rows, removed, sort_column='Nama Alat')
+    
+    def refresh_tab_riwayat(self):
+        full, rows, removed = self.pending['riwayat'].take()
+        # Baris yang baru diarsipkan terhapus dari peminjaman tapi tetap ada di arsip
+        if full or self.cari_riwayat or (self.riwayat_arsip and removed):
+            self.load_riwayat()
+        else:
+            self.table_riwayat.apply_changes(rows, removed)
+
+
+def format_durasi(detik):
+    """Durasi dalam detik -> teks singkat (mis. '2 hari 3 jam')"""
+    if detik is None:
+        return "-"
+    menit = int(detik) // 60
+    hari, menit = divmod(menit, 24 * 60)
+    jam, menit = divmod(menit, 60)
+    if hari:
+        return f"{hari} hari {jam} jam"
+    if jam:
+        return f"{jam} jam {menit} menit"
+    return f"{menit} menit"
+
+
+def format_terlambat(row, sekarang):
+    """Baris get_peminjaman_terlambat -> values tabel, dengan lama terlambat"""
+    terlambat = datetime.fromisoformat(sekarang) - datetime.fromisoformat(row[5])
+    return (row[0], row[1], row[2], row[3], row[4], row[5], format_durasi(terlambat.total_seconds()))
+
+
+def format_statistik(row):
+    return (*row[:6], format_durasi(row[6]))
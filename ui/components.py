@@ -3,6 +3,7 @@ Reusable UI components untuk SIJAtools
 """
 
 import tkinter as tk
+from bisect import bisect_left, insort
 from tkinter import ttk
 
 
@@ -50,6 +51,100 @@ def create_table(parent, columns, height=10):
     return scrollbar, tree
 
 
+def _values_changed(tree, iid, values):
+    current = tree.item(iid, 'values')
+    return [str(v) for v in current] != ['' if v is None else str(v) for v in values]
+
+
+def _sorted_index(tree, value, column, descending=False):
+    """Posisi insert untuk value agar urutan kolom tetap (binary search)"""
+    children = tree.get_children()
+    low, high = 0, len(children)
+    while low < high:
+        mid = (low + high) // 2
+        current = tree.set(children[mid], column)
+        before = current < value if descending else current > value
+        if before:
+            high = mid
+        else:
+            low = mid + 1
+    return low
+
+
+def sync_table(tree, rows, format_row=None):
+    """
+    Samakan isi table dengan rows tanpa hapus-semua/insert-semua
+    
+    Baris dikenali dari ID (row[0]) yang dipakai sebagai iid: hanya baris
+    yang berubah di-update, baris baru di-insert, baris hilang dihapus.
+    Seleksi dan posisi scroll dipertahankan.
+    
+    Args:
+        tree: treeview
+        rows: seluruh baris yang harus tampil, sudah terurut
+        format_row: fungsi baris DB -> values yang ditampilkan
+    """
+    format_row = format_row or tuple
+    top = tree.yview()[0]
+    
+    wanted = [str(row[0]) for row in rows]
+    wanted_set = set(wanted)
+    stale = [iid for iid in tree.get_children() if iid not in wanted_set]
+    if stale:
+        tree.delete(*stale)
+    
+    for iid, row in zip(wanted, rows):
+        values = format_row(row)
+        if not tree.exists(iid):
+            tree.insert('', tk.END, iid=iid, values=values)
+        elif _values_changed(tree, iid, values):
+            tree.item(iid, values=values)
+    
+    if list(tree.get_children()) != wanted:
+        for index, iid in enumerate(wanted):
+            tree.move(iid, '', index)
+    
+    tree.yview_moveto(top)
+
+
+def apply_changes(tree, rows, removed_ids=(), format_row=None, sort_column=None, descending=False):
+    """
+    Terapkan perubahan parsial ke table (biaya sebanding jumlah perubahan)
+    
+    Args:
+        tree: treeview
+        rows: baris yang berubah/baru (key = row[0])
+        removed_ids: ID baris yang harus hilang dari table
+        format_row: fungsi baris DB -> values yang ditampilkan
+        sort_column: kolom urutan table, untuk posisi baris baru
+        descending: True jika table urut menurun
+    """
+    format_row = format_row or tuple
+    for row_id in removed_ids:
+        if tree.exists(str(row_id)):
+            tree.delete(str(row_id))
+    
+    column_index = tree['columns'].index(sort_column) if sort_column else None
+    for row in rows:
+        iid = str(row[0])
+        values = format_row(row)
+        if tree.exists(iid):
+            if not _values_changed(tree, iid, values):
+                continue
+            moved = column_index is not None and tree.set(iid, sort_column) != str(values[column_index])
+            tree.item(iid, values=values)
+            if moved:
+                tree.detach(iid)
+                index = _sorted_index(tree, str(values[column_index]), sort_column, descending)
+                tree.move(iid, '', index)
+        else:
+            if column_index is None:
+                index = tk.END
+            else:
+                index = _sorted_index(tree, str(values[column_index]), sort_column, descending)
+            tree.insert('', index, iid=iid, values=values)
+
+
 def setup_styles():
     """Konfigurasi style untuk Tkinter"""
     style = ttk.Style()
@@ -60,3 +155,449 @@ def setup_styles():
     style.configure('Normal.TLabel', font=('Arial', 10))
     
     return style
+
+
+class LazyTable:
+    """
+    Treeview yang memuat data per halaman saat di-scroll (keyset pagination)
+    
+    Hanya sejumlah baris terbatas (max_rows) yang disimpan di widget;
+    baris di ujung yang jauh dibuang dan dimuat ulang saat di-scroll kembali.
+    
+    Args:
+        parent: parent widget
+        columns: list of column names
+        fetch_page: fungsi(after=None, before=None, limit=...) -> list baris
+            urut terbaru dulu; key halaman adalah (row[5], row[0])
+        format_row: fungsi baris DB -> values yang ditampilkan
+        height: tinggi table
+        page_size: jumlah baris per halaman
+        max_rows: jumlah maksimum baris di widget
+        worker: DbWorker untuk fetch di background (opsional)
+    """
+    
+    def __init__(self, parent, columns, fetch_page, format_row=None,
+                 height=10, page_size=100, max_rows=500, worker=None):
+        self.fetch_page = fetch_page
+        self.format_row = format_row or (lambda row: row)
+        self.page_size = page_size
+        self.max_rows = max(max_rows, page_size * 2)
+        self.worker = worker
+        
+        self.scrollbar, self.tree = create_table(parent, columns, height=height)
+        self.tree.config(yscrollcommand=self._on_scroll)
+        
+        self.keys = []
+        self.has_more_top = False
+        self.has_more_bottom = False
+        self._check_pending = False
+        self._loading = False
+        self._generation = 0
+    
+    @staticmethod
+    def row_key(row):
+        """Key keyset pagination: (tanggal_peminjaman, id)"""
+        return (row[5], row[0])
+    
+    def reload(self):
+        """Muat ulang dari halaman teratas"""
+        # Hasil fetch yang masih berjalan untuk jendela lama diabaikan
+        self._generation += 1
+        self._fetch(self._on_reload, limit=self.page_size)
+    
+    def _fetch(self, callback, **kwargs):
+        """Ambil halaman lewat worker (jika ada) lalu panggil callback di thread Tk"""
+        generation = self._generation
+        
+        def done(rows):
+            if generation != self._generation:
+                return
+            self._loading = False
+            callback(rows)
+        
+        def failed(exc):
+            self._loading = False
+            self.worker.show_error(exc)
+        
+        self._loading = True
+        if self.worker is None:
+            done(self.fetch_page(**kwargs))
+        else:
+            self.worker.submit(self.fetch_page, on_done=done, on_error=failed, **kwargs)
+    
+    def _on_reload(self, rows):
+        self.tree.delete(*self.tree.get_children())
+        self.keys = []
+        self._insert_rows(rows, tk.END)
+        self.has_more_top = False
+        self.has_more_bottom = len(rows) == self.page_size
+        self.tree.yview_moveto(0)
+    
+    def _insert_rows(self, rows, index):
+        keys = [self.row_key(row) for row in rows]
+        position = len(self.keys) if index == tk.END else index
+        for offset, row in enumerate(rows):
+            self.tree.insert('', position + offset, iid=str(row[0]), values=self.format_row(row))
+        self.keys[position:position] = keys
+    
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        # Cek posisi setelah idle agar tidak memuat di tengah update widget
+        if not self._check_pending:
+            self._check_pending = True
+            self.tree.after_idle(self._check_position)
+    
+    def _check_position(self):
+        self._check_pending = False
+        if self._loading or not self.keys:
+            return
+        first, last = self.tree.yview()
+        if last >= 0.9 and self.has_more_bottom:
+            self._fetch(self._on_next_page, after=self.keys[-1], limit=self.page_size)
+        elif first <= 0.1 and self.has_more_top:
+            self._fetch(self._on_previous_page, before=self.keys[0], limit=self.page_size)
+    
+    def _on_next_page(self, rows):
+        self.has_more_bottom = len(rows) == self.page_size
+        if not rows:
+            return
+        self._insert_rows(rows, tk.END)
+        
+        overflow = len(self.keys) - self.max_rows
+        if overflow > 0:
+            top = round(self.tree.yview()[0] * len(self.keys))
+            self.tree.delete(*self.tree.get_children()[:overflow])
+            del self.keys[:overflow]
+            self.has_more_top = True
+            self.tree.yview_moveto(max(0, top - overflow) / len(self.keys))
+    
+    def _on_previous_page(self, rows):
+        self.has_more_top = len(rows) == self.page_size
+        if not rows:
+            return
+        top = round(self.tree.yview()[0] * len(self.keys))
+        self._insert_rows(rows, 0)
+        
+        overflow = len(self.keys) - self.max_rows
+        if overflow > 0:
+            self.tree.delete(*self.tree.get_children()[-overflow:])
+            del self.keys[-overflow:]
+            self.has_more_bottom = True
+        self.tree.yview_moveto((top + len(rows)) / len(self.keys))
+    
+    def apply_changes(self, rows, removed_ids=()):
+        """
+        Terapkan perubahan parsial tanpa reload halaman
+        
+        Baris yang sudah tampil di-update di tempat; baris baru hanya
+        di-insert jika jatuh di dalam jendela yang sedang dimuat.
+        """
+        for row_id in removed_ids:
+            iid = str(row_id)
+            if self.tree.exists(iid):
+                del self.keys[self.tree.index(iid)]
+                self.tree.delete(iid)
+        
+        for row in rows:
+            iid = str(row[0])
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=self.format_row(row))
+                continue
+            
+            key = self.row_key(row)
+            # Di luar jendela: akan ikut termuat saat halaman itu di-scroll
+            if self.has_more_top and self.keys and key > self.keys[0]:
+                continue
+            if self.has_more_bottom and self.keys and key < self.keys[-1]:
+                continue
+            index = next((i for i, k in enumerate(self.keys) if k < key), len(self.keys))
+            self._insert_rows([row], index)
+
+
+class SearchBox:
+    """
+    Entry pencarian dengan debounce
+    
+    callback(teks) dipanggil setelah user berhenti mengetik selama delay_ms
+    (atau langsung saat Enter), dan hanya jika teks berubah.
+    """
+    
+    def __init__(self, parent, callback, delay_ms=250, label="Cari:"):
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self._after_id = None
+        self._last = ''
+        
+        self.frame = ttk.Frame(parent)
+        ttk.Label(self.frame, text=label, font=('Arial', 10)).pack(side=tk.LEFT)
+        self.entry = ttk.Entry(self.frame, width=30)
+        self.entry.pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.frame, text="Reset", command=self.clear).pack(side=tk.LEFT)
+        
+        self.entry.bind('<KeyRelease>', self._on_key)
+        self.entry.bind('<Return>', lambda e: self._fire())
+    
+    def get(self):
+        return self.entry.get().strip()
+    
+    def clear(self):
+        self.entry.delete(0, tk.END)
+        self._fire()
+    
+    def _on_key(self, event):
+        if self._after_id is not None:
+            self.entry.after_cancel(self._after_id)
+        self._after_id = self.entry.after(self.delay_ms, self._fire)
+    
+    def _fire(self):
+        if self._after_id is not None:
+            self.entry.after_cancel(self._after_id)
+            self._after_id = None
+        teks = self.get()
+        if teks != self._last:
+            self._last = teks
+            self.callback(teks)
+
+
+class PrefixIndex:
+    """
+    Index prefix nama (tidak peka huruf besar/kecil) di memori
+    
+    Item disimpan per ID; kunci (nama.casefold(), id) dijaga terurut
+    sehingga pencarian prefix cukup bisect + baca N item berikutnya.
+    """
+    
+    def __init__(self, items=(), name_index=1):
+        self.name_index = name_index
+        self.rebuild(items)
+    
+    def _key(self, item):
+        return (item[self.name_index].casefold(), item[0])
+    
+    def rebuild(self, items):
+        self.items = {item[0]: item for item in items}
+        self.keys = sorted(self._key(item) for item in self.items.values())
+    
+    def put(self, item):
+        self.remove(item[0])
+        self.items[item[0]] = item
+        insort(self.keys, self._key(item))
+    
+    def remove(self, item_id):
+        item = self.items.pop(item_id, None)
+        if item is not None:
+            key = self._key(item)
+            del self.keys[bisect_left(self.keys, key)]
+    
+    def get(self, item_id):
+        return self.items.get(item_id)
+    
+    def search(self, prefix, limit=10):
+        """Maksimal limit item yang namanya diawali prefix, urut nama"""
+        prefix = prefix.casefold()
+        result = []
+        position = bisect_left(self.keys, (prefix,))
+        while len(result) < limit and position < len(self.keys):
+            nama, item_id = self.keys[position]
+            if not nama.startswith(prefix):
+                break
+            result.append(self.items[item_id])
+            position += 1
+        return result
+    
+    def find(self, nama):
+        """Item dengan nama persis (tidak peka huruf besar/kecil), atau None"""
+        nama = nama.casefold()
+        match = self.search(nama, limit=1)
+        return match[0] if match and match[0][self.name_index].casefold() == nama else None
+
+
+class AutocompleteCombobox:
+    """
+    Combobox dengan autocomplete prefix untuk memilih item (mis. alat)
+    
+    Saat mengetik, daftar pilihan diisi ulang dengan maksimal limit item
+    yang cocok dari PrefixIndex. ID item disimpan terpisah dari label
+    sehingga label yang sama (atau berubah) tidak membingungkan pilihan.
+    
+    Args:
+        parent: parent widget
+        format_label: fungsi item -> teks pilihan
+        on_select: callback(item atau None) saat pilihan berubah
+        limit: jumlah maksimum pilihan yang ditampilkan
+    """
+    
+    def __init__(self, parent, format_label, on_select=None, limit=10, width=37):
+        self.format_label = format_label
+        self.on_select = on_select
+        self.limit = limit
+        self.index = PrefixIndex()
+        self.matches = []
+        self.selected = None
+        
+        self.combo = ttk.Combobox(parent, width=width)
+        self.combo.bind('<KeyRelease>', self._on_key)
+        self.combo.bind('<<ComboboxSelected>>', self._on_selected)
+        self.combo.bind('<FocusOut>', lambda e: self._resolve_typed())
+    
+    def grid(self, **kwargs):
+        self.combo.grid(**kwargs)
+    
+    def set_items(self, items):
+        """Ganti seluruh isi index (mis. setelah reload penuh)"""
+        self.index.rebuild(items)
+        self._after_index_change()
+    
+    def apply_changes(self, rows, removed_ids=()):
+        """Perbarui index hanya untuk item yang berubah"""
+        for item_id in removed_ids:
+            self.index.remove(item_id)
+        for row in rows:
+            self.index.put(row)
+        self._after_index_change()
+    
+    def selected_id(self):
+        """ID item terpilih (atau yang namanya diketik persis), None jika tidak ada"""
+        self._resolve_typed()
+        return self.selected[0] if self.selected else None
+    
+    def clear(self):
+        self.combo.set('')
+        self._select(None)
+        self._update_matches('')
+    
+    def _after_index_change(self):
+        if self.selected is not None:
+            # Item terpilih bisa berubah (stok) atau terhapus
+            self._select(self.index.get(self.selected[0]), set_text=True)
+        self._update_matches('' if self.selected else self.combo.get().strip())
+    
+    def _update_matches(self, prefix):
+        self.matches = self.index.search(prefix, self.limit)
+        self.combo['values'] = [self.format_label(item) for item in self.matches]
+    
+    def _select(self, item, set_text=False):
+        self.selected = item
+        if set_text:
+            self.combo.set(self.format_label(item) if item else '')
+        if self.on_select:
+            self.on_select(item)
+    
+    def _resolve_typed(self):
+        if self.selected is None:
+            item = self.index.find(self.combo.get().strip())
+            if item is not None:
+                self._select(item, set_text=True)
+    
+    def _on_key(self, event):
+        if event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+            return
+        if self.selected is not None and self.combo.get() != self.format_label(self.selected):
+            self._select(None)
+        self._update_matches(self.combo.get().strip())
+    
+    def _on_selected(self, event):
+        position = self.combo.current()
+        if 0 <= position < len(self.matches):
+            self._select(self.matches[position])
+
+
+class ChangeBuffer:
+    """Perubahan baris (upsert/hapus per ID) yang belum diterapkan ke tabel"""
+    
+    def __init__(self):
+        self.rows = {}
+        self.removed = set()
+        self.full = False
+    
+    def __bool__(self):
+        return self.full or bool(self.rows or self.removed)
+    
+    def add(self, rows, removed_ids=()):
+        if self.full:
+            # Reload penuh sudah dijadwalkan, delta tidak perlu disimpan
+            return
+        for row_id in removed_ids:
+            self.rows.pop(row_id, None)
+            self.removed.add(row_id)
+        for row in rows:
+            self.rows[row[0]] = row
+            self.removed.discard(row[0])
+    
+    def reload(self):
+        """Ganti semua delta dengan satu reload penuh"""
+        self.rows.clear()
+        self.removed.clear()
+        self.full = True
+    
+    def take(self):
+        """Ambil dan kosongkan buffer: (full, rows, removed_ids)"""
+        result = (self.full, list(self.rows.values()), set(self.removed))
+        self.rows = {}
+        self.removed = set()
+        self.full = False
+        return result
+
+
+class TabManager:
+    """
+    Pengelola tab notebook: bangun saat pertama dibuka, refresh saat terlihat
+    
+    Frame kosong langsung ditambahkan ke notebook (judul tab tampil), tapi
+    widget dan query awal tab baru dibuat lewat build(frame) ketika tab itu
+    dibuka. Setelah itu tab yang datanya berubah cukup ditandai dirty;
+    refresh() hanya dipanggil untuk tab yang sedang terlihat, tab lain
+    menunggu sampai dipilih (<<NotebookTabChanged>>).
+    """
+    
+    def __init__(self, notebook):
+        self.notebook = notebook
+        self.frames = {}
+        self.names = {}
+        self.builders = {}
+        self.refreshers = {}
+        self.dirty = set()
+        notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed, add='+')
+    
+    def add(self, name, text, build, refresh=None):
+        """Daftarkan tab; build(frame) sekali saat dibuka, refresh() saat dirty"""
+        frame = ttk.Frame(self.notebook)
+        self.notebook.add(frame, text=text)
+        self.frames[name] = frame
+        self.names[str(frame)] = name
+        self.builders[name] = build
+        if refresh is not None:
+            self.refreshers[name] = refresh
+        return frame
+    
+    def selected(self):
+        """Nama tab yang sedang terlihat (None jika bukan tab terdaftar)"""
+        return self.names.get(str(self.notebook.select()))
+    
+    def is_built(self, name):
+        return name in self.frames and name not in self.builders
+    
+    def on_tab_changed(self, event=None):
+        name = self.selected()
+        if name is None:
+            return
+        build = self.builders.pop(name, None)
+        if build is not None:
+            # Build memuat data lengkap, perubahan sebelumnya tidak relevan
+            self.dirty.discard(name)
+            build(self.frames[name])
+        elif name in self.dirty:
+            self.dirty.discard(name)
+            self.refreshers[name]()
+    
+    def mark_dirty(self, *names):
+        """Tandai tab perlu refresh; tab yang terlihat langsung di-refresh"""
+        visible = self.selected()
+        for name in names:
+            if not self.is_built(name) or name not in self.refreshers:
+                continue
+            if name == visible:
+                self.dirty.discard(name)
+                self.refreshers[name]()
+            else:
+                self.dirty.add(name)
@@ -4,29 +4,70 @@ User UI - Tabs untuk user
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from ui.components import create_table
-from database.db import DatabaseManager
+from ui.components import (
+    create_table, sync_table, apply_changes, LazyTable, TabManager, ChangeBuffer, AutocompleteCombobox
+)
+from services.inventory import InventoryService
+from services.loan import LoanService, validasi_jumlah
+from services.watcher import ChangeWatcher
+from services.worker import DbWorker
 
 
 class UserUI:
     """Handler untuk user tabs"""
     
-    def __init__(self, notebook, current_user):
+    def __init__(self, notebook, current_user, worker=None, tabs=None):
         self.notebook = notebook
         self.current_user = current_user
         self.username = current_user['username']
-        self.db = DatabaseManager()
+        self.user_id = current_user['id']
+        # DatabaseManager baru dibuat di thread worker saat query pertama
+        self.inventory = InventoryService()
+        self.loans = LoanService()
+        # Semua query jalan di background, hasil kembali lewat callback
+        self.worker = worker or DbWorker(notebook.winfo_toplevel())
+        # Revisi log perubahan yang sudah tampil di tabel (None = belum dimuat)
+        self.revisi = None
         
-        # Buat tabs
-        self.create_tab_peminjaman()
-        self.create_tab_pengembalian()
-        self.create_tab_riwayat()
+        # Perubahan peminjaman yang belum diterapkan ke tab yang tidak terlihat
+        self.pending = {'peminjaman': ChangeBuffer(), 'pengembalian': ChangeBuffer(), 'riwayat': ChangeBuffer()}
+        # Perubahan alat yang belum diterapkan ke index autocomplete
+        self.pending_alat = ChangeBuffer()
+        # Riwayat ikut membaca peminjaman_arsip
+        self.riwayat_arsip = False
+        # Tabel peminjaman aktif (tab peminjaman dan pengembalian) dan hasil
+        # query terakhirnya: (revisi saat query dikirim, rows)
+        self.tree_peminjaman = None
+        self.tree_kembali = None
+        self.aktif = None
+        # Isi keranjang: id_alat -> (nama_alat, jumlah), urut saat ditambahkan
+        self.keranjang = {}
+        
+        self.tabs = tabs or TabManager(self.notebook)
+        # Stok dan peminjaman dari client lain diterapkan sebagai delta,
+        # supaya stok di daftar alat tidak basi
+        self.watcher = ChangeWatcher(notebook.winfo_toplevel(), self.kirim_refresh)
+        
+        # Revisi dibaca dulu (di worker) sebelum tab memuat data, supaya
+        # tidak ada perubahan yang terlewat di antara keduanya
+        self.worker.submit(self.loans.revisi, on_done=self.on_revisi_awal)
     
-    def create_tab_peminjaman(self):
-        """Tab: Input Peminjaman"""
-        tab_peminjaman = ttk.Frame(self.notebook)
-        self.notebook.add(tab_peminjaman, text="Input Peminjaman")
+    def on_revisi_awal(self, revisi):
+        self.revisi = revisi
+        
+        # Buat tabs; isi tiap tab dibangun saat pertama kali dibuka
+        self.tabs.add('peminjaman', "Input Peminjaman", self.create_tab_peminjaman, self.refresh_tab_peminjaman)
+        self.tabs.add('pengembalian', "Pengembalian Alat", self.create_tab_pengembalian, self.refresh_tab_pengembalian)
+        self.tabs.add('riwayat', "Riwayat Saya", self.create_tab_riwayat, self.refresh_tab_riwayat)
+        self.tabs.add('reservasi', "Reservasi Saya", self.create_tab_reservasi, self.load_reservasi)
+        self.tabs.on_tab_changed()
         
+        # Reservasi yang dialokasikan selama user tidak login
+        self.cek_notifikasi_reservasi()
+        self.watcher.start()
+    
+    def create_tab_peminjaman(self, tab_peminjaman):
+        """Tab: Input Peminjaman"""
         # Frame input
         input_frame = ttk.LabelFrame(tab_peminjaman, text="Input Peminjaman", padding=10)
         input_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -44,9 +85,9 @@ class UserUI:
         note.grid(row=1, column=0, columnspan=2, sticky=tk.W, pady=3)
         
         ttk.Label(input_frame, text="Pilih Alat:", font=('Arial', 10)).grid(row=2, column=0, sticky=tk.W, pady=5)
-        self.combo_alat = ttk.Combobox(input_frame, width=37, state='readonly')
+        # Ketik awal nama alat; pilihan dibatasi 10 alat teratas yang cocok
+        self.combo_alat = AutocompleteCombobox(input_frame, format_alat, on_select=self.on_alat_selected)
         self.combo_alat.grid(row=2, column=1, sticky=tk.W, padx=5)
-        self.combo_alat.bind('<<ComboboxSelected>>', self.on_alat_selected)
         
         ttk.Label(input_frame, text="Jumlah:", font=('Arial', 10)).grid(row=3, column=0, sticky=tk.W, pady=5)
         self.entry_jumlah = ttk.Entry(input_frame, width=40)
@@ -56,12 +97,28 @@ class UserUI:
         self.label_stok = ttk.Label(input_frame, text="0", font=('Arial', 10))
         self.label_stok.grid(row=4, column=1, sticky=tk.W, padx=5)
         
-        ttk.Button(input_frame, text="Pinjam", command=self.pinjam_alat).grid(row=5, column=0, columnspan=2, pady=10)
+        button_frame = ttk.Frame(input_frame)
+        button_frame.grid(row=5, column=0, columnspan=2, pady=10)
+        ttk.Button(button_frame, text="Pinjam", command=self.pinjam_alat).pack(side=tk.LEFT, padx=5)
+        # Stok kurang: masuk antrean, dipinjamkan otomatis saat ada yang kembali
+        ttk.Button(button_frame, text="Reservasi", command=self.reservasi_alat).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Tambah ke Keranjang", command=self.tambah_keranjang).pack(side=tk.LEFT, padx=5)
         
         self.load_combo_alat()
         
+        # Keranjang: beberapa alat dipinjam sekaligus dalam satu transaksi
+        keranjang_frame = ttk.LabelFrame(tab_peminjaman, text="Keranjang", padding=10)
+        keranjang_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        scrollbar, self.tree_keranjang = create_table(keranjang_frame, ('ID', 'Alat', 'Jumlah'), height=4)
+        
+        keranjang_buttons = ttk.Frame(keranjang_frame)
+        keranjang_buttons.pack(pady=(5, 0))
+        ttk.Button(keranjang_buttons, text="Hapus dari Keranjang", command=self.hapus_keranjang).pack(side=tk.LEFT, padx=5)
+        ttk.Button(keranjang_buttons, text="Pinjam Semua", command=self.pinjam_keranjang).pack(side=tk.LEFT, padx=5)
+        
         # Frame riwayat peminjaman aktif
-        riwayat_frame = ttk.LabelFrame(tab_peminjaman, text="Peminjaman Aktif (Status: Dipinjam)", padding=10)
+        riwayat_frame = ttk.LabelFrame(tab_peminjaman, text="Peminjaman Aktif Saya", padding=10)
         riwayat_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         columns = ('ID', 'Nama Peminjam', 'Alat', 'Jumlah', 'Tanggal')
@@ -69,12 +126,9 @@ class UserUI:
         
         self.load_peminjaman_aktif()
     
-    def create_tab_pengembalian(self):
+    def create_tab_pengembalian(self, tab_pengembalian):
         """Tab: Pengembalian Alat"""
-        tab_pengembalian = ttk.Frame(self.notebook)
-        self.notebook.add(tab_pengembalian, text="Pengembalian Alat")
-        
-        info_frame = ttk.LabelFrame(tab_pengembalian, text="Daftar Peminjaman Aktif", padding=10)
+        info_frame = ttk.LabelFrame(tab_pengembalian, text="Daftar Peminjaman Aktif Saya", padding=10)
         info_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         columns = ('ID', 'Nama Peminjam', 'Alat', 'Jumlah', 'Tanggal Pinjam')
@@ -83,85 +137,204 @@ class UserUI:
         button_frame = ttk.Frame(tab_pengembalian)
         button_frame.pack(pady=10)
         
-        ttk.Button(button_frame, text="Kembalikan Alat", command=self.kembalikan_alat).pack()
+        ttk.Button(button_frame, text="Pilih Semua", command=self.pilih_semua_kembali).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Kembalikan Alat", command=self.kembalikan_alat).pack(side=tk.LEFT, padx=5)
         
-        self.load_data_pengembalian()
+        self.load_peminjaman_aktif()
     
-    def create_tab_riwayat(self):
+    def create_tab_riwayat(self, tab_riwayat):
         """Tab: Riwayat Peminjaman Pribadi"""
-        tab_riwayat = ttk.Frame(self.notebook)
-        self.notebook.add(tab_riwayat, text="Riwayat Saya")
-        
         table_frame = ttk.LabelFrame(tab_riwayat, text=f"Riwayat Peminjaman - {self.username}", padding=10)
         table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
+        self.var_arsip = tk.BooleanVar(value=False)
+        ttk.Checkbutton(table_frame, text="Tampilkan juga riwayat lama (arsip)", variable=self.var_arsip,
+                        command=self.on_toggle_arsip).pack(anchor=tk.W, pady=(0, 5))
+        
         columns = ('ID', 'Nama Peminjam', 'Alat', 'Jumlah', 'Status', 'Tanggal Pinjam')
-        scrollbar, self.tree_riwayat = create_table(table_frame, columns, height=20)
+        self.table_riwayat = LazyTable(
+            table_frame, columns,
+            fetch_page=lambda **kwargs: self.loans.halaman_riwayat(
+                user_id=self.user_id, termasuk_arsip=self.riwayat_arsip, **kwargs
+            ),
+            format_row=format_riwayat,
+            height=20,
+            worker=self.worker
+        )
+        self.tree_riwayat = self.table_riwayat.tree
         
         self.load_riwayat()
     
+    def create_tab_reservasi(self, tab_reservasi):
+        """Tab: Reservasi Pribadi"""
+        table_frame = ttk.LabelFrame(tab_reservasi, text="Reservasi Saya", padding=10)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        columns = ('ID', 'Alat', 'Jumlah', 'Status', 'Posisi Antrean', 'Tanggal')
+        scrollbar, self.tree_reservasi = create_table(table_frame, columns, height=15)
+        
+        ttk.Button(tab_reservasi, text="Batalkan Reservasi", command=self.batalkan_reservasi).pack(pady=10)
+        
+        self.load_reservasi()
+    
     # ---- PEMINJAMAN OPERATIONS ----
     
     def load_combo_alat(self):
-        data = self.db.get_all_alat()
-        self.alat_map = {f"{item[1]} (Stok: {item[2]})": item[0] for item in data}
-        self.combo_alat['values'] = list(self.alat_map.keys())
+        self.worker.submit(self.inventory.daftar_alat, on_done=self.on_alat_loaded)
     
-    def on_alat_selected(self, event):
-        selected = self.combo_alat.get()
-        if selected:
-            alat_id = self.alat_map[selected]
-            stok = self.db.get_stok(alat_id)
-            self.label_stok.config(text=str(stok))
+    def on_alat_loaded(self, data):
+        self.combo_alat.set_items(data)
     
-    def pinjam_alat(self):
-        nama_peminjam = self.username
-        selected_alat = self.combo_alat.get()
+    def on_alat_selected(self, item):
+        # Stok sudah ikut termuat bersama daftar alat
+        self.label_stok.config(text=str(item[2]) if item else "0")
+    
+    def _baca_input_pinjam(self):
+        """
+        Baca alat terpilih dan jumlah dari form input
+        
+        Returns:
+            (alat_id, row alat, jumlah_int), atau None setelah menampilkan error
+        """
+        alat_id = self.combo_alat.selected_id()
         jumlah = self.entry_jumlah.get().strip()
         
-        if not selected_alat or not jumlah:
+        if alat_id is None or not jumlah:
             messagebox.showerror("Error", "Pilih alat dan isi jumlah")
+            return None
+        
+        valid, result = validasi_jumlah(jumlah)
+        if not valid:
+            messagebox.showerror("Error", result)
+            return None
+        return alat_id, self.combo_alat.selected, result
+    
+    def pinjam_alat(self):
+        data = self._baca_input_pinjam()
+        if data is None:
             return
+        alat_id, _, jumlah = data
         
-        try:
-            jumlah = int(jumlah)
-            if jumlah <= 0:
-                raise ValueError()
-        except ValueError:
-            messagebox.showerror("Error", "Jumlah harus berupa angka positif")
+        self.worker.submit(
+            self.loans.pinjam, self.user_id, alat_id, jumlah,
+            on_done=self.on_pinjam_done
+        )
+    
+    def on_pinjam_done(self, result):
+        success, msg = result
+        
+        if success:
+            messagebox.showinfo("Sukses", msg)
+            self.clear_peminjaman_input()
+            self.refresh()
+        else:
+            messagebox.showerror("Error", msg)
+    
+    def tambah_keranjang(self):
+        data = self._baca_input_pinjam()
+        if data is None:
             return
+        alat_id, alat, jumlah = data
+        
+        # Alat yang sama digabung; stok dicek lagi di database saat dipinjam
+        _, nama_alat, stok, _ = alat
+        total = self.keranjang.get(alat_id, (nama_alat, 0))[1] + jumlah
+        if total > stok:
+            messagebox.showerror("Error", f"Stok tidak cukup. Tersedia: {stok}")
+            return
+        self.keranjang[alat_id] = (nama_alat, total)
+        self.update_keranjang()
+        self.clear_peminjaman_input()
+    
+    def hapus_keranjang(self):
+        for iid in self.tree_keranjang.selection():
+            self.keranjang.pop(int(iid), None)
+        self.update_keranjang()
+    
+    def update_keranjang(self):
+        rows = [(id_alat, nama_alat, jumlah) for id_alat, (nama_alat, jumlah) in self.keranjang.items()]
+        sync_table(self.tree_keranjang, rows)
+    
+    def pinjam_keranjang(self):
+        if not self.keranjang:
+            messagebox.showerror("Error", "Keranjang masih kosong")
+            return
+        
+        # Satu panggilan database untuk seluruh keranjang, satu refresh setelahnya
+        items = [(id_alat, jumlah) for id_alat, (_, jumlah) in self.keranjang.items()]
+        self.worker.submit(
+            self.loans.pinjam_banyak, self.user_id, items,
+            on_done=self.on_keranjang_done
+        )
+    
+    def on_keranjang_done(self, result):
+        success, hasil = result
         
-        alat_id = self.alat_map[selected_alat]
+        if success:
+            messagebox.showinfo("Sukses", f"{len(hasil)} alat berhasil dipinjam (ID: {', '.join(map(str, hasil))})")
+            self.keranjang.clear()
+            self.update_keranjang()
+            self.refresh()
+        else:
+            # Tidak ada yang dipinjam; keranjang tetap utuh untuk diperbaiki
+            messagebox.showerror("Error", hasil)
+    
+    def reservasi_alat(self):
+        data = self._baca_input_pinjam()
+        if data is None:
+            return
+        alat_id, _, jumlah = data
         
-        success, msg = self.db.tambah_peminjaman(nama_peminjam, alat_id, jumlah)
+        self.worker.submit(
+            self.loans.reservasi, self.user_id, alat_id, jumlah,
+            on_done=self.on_reservasi_done
+        )
+    
+    def on_reservasi_done(self, result):
+        success, msg = result
         
         if success:
             messagebox.showinfo("Sukses", msg)
             self.clear_peminjaman_input()
-            self.load_peminjaman_aktif()
-            self.load_data_pengembalian()
-            self.load_combo_alat()
-            self.load_riwayat()
+            self.tabs.mark_dirty('reservasi')
+            self.refresh()
         else:
             messagebox.showerror("Error", msg)
     
     def clear_peminjaman_input(self):
-        self.combo_alat.set('')
+        self.combo_alat.clear()
         self.entry_jumlah.delete(0, tk.END)
-        self.label_stok.config(text="0")
     
     def load_peminjaman_aktif(self):
-        for item in self.tree_peminjaman.get_children():
-            self.tree_peminjaman.delete(item)
+        """
+        Muat peminjaman aktif milik user ke tab peminjaman dan pengembalian
         
-        data = self.db.get_peminjaman_by_status('Dipinjam')
-        for row in data:
-            self.tree_peminjaman.insert('', tk.END, values=(
-                row[0], row[1], row[2], row[3], row[5][:10]
-            ))
+        Satu query mengisi kedua tabel yang sudah dibangun; tab yang dibangun
+        belakangan memakai hasil yang sama selama belum ada perubahan.
+        """
+        # Perubahan yang tertunda untuk kedua tab sudah tercakup query ini
+        self.pending['peminjaman'].take()
+        self.pending['pengembalian'].take()
+        if self.aktif is not None and self.aktif[0] == self.revisi:
+            self.on_aktif_loaded(self.aktif)
+            return
+        revisi = self.revisi
+        self.worker.submit(
+            self.loans.peminjaman_aktif, self.user_id,
+            on_done=lambda data: self.on_aktif_loaded((revisi, data))
+        )
+    
+    def on_aktif_loaded(self, aktif):
+        self.aktif = aktif
+        for tree in (self.tree_peminjaman, self.tree_kembali):
+            if tree is not None:
+                sync_table(tree, aktif[1], format_aktif)
     
     # ---- PENGEMBALIAN OPERATIONS ----
     
+    def pilih_semua_kembali(self):
+        self.tree_kembali.selection_set(self.tree_kembali.get_children())
+    
     def kembalikan_alat(self):
         selection = self.tree_kembali.selection()
         
@@ -169,39 +342,190 @@ class UserUI:
             messagebox.showerror("Error", "Pilih peminjaman yang akan dikembalikan")
             return
         
-        if messagebox.askyesno("Konfirmasi", "Kembalikan alat ini?"):
-            item = self.tree_kembali.item(selection[0])
-            id_peminjaman = item['values'][0]
-            
-            success, msg = self.db.kembalikan_alat(id_peminjaman)
-            
-            if success:
-                messagebox.showinfo("Sukses", msg)
-                self.load_data_pengembalian()
-                self.load_peminjaman_aktif()
-                self.load_combo_alat()
-                self.load_riwayat()
-            else:
-                messagebox.showerror("Error", msg)
+        # iid baris = ID peminjaman (lihat sync_table)
+        ids = [int(iid) for iid in selection]
+        pesan = "Kembalikan alat ini?" if len(ids) == 1 else f"Kembalikan {len(ids)} peminjaman terpilih?"
+        if messagebox.askyesno("Konfirmasi", pesan):
+            # Semua ID dalam satu transaksi, satu refresh setelahnya
+            self.worker.submit(self.loans.kembalikan_banyak, ids, on_done=self.on_kembali_done)
+    
+    def on_kembali_done(self, result):
+        berhasil = [id_peminjaman for id_peminjaman, success, _ in result if success]
+        gagal = [(id_peminjaman, msg) for id_peminjaman, success, msg in result if not success]
+        
+        if berhasil:
+            self.refresh()
+        if not gagal:
+            msg = "Alat berhasil dikembalikan" if len(berhasil) == 1 else f"{len(berhasil)} peminjaman berhasil dikembalikan"
+            messagebox.showinfo("Sukses", msg)
+        else:
+            detail = "\n".join(f"#{id_peminjaman}: {msg}" for id_peminjaman, msg in gagal[:10])
+            messagebox.showerror("Error", f"{len(berhasil)} berhasil, {len(gagal)} gagal:\n{detail}")
+    
+    # ---- RESERVASI OPERATIONS ----
+    
+    def load_reservasi(self):
+        self.worker.submit(
+            self.loans.daftar_reservasi, self.user_id,
+            on_done=lambda rows: sync_table(self.tree_reservasi, rows, format_reservasi)
+        )
+    
+    def batalkan_reservasi(self):
+        selection = self.tree_reservasi.selection()
+        
+        if not selection:
+            messagebox.showerror("Error", "Pilih reservasi yang akan dibatalkan")
+            return
+        
+        if messagebox.askyesno("Konfirmasi", "Batalkan reservasi ini?"):
+            self.worker.submit(
+                self.loans.batalkan_reservasi, int(selection[0]), self.user_id,
+                on_done=self.on_batal_reservasi_done
+            )
     
-    def load_data_pengembalian(self):
-        for item in self.tree_kembali.get_children():
-            self.tree_kembali.delete(item)
+    def on_batal_reservasi_done(self, result):
+        success, msg = result
         
-        data = self.db.get_peminjaman_by_status('Dipinjam')
-        for row in data:
-            self.tree_kembali.insert('', tk.END, values=(
-                row[0], row[1], row[2], row[3], row[5][:10]
-            ))
+        if success:
+            self.load_reservasi()
+            # Pembatalan bisa membuat reservasi lain langsung dialokasikan
+            self.refresh()
+        else:
+            messagebox.showerror("Error", msg)
+    
+    def cek_notifikasi_reservasi(self):
+        self.worker.submit(self.loans.notifikasi_reservasi, self.user_id, on_done=self.on_notifikasi_reservasi)
+    
+    def on_notifikasi_reservasi(self, rows):
+        if not rows:
+            return
+        self.tabs.mark_dirty('reservasi')
+        detail = "\n".join(
+            f"Reservasi #{id_reservasi}: {nama_alat} x{jumlah} (ID peminjaman: {id_peminjaman})"
+            for id_reservasi, nama_alat, jumlah, id_peminjaman in rows[:10]
+        )
+        messagebox.showinfo("Reservasi Dialokasikan", f"Alat yang Anda reservasi sudah dipinjamkan:\n{detail}")
     
     # ---- RIWAYAT OPERATIONS ----
     
     def load_riwayat(self):
-        for item in self.tree_riwayat.get_children():
-            self.tree_riwayat.delete(item)
-        
-        data = self.db.get_peminjaman_by_user(self.username)
-        for row in data:
-            self.tree_riwayat.insert('', tk.END, values=(
-                row[0], row[1], row[2], row[3], row[4], row[5][:10]
-            ))
+        self.table_riwayat.reload()
+    
+    def on_toggle_arsip(self):
+        # Disalin ke atribut biasa: fetch_page dibaca dari thread worker
+        self.riwayat_arsip = self.var_arsip.get()
+        self.load_riwayat()
+    
+    # ---- REFRESH ----
+    
+    def refresh(self):
+        """Terapkan hanya baris yang berubah sejak refresh terakhir"""
+        # Lewat watcher supaya digabung dengan refresh karena client lain
+        self.watcher.refresh()
+    
+    def kirim_refresh(self):
+        self.worker.submit(
+            self.loans.perubahan, self.revisi,
+            on_done=self.on_perubahan, on_error=self.on_refresh_gagal
+        )
+    
+    def on_refresh_gagal(self, exc):
+        self.watcher.selesai(gagal=True)
+        self.worker.show_error(exc)
+    
+    def on_perubahan(self, result):
+        try:
+            self.terapkan_perubahan(result)
+        finally:
+            self.watcher.selesai()
+    
+    def terapkan_perubahan(self, result):
+        revisi, changes = result
+        if revisi < self.revisi:
+            # Hasil refresh lama yang selesai belakangan
+            return
+        for name, buffer in self.pending.items():
+            # Tab yang belum dibuka akan memuat data lengkap saat dibangun
+            if not self.tabs.is_built(name):
+                continue
+            if changes is None:
+                # Log sudah dipangkas, reload penuh
+                buffer.reload()
+            else:
+                buffer.add(*changes['peminjaman'])
+        if self.tabs.is_built('peminjaman'):
+            if changes is None:
+                self.pending_alat.reload()
+            else:
+                self.pending_alat.add(*changes['alat'])
+        self.revisi = revisi
+        
+        # Alokasi reservasi muncul sebagai peminjaman baru milik user ini
+        if changes is None or any(row[6] == self.user_id for row in changes['peminjaman'][0]):
+            self.cek_notifikasi_reservasi()
+        
+        # Hanya tab yang terlihat yang langsung diperbarui
+        dirty = [name for name, buffer in self.pending.items() if buffer]
+        if self.pending_alat and 'peminjaman' not in dirty:
+            dirty.append('peminjaman')
+        if changes is None or changes['reservasi']:
+            # Posisi antrean bergeser saat reservasi lain (juga dari client
+            # lain) dibuat, dibatalkan, atau dialokasikan
+            dirty.append('reservasi')
+        self.tabs.mark_dirty(*dirty)
+    
+    def refresh_tab_peminjaman(self):
+        full, rows, removed = self.pending_alat.take()
+        if full:
+            self.load_combo_alat()
+        elif rows or removed:
+            self.combo_alat.apply_changes(rows, removed)
+        full, rows, removed = self.pending['peminjaman'].take()
+        if full:
+            self.load_peminjaman_aktif()
+        else:
+            aktif, tidak_aktif = split_aktif(rows, removed, self.user_id)
+            apply_changes(self.tree_peminjaman, aktif, tidak_aktif, format_aktif,
+                          sort_column='Tanggal', descending=True)
+    
+    def refresh_tab_pengembalian(self):
+        full, rows, removed = self.pending['pengembalian'].take()
+        if full:
+            self.load_peminjaman_aktif()
+        else:
+            aktif, tidak_aktif = split_aktif(rows, removed, self.user_id)
+            apply_changes(self.tree_kembali, aktif, tidak_aktif, format_aktif,
+                          sort_column='Tanggal Pinjam', descending=True)
+    
+    def refresh_tab_riwayat(self):
+        full, rows, removed = self.pending['riwayat'].take()
+        # Baris yang baru diarsipkan terhapus dari peminjaman tapi tetap ada di arsip
+        if full or (self.riwayat_arsip and removed):
+            self.load_riwayat()
+        else:
+            milik_user = [row for row in rows if row[6] == self.user_id]
+            lainnya = removed | ({row[0] for row in rows} - {row[0] for row in milik_user})
+            self.table_riwayat.apply_changes(milik_user, lainnya)
+
+
+def split_aktif(rows, removed, user_id):
+    """Pisahkan baris Dipinjam milik user dari ID yang harus hilang dari tabel aktif"""
+    aktif = [row for row in rows if row[4] == 'Dipinjam' and row[6] == user_id]
+    return aktif, (removed | {row[0] for row in rows}) - {row[0] for row in aktif}
+
+
+def format_alat(item):
+    return f"{item[1]} (Stok: {item[2]})"
+
+
+def format_aktif(row):
+    return (row[0], row[1], row[2], row[3], row[5][:10])
+
+
+def format_reservasi(row):
+    posisi = row[6] if row[6] is not None else '-'
+    return (row[0], row[1], row[2], row[3], posisi, row[4][:10])
+
+
+def format_riwayat(row):
+    return (row[0], row[1], row[2], row[3], row[4], row[5][:10])
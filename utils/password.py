@@ -0,0 +1,145 @@
+"""
+Password hashing untuk SIJAtools
+KDF dari hashlib (PBKDF2-SHA256 atau scrypt) dengan parameter cost yang
+bisa diatur. Format hash yang disimpan di kolom users.password:
+    
+    pbkdf2_sha256$<iterasi>$<salt_hex>$<hash_hex>
+    scrypt$<n>$<r>$<p>$<salt_hex>$<hash_hex>
+
+Nilai lain dianggap password plaintext lama; verify_password tetap
+menerimanya dan needs_rehash() memberi tanda agar di-hash ulang saat login.
+"""
+
+import hashlib
+import hmac
+import os
+import threading
+from collections import OrderedDict
+
+# Parameter default; bisa diganti lewat configure() atau environment
+KDF_DEFAULT = {
+    'algoritma': os.environ.get('SIJATOOLS_KDF', 'pbkdf2_sha256'),
+    'iterasi': int(os.environ.get('SIJATOOLS_PBKDF2_ITERASI', 240_000)),
+    'n': int(os.environ.get('SIJATOOLS_SCRYPT_N', 2 ** 14)),
+    'r': 8,
+    'p': 1,
+}
+
+SALT_BYTES = 16
+HASH_BYTES = 32
+CACHE_MAKS = 256
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+# Kunci acak per proses: cache hanya menyimpan HMAC, bukan password
+_cache_key = os.urandom(32)
+
+
+def configure(**params):
+    """Ubah parameter KDF default (algoritma, iterasi, n, r, p)"""
+    unknown = set(params) - set(KDF_DEFAULT)
+    if unknown:
+        raise ValueError(f"Parameter KDF tidak dikenal: {', '.join(sorted(unknown))}")
+    KDF_DEFAULT.update(params)
+    clear_cache()
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def _tanda(password):
+    return hmac.new(_cache_key, password.encode('utf-8'), 'sha256').digest()
+
+
+def _remember(stored, tanda):
+    with _cache_lock:
+        _cache[stored] = tanda
+        _cache.move_to_end(stored)
+        if len(_cache) > CACHE_MAKS:
+            _cache.popitem(last=False)
+
+
+def _derive(password, salt, algoritma, cost):
+    data = password.encode('utf-8')
+    if algoritma == 'pbkdf2_sha256':
+        (iterasi,) = cost
+        return hashlib.pbkdf2_hmac('sha256', data, salt, iterasi, HASH_BYTES)
+    if algoritma == 'scrypt':
+        n, r, p = cost
+        return hashlib.scrypt(data, salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 2 ** 20, dklen=HASH_BYTES)
+    raise ValueError(f"Algoritma KDF tidak dikenal: {algoritma}")
+
+
+def _cost(params):
+    if params['algoritma'] == 'scrypt':
+        return (params['n'], params['r'], params['p'])
+    return (params['iterasi'],)
+
+
+def _parse(stored):
+    """(algoritma, cost, salt, hash) atau None jika bukan hash yang dikenal"""
+    parts = (stored or '').split('$')
+    try:
+        if parts[0] == 'pbkdf2_sha256' and len(parts) == 4:
+            return parts[0], (int(parts[1]),), bytes.fromhex(parts[2]), bytes.fromhex(parts[3])
+        if parts[0] == 'scrypt' and len(parts) == 6:
+            cost = tuple(int(x) for x in parts[1:4])
+            return parts[0], cost, bytes.fromhex(parts[4]), bytes.fromhex(parts[5])
+    except ValueError:
+        pass
+    return None
+
+
+def hash_password(password, **params):
+    """Hash password dengan parameter default (atau override lewat params)"""
+    params = {**KDF_DEFAULT, **params}
+    salt = os.urandom(SALT_BYTES)
+    cost = _cost(params)
+    digest = _derive(password, salt, params['algoritma'], cost)
+    stored = '$'.join((params['algoritma'], *map(str, cost), salt.hex(), digest.hex()))
+    # Hash baru pasti cocok: login berikutnya (setelah rehash) langsung kena cache
+    _remember(stored, _tanda(password))
+    return stored
+
+
+def is_hashed(stored):
+    return _parse(stored) is not None
+
+
+def verify_password(password, stored):
+    """
+    Cocokkan password dengan nilai tersimpan (hash atau plaintext lama)
+    
+    Verifikasi yang berhasil disimpan di cache LRU kecil supaya login
+    berulang (mis. sesi CLI) tidak membayar biaya KDF setiap kali.
+    """
+    if stored is None:
+        return False
+    tanda = _tanda(password)
+    with _cache_lock:
+        cached = _cache.get(stored)
+        if cached is not None and hmac.compare_digest(cached, tanda):
+            _cache.move_to_end(stored)
+            return True
+    
+    # Password salah selalu membayar biaya KDF penuh (tidak dipercepat cache)
+    parsed = _parse(stored)
+    if parsed is None:
+        cocok = hmac.compare_digest(password.encode('utf-8'), stored.encode('utf-8'))
+    else:
+        algoritma, cost, salt, digest = parsed
+        cocok = hmac.compare_digest(_derive(password, salt, algoritma, cost), digest)
+    
+    if cocok:
+        _remember(stored, tanda)
+    return cocok
+
+
+def needs_rehash(stored):
+    """True jika plaintext lama atau parameter KDF berbeda dari default"""
+    parsed = _parse(stored)
+    if parsed is None:
+        return True
+    return parsed[0] != KDF_DEFAULT['algoritma'] or parsed[1] != _cost(KDF_DEFAULT)